@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from defense_stats import DefenseTensor
+from shards import CURRENT_SEASON
+
+FORMATS = ("parquet", "arrow")
+_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+# A team's season of game logs (a few hundred rows) spans two or three row
+# groups: enough for min/max statistics to skip part of a file, few enough
+# that per-chunk overhead does not outweigh what is skipped.
+ROW_GROUP_ROWS = 256
+
+
+@dataclass(frozen=True)
+class TableSpec:
+  name: str
+  partition_by: tuple[str, ...]
+  # Within a partition, so that row-group statistics line up with common filters.
+  sort_by: tuple[str, ...]
+  # Add a file per snapshot date instead of replacing the partition on re-export.
+  keep_history: bool = False
+
+
+TABLES = {
+  "game_logs": TableSpec("game_logs", ("season", "team_id"), ("opponent_team_id", "position", "round")),
+  "players": TableSpec("players", ("season", "team_id"), ("position", "id"), keep_history=True),
+  "defense": TableSpec("defense", ("season",), ("team_id", "position")),
+}
+
+
+def _require_pyarrow() -> None:
+  try:
+    import pyarrow  # noqa: F401
+  except ImportError as e:
+    raise SystemExit(f"The analytics export needs pyarrow. Install with: pip install pyarrow\nDetails: {e}")
+
+
+def partition_season(season: str | None) -> str:
+  """``season`` as the ``2024-25`` label partitions are written under.
+
+  A re-export replaces the season's partitions, so an export under a moving
+  label such as "current" would delete last season's data once the season
+  rolls over. Such labels are refused.
+  """
+  import euro_scraper
+
+  if not season or season.strip().lower() == CURRENT_SEASON:
+    raise ValueError(f"Analytics exports need a concrete season such as 2024-25, not {season!r}.")
+  return euro_scraper.season_label(season)
+
+
+def analytics_frames(
+  data: dict[str, Any],
+  *,
+  game_logs: "pd.DataFrame | None" = None,
+  season: str,
+  snapshot: str | None = None,
+) -> dict[str, "pd.DataFrame"]:
+  """The exported tables as DataFrames, keyed by table name."""
+  import pandas as pd
+
+  season = partition_season(season)
+  snapshot = snapshot or datetime.date.today().isoformat()
+  frames: dict[str, pd.DataFrame] = {}
+
+  if game_logs is not None and not game_logs.empty:
+    frames["game_logs"] = game_logs.assign(season=season)
+
+  players = pd.DataFrame(data.get("players", []))
+  if not players.empty:
+    frames["players"] = players.rename(columns={"teamId": "team_id"}).assign(season=season, snapshot=snapshot)
+
+  # Long form (one row per team and position, a column per stat), so a
+  # position filter is a plain predicate.
+  if data.get("defense_tensor"):
+    tensor = DefenseTensor.from_json(data["defense_tensor"])
+    defense = [
+      {"team_id": team, "position": position, **dict(zip(tensor.stats, tensor.values[t, p].tolist()))}
+      for t, team in enumerate(tensor.teams)
+      for p, position in enumerate(tensor.positions)
+    ]
+  else:
+    defense = [
+      {"team_id": team_id, "position": position, "points": float(allowed)}
+      for team_id, row in data.get("defense_vs_position", {}).items()
+      for position, allowed in row.items()
+    ]
+  if defense:
+    frames["defense"] = pd.DataFrame(defense).assign(season=season)
+  return frames
+
+
+def _write_table(df: "pd.DataFrame", spec: TableSpec, root: Path, *, fmt: str, snapshot: str) -> None:
+  import pandas as pd
+  import pyarrow as pa
+  import pyarrow.dataset as ds
+
+  df = df.sort_values([c for c in spec.sort_by if c in df.columns], kind="stable")
+  # Plain strings rather than categoricals: Arrow does not prune row groups on
+  # dictionary columns. Parquet dictionary-encodes them on disk all the same.
+  categorical = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+  df = df.astype({c: str for c in (*categorical, *spec.partition_by)})
+  table = pa.Table.from_pandas(df, preserve_index=False)
+
+  file_format = ds.ParquetFileFormat() if fmt == "parquet" else ds.IpcFileFormat()
+  # Arrow IPC is left uncompressed so readers can memory-map it without a decode step.
+  options = file_format.make_write_options(compression="zstd" if fmt == "parquet" else None)
+  stem = f"snapshot-{snapshot}" if spec.keep_history else "part"
+  ds.write_dataset(
+    table,
+    str(root / spec.name),
+    format=file_format,
+    file_options=options,
+    partitioning=_partitioning(spec),
+    basename_template=f"{stem}-{{i}}.{_EXTENSIONS[fmt]}",
+    # Replace this export's partitions only; other seasons and teams stay as they are.
+    existing_data_behavior="overwrite_or_ignore" if spec.keep_history else "delete_matching",
+    max_rows_per_group=ROW_GROUP_ROWS,
+    min_rows_per_group=min(ROW_GROUP_ROWS, max(1, len(df))),
+    use_threads=False,
+  )
+
+
+def _partitioning(spec: TableSpec) -> Any:
+  import pyarrow as pa
+  import pyarrow.dataset as ds
+
+  return ds.partitioning(pa.schema([(c, pa.string()) for c in spec.partition_by]), flavor="hive")
+
+
+def export_analytics(
+  out_dir: str | Path,
+  data: dict[str, Any],
+  *,
+  game_logs: "pd.DataFrame | None" = None,
+  season: str,
+  fmt: str = "parquet",
+  snapshot: str | None = None,
+) -> dict[str, int]:
+  """Write game logs, player snapshots and the defense matrix as Hive-partitioned datasets.
+
+  Layout is ``<out_dir>/<table>/season=<season>/team_id=<team>/*.parquet``
+  (the defense table is partitioned by season only). ``season`` must be a
+  concrete label (see ``partition_season``). Re-exporting a season replaces
+  its partitions. Player snapshots accumulate, one file per day.
+  Returns the rows written per table.
+  """
+  if fmt not in FORMATS:
+    raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+  _require_pyarrow()
+
+  snapshot = snapshot or datetime.date.today().isoformat()
+  root = Path(out_dir)
+  written: dict[str, int] = {}
+  for name, df in analytics_frames(data, game_logs=game_logs, season=season, snapshot=snapshot).items():
+    _write_table(df, TABLES[name], root, fmt=fmt, snapshot=snapshot)
+    written[name] = len(df)
+  return written
+
+
+def open_dataset(root: str | Path, table: str, *, memory_map: bool = True) -> Any:
+  """A ``pyarrow.dataset.Dataset`` over one exported table.
+
+  With ``memory_map``, files are mapped rather than read. Only the pages
+  holding the requested columns and row groups are touched, and Arrow IPC
+  columns are used in place without a copy.
+  """
+  _require_pyarrow()
+  import pyarrow.dataset as ds
+  from pyarrow import fs
+
+  path = Path(root) / table
+  if not path.is_dir():
+    raise FileNotFoundError(f"No exported {table!r} table under {root}")
+  fmt = "ipc" if next(path.rglob("*.arrow"), None) is not None else "parquet"
+  return ds.dataset(
+    str(path),
+    format=fmt,
+    partitioning=_partitioning(TABLES[table]),
+    filesystem=fs.LocalFileSystem(use_mmap=memory_map),
+  )
+
+
+def where_expression(dataset: Any, where: dict[str, Any] | None) -> Any:
+  """``{"position": "C", "round": [1, 2]}`` -> a pushdown filter; lists mean "any of"."""
+  import pyarrow as pa
+  import pyarrow.dataset as ds
+
+  expression = None
+  for column, value in (where or {}).items():
+    values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+    if column not in dataset.schema.names:
+      raise ValueError(f"Unknown column {column!r}; expected one of {', '.join(dataset.schema.names)}")
+    # Cast to the column's type, so "5" from the command line matches an integer column.
+    typed = pa.array(values).cast(dataset.schema.field(column).type)
+    term = ds.field(column) == typed[0] if len(typed) == 1 else ds.field(column).isin(typed)
+    expression = term if expression is None else expression & term
+  return expression
+
+
+def read_table(
+  root: str | Path,
+  table: str,
+  *,
+  columns: list[str] | None = None,
+  where: dict[str, Any] | None = None,
+  memory_map: bool = True,
+) -> "pd.DataFrame":
+  """Read only ``columns`` of the rows matching ``where`` from an exported table.
+
+  Partition filters (``season``, ``team_id``) skip whole directories; the
+  rest are checked against row-group statistics before any data is read.
+  """
+  dataset = open_dataset(root, table, memory_map=memory_map)
+  return dataset.to_table(columns=columns, filter=where_expression(dataset, where)).to_pandas()
+
+
+def scan_plan(
+  root: str | Path,
+  table: str,
+  *,
+  columns: list[str] | None = None,
+  where: dict[str, Any] | None = None,
+) -> dict[str, int]:
+  """How much of the table ``read_table`` would touch for this query.
+
+  For Parquet, bytes are the compressed column chunks of the surviving row
+  groups. For Arrow IPC, they are the sizes of the files left after
+  partition pruning.
+  """
+  import pyarrow.dataset as ds
+
+  dataset = open_dataset(root, table)
+  expression = where_expression(dataset, where)
+  wanted = set(columns or dataset.schema.names) | set(where or {})
+  plan = {"files": 0, "filesTotal": len(dataset.files), "rowGroups": 0, "bytes": 0, "bytesTotal": 0}
+  plan["bytesTotal"] = sum(Path(f).stat().st_size for f in dataset.files)
+
+  for fragment in dataset.get_fragments(filter=expression):
+    plan["files"] += 1
+    if not isinstance(fragment, ds.ParquetFileFragment):
+      plan["bytes"] += Path(fragment.path).stat().st_size
+      continue
+    metadata = fragment.metadata
+    for piece in fragment.split_by_row_group(expression, schema=dataset.schema):
+      for row_group in piece.row_groups:
+        plan["rowGroups"] += 1
+        meta = metadata.row_group(row_group.id)
+        for i in range(meta.num_columns):
+          chunk = meta.column(i)
+          if chunk.path_in_schema in wanted:
+            plan["bytes"] += chunk.total_compressed_size
+  return plan
+
+
+def _parse_where(values: list[str]) -> dict[str, Any]:
+  where: dict[str, Any] = {}
+  for value in values:
+    column, sep, rhs = value.partition("=")
+    if not sep:
+      raise SystemExit(f"--where expects COLUMN=VALUE[,VALUE...], got {value!r}")
+    parts = rhs.split(",")
+    where[column] = parts if len(parts) > 1 else parts[0]
+  return where
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Export game logs, player snapshots and defense stats as partitioned Parquet/Arrow, and query them."
+  )
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  write = commands.add_parser("write", help="Export a data.json (and its raw game logs).")
+  write.add_argument("--data", default="resources/data.json", help="data.json for player snapshots and defense stats.")
+  write.add_argument("--raw", default=None, help="Raw input JSON with player_game_logs.")
+  write.add_argument("--season", required=True, help="Season label for the partitions, e.g. 2024 or 2024-25.")
+  write.add_argument("--format", choices=FORMATS, default="parquet")
+  write.add_argument("--out", required=True, help="Dataset root directory.")
+
+  query = commands.add_parser("query", help="Read a filtered column subset of one table.")
+  query.add_argument("--root", required=True, help="Dataset root directory.")
+  query.add_argument("--table", choices=sorted(TABLES), default="game_logs")
+  query.add_argument("--columns", default=None, help="Comma-separated columns (default: all).")
+  query.add_argument("--where", action="append", default=[], help="COLUMN=VALUE[,VALUE...]; repeat to AND.")
+  query.add_argument("--explain", action="store_true", help="Also print how many files and bytes the query touches.")
+  args = parser.parse_args(argv)
+
+  if args.command == "write":
+    from raw_dataset import load_raw_dataset
+
+    data = json.loads(Path(args.data).read_text(encoding="utf-8"))
+    game_logs = load_raw_dataset(args.raw).game_logs() if args.raw else None
+    try:
+      written = export_analytics(args.out, data, game_logs=game_logs, season=args.season, fmt=args.format)
+    except ValueError as e:
+      raise SystemExit(str(e))
+    print(f"Wrote {written} to {args.out}")
+    return 0
+
+  columns = args.columns.split(",") if args.columns else None
+  where = _parse_where(args.where)
+  df = read_table(args.root, args.table, columns=columns, where=where)
+  print(df.to_string(max_rows=40))
+  if args.explain:
+    print(json.dumps(scan_plan(args.root, args.table, columns=columns, where=where), indent=2))
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import re
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+from fetcher import Fetcher, PageCache
+
+PLAYER_THUMB_SIZE = (120, 160)
+TEAM_THUMB_SIZE = (128, 128)
+SPRITE_CELL = 64
+
+# Anything smaller is a tracking pixel or placeholder, not a crest or headshot.
+MIN_IMAGE_SIDE = 48
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+CONTENT_TYPES = {
+  "png": "image/png",
+  "jpeg": "image/jpeg",
+  "gif": "image/gif",
+  "webp": "image/webp",
+  "svg": "image/svg+xml",
+}
+
+
+class InvalidImage(ValueError):
+  pass
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+  format: str
+  width: int
+  height: int
+
+  @property
+  def content_type(self) -> str:
+    return CONTENT_TYPES[self.format]
+
+
+def _svg_size(head: bytes) -> tuple[int, int]:
+  text = head.decode("utf-8", errors="replace")
+  tag = re.search(r"<svg\b[^>]*>", text, flags=re.IGNORECASE | re.DOTALL)
+  if not tag:
+    return 0, 0
+  attrs = tag.group(0)
+
+  def number(name: str) -> float | None:
+    m = re.search(rf"\b{name}\s*=\s*[\"']\s*([0-9.]+)\s*(?:px)?\s*[\"']", attrs)
+    return float(m.group(1)) if m else None
+
+  width, height = number("width"), number("height")
+  if width is None or height is None:
+    view_box = re.search(r"viewBox\s*=\s*[\"']([^\"']+)[\"']", attrs)
+    if view_box:
+      parts = view_box.group(1).replace(",", " ").split()
+      if len(parts) == 4:
+        width, height = float(parts[2]), float(parts[3])
+  return int(width or 0), int(height or 0)
+
+
+def _jpeg_size(body: bytes) -> tuple[int, int]:
+  i = 2
+  while i + 9 < len(body):
+    if body[i] != 0xFF:
+      i += 1
+      continue
+    marker = body[i + 1]
+    if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+      i += 1 if marker == 0xFF else 2
+      continue
+    (length,) = struct.unpack(">H", body[i + 2:i + 4])
+    # SOF0..SOF15, excluding DHT (C4), JPG (C8) and DAC (CC).
+    if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+      height, width = struct.unpack(">HH", body[i + 5:i + 9])
+      return width, height
+    i += 2 + length
+  return 0, 0
+
+
+def _webp_size(body: bytes) -> tuple[int, int]:
+  chunk = body[12:16]
+  if chunk == b"VP8 " and len(body) >= 30:
+    width, height = struct.unpack("<HH", body[26:30])
+    return width & 0x3FFF, height & 0x3FFF
+  if chunk == b"VP8L" and len(body) >= 25:
+    bits = int.from_bytes(body[21:25], "little")
+    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+  if chunk == b"VP8X" and len(body) >= 30:
+    width = int.from_bytes(body[24:27], "little") + 1
+    height = int.from_bytes(body[27:30], "little") + 1
+    return width, height
+  return 0, 0
+
+
+def sniff_image(body: bytes) -> ImageInfo | None:
+  """Identify an image from its leading bytes; only the header is read, never decoded."""
+  if body.startswith(b"\x89PNG\r\n\x1a\n") and len(body) >= 24:
+    width, height = struct.unpack(">II", body[16:24])
+    return ImageInfo("png", width, height)
+  if body.startswith(b"\xff\xd8"):
+    width, height = _jpeg_size(body)
+    return ImageInfo("jpeg", width, height)
+  if body[:6] in (b"GIF87a", b"GIF89a") and len(body) >= 10:
+    width, height = struct.unpack("<HH", body[6:10])
+    return ImageInfo("gif", width, height)
+  if body[:4] == b"RIFF" and body[8:12] == b"WEBP":
+    width, height = _webp_size(body)
+    return ImageInfo("webp", width, height)
+
+  head = body[:2048].lstrip()
+  if head.startswith(b"<?xml") or head[:4].lower() == b"<svg":
+    if b"<svg" in head.lower():
+      width, height = _svg_size(head)
+      return ImageInfo("svg", width, height)
+  return None
+
+
+def validate_image(body: bytes, *, min_side: int = MIN_IMAGE_SIDE) -> ImageInfo:
+  # The type is sniffed from the bytes rather than trusted from headers: CDNs
+  # answer some misses with an HTML page and a 200, and cached bodies carry no headers.
+  if not body:
+    raise InvalidImage("empty body")
+  if len(body) > MAX_IMAGE_BYTES:
+    raise InvalidImage(f"too large ({len(body)} bytes)")
+
+  info = sniff_image(body)
+  if info is None:
+    raise InvalidImage("not an image")
+  # SVGs without explicit dimensions scale freely, so only raster sizes are enforced.
+  if info.format == "svg" and not (info.width and info.height):
+    return info
+  if min(info.width, info.height) < min_side:
+    raise InvalidImage(f"too small ({info.width}x{info.height})")
+  return info
+
+
+def _thumbnail(body: bytes, size: tuple[int, int], *, fit: bool) -> Any:
+  from PIL import Image, ImageOps
+
+  with Image.open(io.BytesIO(body)) as image:
+    image = image.convert("RGBA")
+    if fit:
+      # Headshots: fill the frame, keeping faces (the top of the crop) in view.
+      return ImageOps.fit(image, size, method=Image.LANCZOS, centering=(0.5, 0.2))
+    # Crests: letterbox onto a transparent square so nothing is cut off.
+    image.thumbnail(size, Image.LANCZOS)
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    canvas.paste(image, ((size[0] - image.width) // 2, (size[1] - image.height) // 2))
+    return canvas
+
+
+def _placeholder(size: tuple[int, int], label: str) -> Any:
+  """A neutral tile with the team's initials, for crests that cannot be rasterised here."""
+  from PIL import Image, ImageDraw
+
+  canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+  draw = ImageDraw.Draw(canvas)
+  inset = min(size) // 8
+  draw.ellipse((inset, inset, size[0] - inset, size[1] - inset), fill=(90, 98, 112, 255))
+  text = "".join(word[0] for word in label.split()[:3]).upper() or "?"
+  draw.text((size[0] / 2, size[1] / 2), text, fill=(255, 255, 255, 255), anchor="mm")
+  return canvas
+
+
+def _svg_thumbnail(body: bytes, size: tuple[int, int], *, fit: bool, label: str) -> Any:
+  # cairosvg is optional: without it, SVGs get a placeholder tile rather than no thumbnail.
+  try:
+    import cairosvg
+  except ImportError:
+    return _placeholder(size, label)
+  png = cairosvg.svg2png(bytestring=body, output_width=size[0] * 2)
+  return _thumbnail(png, size, fit=fit)
+
+
+def render_thumbnail(body: bytes, info: ImageInfo, *, kind: str, label: str = "") -> Any:
+  """Decode ``body`` into the thumbnail for ``kind``; raises InvalidImage when it does not decode.
+
+  The header check in ``validate_image`` passes truncated or corrupt files,
+  so this full decode is the real test of a candidate.
+  """
+  size, fit = (TEAM_THUMB_SIZE, False) if kind == "teams" else (PLAYER_THUMB_SIZE, True)
+  try:
+    if info.format == "svg":
+      return _svg_thumbnail(body, size, fit=fit, label=label)
+    return _thumbnail(body, size, fit=fit)
+  except Exception as e:  # Pillow and cairosvg raise a variety of errors on bad input
+    raise InvalidImage(f"does not decode ({type(e).__name__}: {e})") from e
+
+
+def _have_pillow() -> bool:
+  try:
+    import PIL  # noqa: F401
+  except ImportError:
+    return False
+  return True
+
+
+def resolve_image(
+  candidates: list[str],
+  *,
+  fetcher: Fetcher,
+  min_side: int = MIN_IMAGE_SIDE,
+  render: Callable[[bytes, ImageInfo], Any] | None = None,
+) -> tuple[dict[str, Any], bytes | None, Any]:
+  """Fetch ``candidates`` best-first and return the first one that validates.
+
+  With ``render``, a candidate must also decode: whatever ``render`` returns
+  (a thumbnail) comes back as the third element, and an ``InvalidImage``
+  from it moves on to the next candidate.
+  """
+  rejected: list[dict[str, str]] = []
+  fetch_failed = False
+  for rank, url in enumerate(candidates):
+    try:
+      body = fetcher.get_bytes(url)
+    except requests.RequestException as e:
+      # A 404/410 is a definite answer about the image; anything else may be transient.
+      status = getattr(e.response, "status_code", None)
+      fetch_failed = fetch_failed or status not in (404, 410)
+      rejected.append({"url": url, "reason": f"{type(e).__name__}: {e}"})
+      continue
+    try:
+      info = validate_image(body, min_side=min_side)
+      rendered = render(body, info) if render is not None else None
+    except InvalidImage as e:
+      rejected.append({"url": url, "reason": str(e)})
+      continue
+    entry = {
+      "source": url,
+      "rank": rank,
+      "contentType": info.content_type,
+      "width": info.width,
+      "height": info.height,
+      "bytes": len(body),
+      "rejected": rejected,
+    }
+    return entry, body, rendered
+
+  # Only claim the image is broken when every candidate was actually inspected.
+  return {"source": None, "rejected": rejected, "fetchFailed": fetch_failed}, None, None
+
+
+def build_assets(
+  *,
+  teams: list[dict[str, Any]],
+  players: list[dict[str, Any]],
+  out_dir: str | Path,
+  fetcher: Fetcher | None = None,
+  workers: int = 8,
+) -> dict[str, Any]:
+  """Prefetch, validate and thumbnail every team logo and player headshot.
+
+  Teams and players are updated in place: ``logoUrl``/``imageUrl`` point at the
+  first candidate that validated, or become empty when every candidate was
+  fetched and rejected. Candidates come from ``logoCandidates``/``imageCandidates``
+  when the scraper recorded them, otherwise the current URL is the only one.
+  """
+  out = Path(out_dir)
+  fetcher = fetcher or Fetcher()
+  thumbs = _have_pillow()
+  if not thumbs:
+    print("Pillow is not installed; validating images only (pip install Pillow for thumbnails).")
+
+  jobs: list[tuple[str, dict[str, Any], str, list[str]]] = []
+  for team in teams:
+    candidates = team.get("logoCandidates") or [team.get("logoUrl", "")]
+    jobs.append(("teams", team, "logoUrl", [c for c in candidates if c]))
+  for player in players:
+    candidates = player.get("imageCandidates") or [player.get("imageUrl", "")]
+    jobs.append(("players", player, "imageUrl", [c for c in candidates if c]))
+
+  def run(job: tuple[str, dict[str, Any], str, list[str]]) -> dict[str, Any]:
+    kind, item, key, candidates = job
+    label = str(item.get("name", ""))
+    entry, body, image = resolve_image(
+      candidates,
+      fetcher=fetcher,
+      render=(lambda b, info: render_thumbnail(b, info, kind=kind, label=label)) if thumbs else None,
+    )
+    entry["id"] = str(item.get("id", ""))
+    if image is None:
+      return entry
+
+    if kind == "teams":
+      path = out / "thumbs" / kind / f"{entry['id']}.png"
+      path.parent.mkdir(parents=True, exist_ok=True)
+      image.save(path, optimize=True)
+    else:
+      path = out / "thumbs" / kind / f"{entry['id']}.jpg"
+      path.parent.mkdir(parents=True, exist_ok=True)
+      image.convert("RGB").save(path, quality=85, optimize=True)
+    entry["thumb"] = path.relative_to(out).as_posix()
+    return entry
+
+  start = time.perf_counter()
+  # Image fetches are I/O-bound and Pillow releases the GIL while resampling.
+  with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+    entries = list(pool.map(run, jobs))
+
+  manifest: dict[str, Any] = {"teams": {}, "players": {}}
+  for (kind, item, key, _), entry in zip(jobs, entries):
+    if entry["source"] is not None:
+      item[key] = entry["source"]
+    elif not entry["fetchFailed"]:
+      item[key] = ""
+    manifest[kind][entry.pop("id")] = entry
+
+  if thumbs:
+    manifest["sprite"] = build_team_sprite(manifest["teams"], out_dir=out)
+
+  broken = sum(1 for kind in ("teams", "players") for e in manifest[kind].values() if e["source"] is None)
+  fallbacks = sum(1 for kind in ("teams", "players") for e in manifest[kind].values() if e.get("rank"))
+  manifest["summary"] = {
+    "images": len(entries),
+    "broken": broken,
+    "fallbacks": fallbacks,
+    "seconds": round(time.perf_counter() - start, 2),
+    "fetch": fetcher.stats.as_dict(),
+  }
+
+  out.mkdir(parents=True, exist_ok=True)
+  (out / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+  return manifest
+
+
+def build_team_sprite(team_entries: dict[str, dict[str, Any]], *, out_dir: Path) -> dict[str, Any]:
+  """Pack team thumbnails into one sheet so the app loads every crest in a single request."""
+  from PIL import Image
+
+  ids = sorted(team_id for team_id, e in team_entries.items() if e.get("thumb"))
+  if not ids:
+    return {}
+
+  columns = math.ceil(math.sqrt(len(ids)))
+  rows = math.ceil(len(ids) / columns)
+  sheet = Image.new("RGBA", (columns * SPRITE_CELL, rows * SPRITE_CELL), (0, 0, 0, 0))
+  frames: dict[str, dict[str, int]] = {}
+  for index, team_id in enumerate(ids):
+    x, y = (index % columns) * SPRITE_CELL, (index // columns) * SPRITE_CELL
+    with Image.open(out_dir / team_entries[team_id]["thumb"]) as thumb:
+      sheet.paste(thumb.resize((SPRITE_CELL, SPRITE_CELL), Image.LANCZOS), (x, y))
+    frames[team_id] = {"x": x, "y": y, "w": SPRITE_CELL, "h": SPRITE_CELL}
+
+  sheet.save(out_dir / "team_logos.png", optimize=True)
+  return {"image": "team_logos.png", "cell": SPRITE_CELL, "frames": frames}
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Prefetch, validate and thumbnail the images referenced by a data.json."
+  )
+  parser.add_argument("--data", default="resources/data.json", help="data.json to read and update.")
+  parser.add_argument("--out", default="resources/images", help="Directory for thumbnails, sprite and manifest.")
+  parser.add_argument("--workers", type=int, default=8, help="Concurrent image fetches.")
+  parser.add_argument("--cache-dir", default=None, help="Cache downloaded images on disk here.")
+  parser.add_argument(
+    "--write",
+    action="store_true",
+    help="Write validated image URLs back into --data.",
+  )
+  args = parser.parse_args(argv)
+
+  path = Path(args.data)
+  data = json.loads(path.read_text(encoding="utf-8"))
+  cache = PageCache(args.cache_dir, namespace="images") if args.cache_dir else None
+  manifest = build_assets(
+    teams=data.get("teams", []),
+    players=data.get("players", []),
+    out_dir=args.out,
+    fetcher=Fetcher(cache=cache),
+    workers=args.workers,
+  )
+  print(json.dumps(manifest["summary"], indent=2))
+
+  if args.write:
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import euro_scraper
+from tip_model import LEAGUE_AVERAGE_PTS, TipParams
+
+# Decimal odds assumed for every over; the scraped data has no bookmaker lines or prices.
+DEFAULT_ODDS = 1.91
+
+# Configurations evaluated per NumPy broadcast inside a worker; bounds memory
+# at roughly rows x CONFIG_BATCH x 8 bytes per temporary.
+CONFIG_BATCH = 64
+
+
+PARAM_NAMES = tuple(TipParams.__dataclass_fields__)
+
+
+def build_features(player_game_logs: "pd.DataFrame", *, min_history: int = 3) -> dict[str, "np.ndarray"]:
+  """Point-in-time model inputs for every logged game, from strictly earlier rounds.
+
+  Each row is a dated snapshot: the player's season and last-5 averages and the
+  opponent's points allowed to the position are computed only from games
+  before that round of the same season. Rounds restart every season, so rows
+  are ordered by ``rolling_stats.season_order`` and then round. The actual
+  points scored are the outcome. Rows with fewer than ``min_history`` prior
+  games that season, for the player or the opponent/position pair, are
+  dropped. Everything uses grouped cumulative sums, so there is no per-player
+  loop.
+  """
+  import numpy as np
+  import pandas as pd
+
+  from rolling_stats import season_order
+
+  season = season_order(player_game_logs)
+  df = pd.DataFrame(
+    {
+      "player_id": player_game_logs["player_id"].astype(str),
+      "season": season,
+      "opponent": player_game_logs["opponent_team_id"].astype(str),
+      "position": player_game_logs["position"].astype(str).map(euro_scraper._normalize_position),
+      "game_id": player_game_logs["game_id"].astype(str),
+      "round": pd.to_numeric(player_game_logs["round"], errors="coerce").fillna(0),
+      "is_home": player_game_logs["is_home"].fillna(False).astype(bool),
+      "points": pd.to_numeric(player_game_logs["points"], errors="coerce").fillna(0.0),
+    }
+  )
+  df = df.sort_values(["player_id", "season", "round"], kind="stable").reset_index(drop=True)
+
+  by_player = df.groupby(["player_id", "season"], sort=False)
+  prior_games = by_player.cumcount()
+  prior_sum = by_player["points"].cumsum() - df["points"]
+  # Sum over the five games before this one: prior_sum minus prior_sum five rows back.
+  prior_sum_5_back = prior_sum.groupby([df["player_id"], df["season"]], sort=False).shift(5).fillna(0.0)
+  df["season_avg"] = prior_sum / prior_games.where(prior_games > 0)
+  df["last5_avg"] = (prior_sum - prior_sum_5_back) / prior_games.clip(upper=5).where(prior_games > 0)
+  df["player_history"] = prior_games
+
+  # Points allowed by each opponent to each position, per game, then as-of means.
+  allowed = (
+    df.groupby(["opponent", "position", "game_id"], sort=False)
+    .agg(points=("points", "sum"), season=("season", "first"), round=("round", "first"))
+    .reset_index()
+    .sort_values(["opponent", "position", "season", "round"], kind="stable")
+  )
+  by_matchup = allowed.groupby(["opponent", "position", "season"], sort=False)
+  allowed_games = by_matchup.cumcount()
+  allowed["allowed_avg"] = (by_matchup["points"].cumsum() - allowed["points"]) / allowed_games.where(
+    allowed_games > 0
+  )
+  allowed["defense_history"] = allowed_games
+  df = df.merge(
+    allowed[["opponent", "position", "game_id", "allowed_avg", "defense_history"]],
+    on=["opponent", "position", "game_id"],
+    how="left",
+  )
+
+  keep = (df["player_history"] >= min_history) & (df["defense_history"] >= min_history)
+  df = df[keep]
+  league_avg = df["position"].map(LEAGUE_AVERAGE_PTS).to_numpy(np.float64)
+  return {
+    "season_avg": df["season_avg"].to_numpy(np.float64),
+    # The market-line stand-in evaluate scores against.
+    "line": df["season_avg"].to_numpy(np.float64),
+    "last5_avg": df["last5_avg"].to_numpy(np.float64),
+    "home_sign": np.where(df["is_home"].to_numpy(bool), 1.0, -1.0),
+    "defense_ratio": df["allowed_avg"].to_numpy(np.float64) / league_avg,
+    "actual": df["points"].to_numpy(np.float64),
+    "round": df["round"].to_numpy(np.float64),
+  }
+
+
+def evaluate(
+  features: dict[str, "np.ndarray"],
+  params: "np.ndarray",
+  *,
+  odds: float = DEFAULT_ODDS,
+) -> "np.ndarray":
+  """Score a batch of configurations (rows of ``params`` in PARAM_NAMES order).
+
+  Mirrors generateTips: a matchup is green when ``allowed > leagueAverage *
+  threshold``. The scraped data has no bookmaker lines, so the player's season
+  average before the game stands in for the market line. A green matchup is
+  tipped as an over on that line when the projection is above it, and it wins
+  when the player scores more than the line. Scoring against the model's own
+  projection would reward projecting low. Returns ``[tips, hits, hit_rate,
+  roi]`` per configuration, with ROI per unit staked at ``odds``.
+  """
+  import numpy as np
+
+  threshold, recency, home_away, clamp_low, clamp_high = (params[:, i : i + 1] for i in range(5))
+  ratio = features["defense_ratio"][None, :]
+  recency_weighted = recency * features["last5_avg"] + (1.0 - recency) * features["season_avg"]
+  projected = (
+    recency_weighted
+    * (1.0 + home_away * features["home_sign"])
+    * np.minimum(np.maximum(ratio, clamp_low), clamp_high)
+  )
+
+  line = features["line"]
+  tipped = (ratio > threshold) & (projected > line)
+  tips = tipped.sum(axis=1)
+  hits = (tipped & (features["actual"] > line)).sum(axis=1)
+  with np.errstate(invalid="ignore", divide="ignore"):
+    hit_rate = np.where(tips > 0, hits / tips, 0.0)
+    roi = np.where(tips > 0, (hits * (odds - 1.0) - (tips - hits)) / tips, 0.0)
+  return np.stack([tips, hits, hit_rate, roi], axis=1)
+
+
+_WORKER_FEATURES: dict[str, Any] = {}
+
+
+def _init_worker(features: dict[str, Any], odds: float) -> None:
+  # Ship the feature arrays once per worker rather than once per chunk.
+  _WORKER_FEATURES.clear()
+  _WORKER_FEATURES.update(features)
+  _WORKER_FEATURES["__odds__"] = odds
+
+
+def _evaluate_chunk(params: "np.ndarray") -> "np.ndarray":
+  import numpy as np
+
+  odds = _WORKER_FEATURES["__odds__"]
+  return np.concatenate(
+    [
+      evaluate(_WORKER_FEATURES, params[i : i + CONFIG_BATCH], odds=odds)
+      for i in range(0, len(params), CONFIG_BATCH)
+    ]
+  )
+
+
+def parameter_grid(spec: dict[str, list[float]]) -> "np.ndarray":
+  """Cartesian product of per-parameter values; missing parameters use the app's value."""
+  import numpy as np
+
+  defaults = asdict(TipParams())
+  axes = [spec.get(name, [defaults[name]]) for name in PARAM_NAMES]
+  grid = np.array(list(itertools.product(*axes)), dtype=np.float64)
+  return grid[grid[:, 3] <= grid[:, 4]]
+
+
+def parse_axis(value: str) -> tuple[str, list[float]]:
+  """``name=a,b,c`` or ``name=start:stop:step`` (stop inclusive)."""
+  import numpy as np
+
+  name, _, raw = value.partition("=")
+  name = name.strip().replace("-", "_")
+  if name not in PARAM_NAMES:
+    raise ValueError(f"Unknown parameter {name!r}; expected one of {', '.join(PARAM_NAMES)}")
+  if ":" in raw:
+    start, stop, step = (float(v) for v in raw.split(":"))
+    values = np.arange(start, stop + step / 2, step).round(6).tolist()
+  else:
+    values = [float(v) for v in raw.split(",") if v.strip()]
+  return name, values
+
+
+DEFAULT_GRID = {
+  "threshold": [round(1.0 + 0.05 * i, 2) for i in range(9)],
+  "recency_weight": [round(0.1 * i, 1) for i in range(11)],
+  "home_away": [0.0, 0.05, 0.1, 0.15],
+  "clamp_low": [0.75, 0.8, 0.85, 0.9, 0.95],
+  "clamp_high": [1.1, 1.15, 1.2, 1.25, 1.3, 1.35, 1.4],
+}
+
+
+def run_sweep(
+  features: dict[str, "np.ndarray"],
+  grid: "np.ndarray",
+  *,
+  workers: int | None = None,
+  chunk_size: int = 512,
+  odds: float = DEFAULT_ODDS,
+) -> "np.ndarray":
+  """Evaluate every configuration in ``grid``; results are in grid order."""
+  import numpy as np
+
+  workers = workers or os.cpu_count() or 1
+  if workers <= 1 or len(grid) <= chunk_size:
+    _init_worker(features, odds)
+    return _evaluate_chunk(grid)
+
+  chunks = [grid[i : i + chunk_size] for i in range(0, len(grid), chunk_size)]
+  with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features, odds)) as pool:
+    return np.concatenate(list(pool.map(_evaluate_chunk, chunks)))
+
+
+def summarize(
+  grid: "np.ndarray",
+  results: "np.ndarray",
+  *,
+  top: int = 10,
+  min_tips: int = 50,
+) -> list[dict[str, Any]]:
+  import numpy as np
+
+  eligible = np.flatnonzero(results[:, 0] >= min_tips)
+  order = eligible[np.argsort(-results[eligible, 3], kind="stable")][:top]
+  return [_row(grid[i], results[i]) for i in order]
+
+
+def _row(params: "np.ndarray", result: "np.ndarray") -> dict[str, Any]:
+  row: dict[str, Any] = {name: round(float(v), 4) for name, v in zip(PARAM_NAMES, params)}
+  row.update(
+    {
+      "tips": int(result[0]),
+      "hits": int(result[1]),
+      "hitRate": round(float(result[2]), 4),
+      "roi": round(float(result[3]), 4),
+    }
+  )
+  return row
+
+
+def _load_logs(args: argparse.Namespace) -> "pd.DataFrame":
+  from records import GameLogColumns
+
+  if args.logs:
+    raw = json.loads(Path(args.logs).read_text(encoding="utf-8"))
+    rows = raw.get("player_game_logs", raw) if isinstance(raw, dict) else raw
+    return GameLogColumns.from_records(rows).to_dataframe()
+
+  import corpus
+
+  league = corpus.synthetic_league(seed=args.seed)
+  return GameLogColumns.from_records(
+    corpus.synthetic_game_logs(league, games_per_team=args.games, seed=args.seed)
+  ).to_dataframe()
+
+
+def main(argv: list[str] | None = None) -> int:
+  import numpy as np
+
+  parser = argparse.ArgumentParser(
+    description="Backtest AnalysisEngine's green-light parameters against historical game logs."
+  )
+  parser.add_argument(
+    "--logs",
+    default=None,
+    help="JSON with player_game_logs (raw_input.json shape). Defaults to a synthetic season.",
+  )
+  parser.add_argument("--games", type=int, default=34, help="Synthetic games per team.")
+  parser.add_argument("--seed", type=int, default=11)
+  parser.add_argument(
+    "--grid",
+    action="append",
+    default=None,
+    help=(
+      "Sweep axis, e.g. threshold=1.0:1.4:0.05 or recency_weight=0.4,0.6,0.8; repeat per "
+      f"parameter ({', '.join(PARAM_NAMES)}). Defaults to a ~14k-configuration grid."
+    ),
+  )
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+  parser.add_argument("--chunk-size", type=int, default=512, help="Configurations per pool task.")
+  parser.add_argument("--odds", type=float, default=DEFAULT_ODDS, help="Decimal odds assumed per tip.")
+  parser.add_argument("--min-history", type=int, default=3, help="Prior games required per snapshot.")
+  parser.add_argument("--min-tips", type=int, default=50, help="Ignore configurations with fewer tips.")
+  parser.add_argument("--top", type=int, default=10)
+  parser.add_argument("--report", default=None, help="Write the report to this JSON path.")
+  args = parser.parse_args(argv)
+
+  spec = dict(parse_axis(v) for v in args.grid) if args.grid else DEFAULT_GRID
+  grid = parameter_grid(spec)
+
+  start = time.perf_counter()
+  features = build_features(_load_logs(args), min_history=args.min_history)
+  feature_seconds = time.perf_counter() - start
+
+  start = time.perf_counter()
+  results = run_sweep(features, grid, workers=args.workers, chunk_size=args.chunk_size, odds=args.odds)
+  sweep_seconds = time.perf_counter() - start
+
+  current = np.array([list(asdict(TipParams()).values())])
+  _init_worker(features, args.odds)
+  report = {
+    "snapshots": int(len(features["actual"])),
+    "configurations": int(len(grid)),
+    "featureSeconds": round(feature_seconds, 2),
+    "sweepSeconds": round(sweep_seconds, 2),
+    "odds": args.odds,
+    "current": _row(current[0], _evaluate_chunk(current)[0]),
+    "best": summarize(grid, results, top=args.top, min_tips=args.min_tips),
+  }
+  print(json.dumps(report, indent=2))
+  if args.report:
+    Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import corpus
+import euro_scraper
+import rolling_stats
+
+DEFAULT_BASELINE = Path(__file__).parent / "bench_baseline.json"
+
+# Differences below this many microseconds per call are treated as timer noise.
+NOISE_FLOOR_US = 2.0
+
+
+@dataclass(frozen=True)
+class BenchCase:
+  name: str
+  func: Callable[..., Any]
+  inputs: list[tuple[tuple[Any, ...], dict[str, Any]]]
+
+
+@contextlib.contextmanager
+def offline_pages(pages: dict[str, str]) -> Iterator[None]:
+  """Serve ``pages`` (keyed by absolute URL) in place of the network."""
+
+  def fetch(url: str) -> str:
+    try:
+      return pages[url]
+    except KeyError:
+      raise RuntimeError(f"Benchmark attempted to fetch an unrecorded URL: {url}") from None
+
+  def refuse(*args: Any, **kwargs: Any) -> Any:
+    raise RuntimeError("Benchmarks must run offline.")
+
+  original_fetch = euro_scraper._get_html
+  original_request = euro_scraper.requests.Session.request
+  euro_scraper._get_html = fetch
+  euro_scraper.requests.Session.request = refuse
+  try:
+    yield
+  finally:
+    euro_scraper._get_html = original_fetch
+    euro_scraper.requests.Session.request = original_request
+
+
+def build_cases(pages: list[dict[str, str]]) -> list[BenchCase]:
+  import pandas as pd
+
+  rosters = [p for p in pages if p["kind"] == "roster"]
+  players = [p for p in pages if p["kind"] == "player"]
+
+  team_logo_inputs = []
+  for page in rosters:
+    soup = euro_scraper._soup_from_html(page["html"])
+    title = euro_scraper._extract_og_meta(soup, "og:title").replace("| EuroLeague", "").strip()
+    team_logo_inputs.append(((), {"soup": soup, "html": page["html"], "team_name": title}))
+
+  player_image_inputs = []
+  for page in players:
+    soup = euro_scraper._soup_from_html(page["html"])
+    player_id = page["path"].rstrip("/").rsplit("/", 1)[-1]
+    title = euro_scraper._extract_og_meta(soup, "og:title").replace("| EuroLeague", "").strip()
+    player_image_inputs.append(
+      ((), {"soup": soup, "html": page["html"], "player_name": title, "player_id": player_id})
+    )
+
+  league = corpus.synthetic_league()
+  game_logs = pd.DataFrame(corpus.synthetic_game_logs(league))
+
+  return [
+    BenchCase(
+      name="scrape_player_details",
+      func=euro_scraper.scrape_player_details,
+      inputs=[((euro_scraper._absolute_url(p["path"]),), {}) for p in players],
+    ),
+    BenchCase(
+      name="_pick_best_team_logo_url",
+      func=euro_scraper._pick_best_team_logo_url,
+      inputs=team_logo_inputs,
+    ),
+    BenchCase(
+      name="_pick_best_player_image_url",
+      func=euro_scraper._pick_best_player_image_url,
+      inputs=player_image_inputs,
+    ),
+    BenchCase(
+      name="_extract_all_media_image_urls",
+      func=euro_scraper._extract_all_media_image_urls,
+      inputs=[((p["html"],), {}) for p in pages],
+    ),
+    BenchCase(
+      name="calculate_defense_vs_position",
+      func=euro_scraper.calculate_defense_vs_position,
+      inputs=[((game_logs,), {})],
+    ),
+    BenchCase(
+      name="rolling_player_stats",
+      func=rolling_stats.rolling_player_stats,
+      inputs=[((game_logs,), {})],
+    ),
+  ]
+
+
+def _run_once(case: BenchCase) -> None:
+  for args, kwargs in case.inputs:
+    case.func(*args, **kwargs)
+
+
+def time_case(case: BenchCase, *, repeat: int, min_time: float) -> dict[str, float]:
+  _run_once(case)
+
+  # Calibrate the loop count so every sample spans at least ``min_time`` seconds.
+  number = 1
+  while True:
+    start = time.perf_counter()
+    for _ in range(number):
+      _run_once(case)
+    elapsed = time.perf_counter() - start
+    if elapsed >= min_time or number >= 1 << 16:
+      break
+    number *= 2
+
+  calls = number * len(case.inputs)
+  samples: list[float] = []
+  gc_was_enabled = gc.isenabled()
+  gc.disable()
+  try:
+    for _ in range(repeat):
+      start = time.perf_counter()
+      for _ in range(number):
+        _run_once(case)
+      samples.append((time.perf_counter() - start) / calls * 1e6)
+  finally:
+    if gc_was_enabled:
+      gc.enable()
+
+  return {
+    "min_us": round(min(samples), 3),
+    "median_us": round(statistics.median(samples), 3),
+    "calls_per_sample": calls,
+  }
+
+
+def measure_allocations(case: BenchCase) -> dict[str, float]:
+  """Peak traced bytes of a single call and blocks it leaves allocated, per input."""
+  gc.collect()
+  tracemalloc.start()
+  try:
+    peak = 0
+    retained_blocks = 0
+    for args, kwargs in case.inputs:
+      gc.collect()
+      before_snapshot = tracemalloc.take_snapshot()
+      before_current, _ = tracemalloc.get_traced_memory()
+      tracemalloc.reset_peak()
+      result = case.func(*args, **kwargs)
+      _, call_peak = tracemalloc.get_traced_memory()
+      del result
+      gc.collect()
+      after_snapshot = tracemalloc.take_snapshot()
+      peak = max(peak, call_peak - before_current)
+      retained_blocks += sum(
+        stat.count_diff for stat in after_snapshot.compare_to(before_snapshot, "filename")
+      )
+  finally:
+    tracemalloc.stop()
+
+  return {
+    "peak_kib": round(peak / 1024, 1),
+    "blocks_per_call": round(retained_blocks / max(1, len(case.inputs)), 1),
+  }
+
+
+def run_benchmarks(
+  *,
+  fixtures_dir: Path = corpus.FIXTURES_DIR,
+  only: list[str] | None = None,
+  repeat: int = 7,
+  min_time: float = 0.05,
+) -> dict[str, dict[str, float]]:
+  pages = corpus.load_corpus(fixtures_dir)
+  by_url = {euro_scraper._absolute_url(p["path"]): p["html"] for p in pages}
+
+  results: dict[str, dict[str, float]] = {}
+  with offline_pages(by_url):
+    for case in build_cases(pages):
+      if only and case.name not in only:
+        continue
+      timing = time_case(case, repeat=repeat, min_time=min_time)
+      allocations = measure_allocations(case)
+      results[case.name] = {**timing, **allocations}
+      print(
+        f"{case.name:<32} min {timing['min_us']:>10.1f} us  "
+        f"median {timing['median_us']:>10.1f} us  "
+        f"peak {allocations['peak_kib']:>8.1f} KiB  "
+        f"blocks {allocations['blocks_per_call']:>7.1f}"
+      )
+
+  return results
+
+
+def compare_to_baseline(
+  results: dict[str, dict[str, float]],
+  baseline: dict[str, dict[str, float]],
+  *,
+  time_threshold: float,
+  memory_threshold: float,
+) -> list[str]:
+  """Print a comparison table and return the names of regressed functions."""
+  regressions: list[str] = []
+  print(f"\n{'function':<32} {'baseline us':>12} {'current us':>12} {'delta':>8}  {'peak KiB':>17}")
+  for name, current in results.items():
+    base = baseline.get(name)
+    if base is None:
+      print(f"{name:<32} {'-':>12} {current['min_us']:>12.1f} {'new':>8}")
+      continue
+
+    time_delta = (current["min_us"] - base["min_us"]) / base["min_us"] if base["min_us"] else 0.0
+    memory_delta = (
+      (current["peak_kib"] - base["peak_kib"]) / base["peak_kib"] if base["peak_kib"] else 0.0
+    )
+    slower = (
+      time_delta > time_threshold and current["min_us"] - base["min_us"] > NOISE_FLOOR_US
+    )
+    heavier = memory_delta > memory_threshold
+    flag = ""
+    if slower or heavier:
+      regressions.append(name)
+      flag = "  REGRESSED" + (" (time)" if slower else "") + (" (memory)" if heavier else "")
+
+    print(
+      f"{name:<32} {base['min_us']:>12.1f} {current['min_us']:>12.1f} {time_delta:>+8.1%}  "
+      f"{base['peak_kib']:>8.1f}->{current['peak_kib']:<8.1f}{flag}"
+    )
+
+  return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Offline microbenchmarks for the scraper extractors over the saved fixture corpus."
+  )
+  parser.add_argument("--fixtures", default=str(corpus.FIXTURES_DIR), help="Fixture corpus directory.")
+  parser.add_argument("--only", action="append", help="Benchmark only this function (repeatable).")
+  parser.add_argument("--repeat", type=int, default=7, help="Timing samples per function.")
+  parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per sample.")
+  parser.add_argument("--json", default=None, help="Also write raw results to this path.")
+  parser.add_argument(
+    "--save-baseline",
+    nargs="?",
+    const=str(DEFAULT_BASELINE),
+    default=None,
+    help="Store the results as the new baseline.",
+  )
+  parser.add_argument(
+    "--compare",
+    nargs="?",
+    const=str(DEFAULT_BASELINE),
+    default=None,
+    help="Compare against a stored baseline and exit non-zero on regressions.",
+  )
+  parser.add_argument(
+    "--threshold",
+    type=float,
+    default=0.25,
+    help="Allowed relative slowdown before a function counts as regressed.",
+  )
+  parser.add_argument(
+    "--memory-threshold",
+    type=float,
+    default=0.25,
+    help="Allowed relative growth in peak allocation before a function counts as regressed.",
+  )
+  args = parser.parse_args(argv)
+
+  results = run_benchmarks(
+    fixtures_dir=Path(args.fixtures),
+    only=args.only,
+    repeat=args.repeat,
+    min_time=args.min_time,
+  )
+
+  payload = {
+    "meta": {
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    },
+    "results": results,
+  }
+  if args.json:
+    Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+  if args.save_baseline:
+    Path(args.save_baseline).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Saved baseline to {args.save_baseline}")
+
+  if args.compare:
+    baseline_path = Path(args.compare)
+    if not baseline_path.exists():
+      print(f"Baseline not found: {baseline_path}", file=sys.stderr)
+      return 2
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+    regressions = compare_to_baseline(
+      results,
+      baseline,
+      time_threshold=args.threshold,
+      memory_threshold=args.memory_threshold,
+    )
+    if regressions:
+      print(f"\n{len(regressions)} function(s) regressed: {', '.join(regressions)}")
+      return 1
+    print("\nNo regressions.")
+
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,535 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+from typing import Any
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Mirrors the teams in resources/data.json so synthetic pages look like the real league.
+LEAGUE_TEAMS = (
+  ("IST", "Anadolu Efes Istanbul"),
+  ("MCO", "AS Monaco"),
+  ("RED", "Crvena Zvezda Meridianbet Belgrade"),
+  ("DUB", "Dubai Basketball"),
+  ("MIL", "EA7 Emporio Armani Milan"),
+  ("BAR", "FC Barcelona"),
+  ("MUN", "FC Bayern Munich"),
+  ("ULK", "Fenerbahce Beko Istanbul"),
+  ("HTA", "Hapoel IBI Tel Aviv"),
+  ("BAS", "Kosner Baskonia Vitoria-Gasteiz"),
+  ("ASV", "LDLC ASVEL Villeurbanne"),
+  ("TEL", "Maccabi Rapyd Tel Aviv"),
+  ("OLY", "Olympiacos Piraeus"),
+  ("PAN", "Panathinaikos AKTOR Athens"),
+  ("PRS", "Paris Basketball"),
+  ("PAR", "Partizan Mozzart Bet Belgrade"),
+  ("MAD", "Real Madrid"),
+  ("PAM", "Valencia Basket"),
+  ("VIR", "Virtus Bologna"),
+  ("ZAL", "Zalgiris Kaunas"),
+)
+
+FIRST_NAMES = (
+  "Alberto", "Mike", "Nikola", "Kostas", "Tornike", "Sasha", "Facundo", "Kendrick",
+  "Wade", "Vasilije", "Jan", "Marius", "Tyler", "Dzanan", "Shane", "Nigel",
+  "Edy", "Mario", "Guerschon", "Elie", "Lorenzo", "Carlik", "Darius", "Kevin",
+)
+LAST_NAMES = (
+  "Abalde", "James", "Mirotic", "Sloukas", "Shengelia", "Vezenkov", "Campazzo",
+  "Nunn", "Baldwin", "Micic", "Vesely", "Grigonis", "Dorsey", "Musa", "Larkin",
+  "Hayes-Davis", "Tavares", "Hezonja", "Yabusele", "Okobo", "Brown", "Jones",
+  "Thompson", "Punter",
+)
+POSITION_LABELS = ("Guard", "Guard", "Forward", "Forward", "Center")
+COMPETITION_NAMES = {"euroleague": "EuroLeague", "eurocup": "EuroCup"}
+IMAGE_CDNS = ("media-cdn.incrowdsports.com", "media-cdn.cortextech.io")
+
+
+def slugify(value: str) -> str:
+  return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def _uuid(rng: random.Random) -> str:
+  hexdigits = "".join(rng.choice("0123456789abcdef") for _ in range(32))
+  return f"{hexdigits[:8]}-{hexdigits[8:12]}-{hexdigits[12:16]}-{hexdigits[16:20]}-{hexdigits[20:]}"
+
+
+def _cdn_url(rng: random.Random, ext: str = "png", crop: tuple[int, int] | None = None) -> str:
+  url = f"https://{rng.choice(IMAGE_CDNS)}/{_uuid(rng)}.{ext}"
+  if crop is not None:
+    url += f"?width=512&crop={crop[0]}:{crop[1]}"
+  return url
+
+
+def synthetic_league(
+  *,
+  seed: int = 7,
+  n_teams: int = len(LEAGUE_TEAMS),
+  players_per_team: int = 14,
+  competition: str = "euroleague",
+) -> dict[str, list[dict[str, Any]]]:
+  """Build a deterministic league of teams and players in the data.json shape.
+
+  Every record also carries the ``slug`` and ``competition`` used to lay out
+  page URLs.
+  """
+  rng = random.Random(seed)
+  teams: list[dict[str, Any]] = []
+  players: list[dict[str, Any]] = []
+  next_player_id = 3000
+
+  for index in range(n_teams):
+    code, name = LEAGUE_TEAMS[index % len(LEAGUE_TEAMS)]
+    if index >= len(LEAGUE_TEAMS):
+      code = f"{code[:2]}{index}"[:4]
+      name = f"{name} {index}"
+    wins = rng.randint(4, 24)
+    teams.append(
+      {
+        "id": code,
+        "name": name,
+        "slug": slugify(name),
+        "logoUrl": _cdn_url(rng, "png"),
+        "record": f"{wins}-{28 - wins}",
+        "competition": competition,
+      }
+    )
+
+    for slot in range(players_per_team):
+      next_player_id += rng.randint(1, 40)
+      full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+      label = POSITION_LABELS[slot % len(POSITION_LABELS)]
+      players.append(
+        {
+          "id": f"{next_player_id:06d}",
+          "name": full_name.upper(),
+          "slug": slugify(full_name),
+          "teamId": code,
+          "positionLabel": label,
+          "imageUrl": _cdn_url(rng, "png", crop=(300, 400)),
+          "seasonAvgPts": round(rng.uniform(0.0, 19.0), 1),
+          "seasonAvgReb": round(rng.uniform(0.0, 8.0), 1),
+          "seasonAvgAst": round(rng.uniform(0.0, 6.0), 1),
+          "competition": competition,
+        }
+      )
+
+  return {"teams": teams, "players": players}
+
+
+def _competition(record: dict[str, Any]) -> tuple[str, str]:
+  slug = str(record.get("competition", "euroleague"))
+  return slug, COMPETITION_NAMES.get(slug, slug.title())
+
+
+def team_roster_path(team: dict[str, Any]) -> str:
+  slug, _ = _competition(team)
+  return f"/en/{slug}/teams/{team['slug']}/roster/{str(team['id']).lower()}/"
+
+
+def player_path(player: dict[str, Any]) -> str:
+  slug, _ = _competition(player)
+  return f"/en/{slug}/players/{player['slug']}/{player['id']}/"
+
+
+def _page_chrome(rng: random.Random, *, n_links: int = 120, n_assets: int = 40) -> tuple[str, str]:
+  # Real pages carry a large site header/footer and a Next.js data blob full of
+  # sponsor and article images. Reproduce that bulk so timings are representative.
+  nav = "".join(
+    f'<li><a href="/en/euroleague/news/{_uuid(rng)[:8]}/">Story {i}</a></li>'
+    for i in range(n_links)
+  )
+  header = f'<header><nav><ul>{nav}</ul></nav></header>'
+  assets = [
+    {
+      "id": _uuid(rng),
+      "title": f"Sponsor {i}",
+      "image": _cdn_url(rng, rng.choice(("png", "jpg", "webp")), crop=(1200, 400)),
+    }
+    for i in range(n_assets)
+  ]
+  blob = json.dumps({"props": {"pageProps": {"assets": assets}}})
+  footer = (
+    '<footer><p>EuroLeague Basketball. All rights reserved.</p></footer>'
+    f'<script id="__NEXT_DATA__" type="application/json">{blob}</script>'
+  )
+  return header, footer
+
+
+def _jsonld(objects: list[dict[str, Any]]) -> str:
+  return f'<script type="application/ld+json">{json.dumps(objects)}</script>'
+
+
+def team_listing_html(teams: list[dict[str, Any]], *, seed: int = 0) -> str:
+  rng = random.Random(seed)
+  header, footer = _page_chrome(rng)
+  _, label = _competition(teams[0]) if teams else ("euroleague", "EuroLeague")
+  cards = "".join(
+    f'<div class="team-card"><a href="{team_roster_path(t)}">{t["name"]}</a></div>'
+    for t in teams
+  )
+  return (
+    f"<!DOCTYPE html><html><head><title>Teams | {label}</title>"
+    f'<meta property="og:title" content="Teams | {label}"/>'
+    '<meta property="og:image" content="https://www.euroleaguebasketball.net/images/euroleague.png"/>'
+    f"</head><body>{header}<main><h1>Teams</h1>{cards}</main>{footer}</body></html>"
+  )
+
+
+def roster_html(
+  team: dict[str, Any],
+  players: list[dict[str, Any]],
+  *,
+  seed: int = 0,
+  with_crest: bool = True,
+) -> str:
+  rng = random.Random(seed)
+  header, footer = _page_chrome(rng)
+  slug, label = _competition(team)
+  wins, _, losses = str(team["record"]).partition("-")
+  escaped_logo = str(team["logoUrl"]).replace("/", "\\/")
+  crest = (
+    f'<script>window.__TEAM__ = {{"crest":"{escaped_logo}"}};</script>'
+    if with_crest
+    else ""
+  )
+  jsonld = _jsonld(
+    [
+      {"@type": "ImageObject", "url": _cdn_url(rng, "jpg", crop=(1600, 500)), "description": "Team banner"},
+      {"@type": "ImageObject", "url": team["logoUrl"] + "?crop=512:512", "description": f"{team['name']} logo"},
+      {"@type": "ImageObject", "url": "https://www.euroleaguebasketball.net/images/euroleague.png", "description": "EuroLeague logo"},
+    ]
+  )
+  rows = "".join(
+    f'<li class="roster-player"><a href="{player_path(p)}">'
+    f'<img src="{p["imageUrl"]}" alt="{p["name"]}"/>{p["name"]}</a>'
+    f"<span>{p['positionLabel']}</span></li>"
+    for p in players
+  )
+  return (
+    f"<!DOCTYPE html><html><head><title>{team['name']} Roster | {label}</title>"
+    f'<meta property="og:title" content="{team["name"]} | {label}"/>'
+    f'<meta property="og:image" content="{_cdn_url(rng, "jpg", crop=(1200, 630))}"/>'
+    f"{jsonld}{crest}</head><body>{header}<main>"
+    f'<h1>{team["name"]}</h1><div class="record">Won W {wins} Lost L {losses}</div>'
+    f'<a href="/en/{slug}/teams/{team["slug"]}/{str(team["id"]).lower()}/">Club info</a>'
+    f'<ul class="roster">{rows}</ul></main>{footer}</body></html>'
+  )
+
+
+def threes_made(player: dict[str, Any]) -> float:
+  # Derived rather than drawn, so adding it left every other random draw unchanged.
+  return round(player["seasonAvgPts"] * 0.1, 1)
+
+
+def player_html(
+  player: dict[str, Any],
+  team: dict[str, Any],
+  *,
+  seed: int = 0,
+  with_photo: bool = True,
+) -> str:
+  rng = random.Random(seed)
+  header, footer = _page_chrome(rng)
+  _, label = _competition(player)
+  escaped_photo = str(player["imageUrl"]).replace("/", "\\/")
+  photo = (
+    f'<script>window.__PLAYER__ = {{"photo":"{escaped_photo}"}};</script>'
+    if with_photo
+    else ""
+  )
+  jsonld = _jsonld(
+    [
+      {"@type": "ImageObject", "url": team["logoUrl"] + "?crop=512:512", "description": f"{team['name']} logo"},
+      {"@type": "ImageObject", "url": player["imageUrl"], "description": player["name"]},
+    ]
+  )
+  return (
+    f"<!DOCTYPE html><html><head><title>{player['name']} | {label}</title>"
+    f'<meta property="og:title" content="{player["name"]} | {label}"/>'
+    f'<meta property="og:image" content="{_cdn_url(rng, "jpg", crop=(1200, 630))}"/>'
+    f"{jsonld}{photo}</head><body>{header}<main>"
+    f'<h1>{player["name"]}</h1>'
+    f'<a href="{team_roster_path(team)}">{team["name"]}</a>'
+    f'<div class="hero"><span>{player["positionLabel"]}</span> <span>Nationality</span> <span>Spain</span></div>'
+    f'<img src="{player["imageUrl"]}" alt="{player["name"]}"/>'
+    '<div class="season-stats">'
+    f'<div>{player["seasonAvgPts"]} PTS</div>'
+    f'<div>{player["seasonAvgReb"]} REB</div>'
+    f'<div>{player["seasonAvgAst"]} AST</div>'
+    f"<div>{threes_made(player)} 3PM</div>"
+    f"</div></main>{footer}</body></html>"
+  )
+
+
+def synthetic_pages(
+  league: dict[str, list[dict[str, Any]]],
+  *,
+  seed: int = 0,
+) -> dict[str, str]:
+  """Render every page of ``league`` keyed by its URL path on the real site."""
+  teams = league["teams"]
+  players = league["players"]
+  teams_by_id = {t["id"]: t for t in teams}
+  slug, _ = _competition(teams[0]) if teams else ("euroleague", "")
+  pages: dict[str, str] = {f"/{slug}/teams/": team_listing_html(teams, seed=seed)}
+
+  for index, team in enumerate(teams):
+    roster = [p for p in players if p["teamId"] == team["id"]]
+    pages[team_roster_path(team)] = roster_html(
+      team,
+      roster,
+      seed=seed + index,
+      with_crest=index % 3 != 0,
+    )
+
+  for index, player in enumerate(players):
+    pages[player_path(player)] = player_html(
+      player,
+      teams_by_id[player["teamId"]],
+      seed=seed + index,
+      with_photo=index % 2 == 0,
+    )
+
+  return pages
+
+
+def synthetic_game_logs(
+  league: dict[str, list[dict[str, Any]]],
+  *,
+  games_per_team: int = 30,
+  seed: int = 11,
+) -> list[dict[str, Any]]:
+  """Per-player box score lines in the ``player_game_logs`` raw input shape."""
+  rng = random.Random(seed)
+  # Separate stream, so points match logs generated before the other stats existed.
+  stat_rng = random.Random(seed + 1)
+  team_ids = [t["id"] for t in league["teams"]]
+  roster: dict[str, list[dict[str, Any]]] = {}
+  for p in league["players"]:
+    roster.setdefault(p["teamId"], []).append(p)
+
+  positions = {"Guard": ("PG", "SG"), "Forward": ("SF", "PF"), "Center": ("C",)}
+  logs: list[dict[str, Any]] = []
+  for round_no in range(games_per_team):
+    order = team_ids[:]
+    rng.shuffle(order)
+    for home, away in zip(order[::2], order[1::2]):
+      game_id = f"R{round_no + 1:02d}_{home}_{away}"
+      for team_id, opponent_id in ((home, away), (away, home)):
+        for p in roster.get(team_id, []):
+          logs.append(
+            {
+              "game_id": game_id,
+              "round": round_no + 1,
+              "player_id": p["id"],
+              "team_id": team_id,
+              "opponent_team_id": opponent_id,
+              "is_home": team_id == home,
+              "position": rng.choice(positions[p["positionLabel"]]),
+              "points": max(0, int(rng.gauss(p["seasonAvgPts"], 4.0))),
+              "rebounds": max(0, int(stat_rng.gauss(p["seasonAvgReb"], 2.0))),
+              "assists": max(0, int(stat_rng.gauss(p["seasonAvgAst"], 1.5))),
+              "threes_made": max(0, int(stat_rng.gauss(p["seasonAvgPts"] * 0.1, 1.0))),
+            }
+          )
+  return logs
+
+
+def synthetic_raw_input(
+  league: dict[str, list[dict[str, Any]]],
+  *,
+  seasons: int = 1,
+  games_per_team: int = 30,
+  seed: int = 11,
+) -> dict[str, Any]:
+  """A raw_input.json payload: the league, one upcoming round and ``seasons`` of game logs."""
+  positions = {"Guard": "PG", "Forward": "SF", "Center": "C"}
+  teams = [{k: t[k] for k in ("id", "name", "logoUrl", "record")} for t in league["teams"]]
+  players = [
+    {
+      **{k: v for k, v in p.items() if k not in ("slug", "positionLabel", "competition")},
+      "position": positions[p["positionLabel"]],
+    }
+    for p in league["players"]
+  ]
+  team_ids = [t["id"] for t in teams]
+  schedule = [
+    {"homeTeamId": home, "awayTeamId": away, "gameDate": "", "gameId": f"NEXT_{home}_{away}"}
+    for home, away in zip(team_ids[::2], team_ids[1::2])
+  ]
+  logs: list[dict[str, Any]] = []
+  for season in range(seasons):
+    for row in synthetic_game_logs(league, games_per_team=games_per_team, seed=seed + season):
+      row["game_id"] = f"S{season}_{row['game_id']}"
+      logs.append(row)
+  return {"teams": teams, "players": players, "schedule": schedule, "player_game_logs": logs}
+
+
+COMPETITION_CODES = {"euroleague": "E", "eurocup": "U"}
+
+# Season segment of API paths; the stand-in serves whichever season is asked for.
+SEASON_PLACEHOLDER = "{season}"
+
+
+def _api_name(name: str) -> str:
+  first, _, last = name.partition(" ")
+  return f"{last}, {first}" if last else first
+
+
+def synthetic_api(
+  league: dict[str, list[dict[str, Any]]],
+  *,
+  games_per_team: int = 30,
+  played_rounds: int | None = None,
+  seed: int = 11,
+) -> dict[str, dict[str, Any]]:
+  """The JSON API's collections for ``league``, keyed by endpoint path.
+
+  Each value is ``{"key": <list field>, "items": [...]}``; the replay server
+  pages through ``items`` with ``limit``/``offset``. Rounds after
+  ``played_rounds`` (two thirds of the season by default) are unplayed
+  fixtures.
+  """
+  import datetime
+
+  rng = random.Random(seed)
+  teams, players = league["teams"], league["players"]
+  slug, _ = _competition(teams[0]) if teams else ("euroleague", "")
+  code = COMPETITION_CODES.get(slug, "E")
+  season_root = f"v2/competitions/{code}/seasons/{SEASON_PLACEHOLDER}"
+  teams_by_id = {t["id"]: t for t in teams}
+  played_rounds = games_per_team * 2 // 3 if played_rounds is None else played_rounds
+
+  clubs = [{"code": t["id"], "name": t["name"], "images": {"crest": t["logoUrl"]}} for t in teams]
+  people = [
+    {
+      "person": {"code": f"P{p['id']}", "name": _api_name(p["name"]), "images": {"headshot": p["imageUrl"]}},
+      "club": {"code": p["teamId"], "name": teams_by_id[p["teamId"]]["name"]},
+      "type": "J",
+      "typeName": "Player",
+      "positionName": p["positionLabel"],
+      "active": True,
+    }
+    for p in players
+  ]
+  stats = [
+    {
+      "player": {"code": f"P{p['id']}", "name": _api_name(p["name"]), "team": {"code": p["teamId"]}},
+      "gamesPlayed": played_rounds,
+      "pointsScored": p["seasonAvgPts"],
+      "totalRebounds": p["seasonAvgReb"],
+      "assists": p["seasonAvgAst"],
+      "threePointersMade": threes_made(p),
+    }
+    for p in players
+  ]
+
+  games: list[dict[str, Any]] = []
+  first_round = datetime.datetime(2025, 10, 2, 20, 0)
+  team_ids = [t["id"] for t in teams]
+  for round_no in range(games_per_team):
+    order = team_ids[:]
+    rng.shuffle(order)
+    played = round_no < played_rounds
+    for home, away in zip(order[::2], order[1::2]):
+      games.append(
+        {
+          "gameCode": len(games) + 1,
+          "round": round_no + 1,
+          "date": (first_round + datetime.timedelta(days=7 * round_no)).isoformat(),
+          "played": played,
+          "local": {"club": {"code": home}, "score": rng.randint(65, 100) if played else None},
+          "road": {"club": {"code": away}, "score": rng.randint(62, 97) if played else None},
+        }
+      )
+  for game in games:
+    # No ties in basketball.
+    if game["played"] and game["local"]["score"] == game["road"]["score"]:
+      game["local"]["score"] += 1
+
+  return {
+    f"{season_root}/clubs": {"key": "data", "items": clubs},
+    f"{season_root}/people": {"key": "data", "items": people},
+    f"v3/competitions/{code}/statistics/players/traditional": {"key": "players", "items": stats},
+    f"{season_root}/games": {"key": "data", "items": games},
+  }
+
+
+def write_corpus(out_dir: Path = FIXTURES_DIR, *, seed: int = 7) -> Path:
+  """Render a small, representative slice of the league into ``out_dir``.
+
+  The manifest maps each real-site URL path to the saved file so consumers can
+  replay pages without touching the network.
+  """
+  league = synthetic_league(seed=seed, n_teams=4, players_per_team=3)
+  pages = synthetic_pages(league, seed=seed)
+
+  html_dir = out_dir / "html"
+  html_dir.mkdir(parents=True, exist_ok=True)
+  manifest: list[dict[str, str]] = []
+  for path, html in pages.items():
+    if path.endswith("/teams/"):
+      kind = "teams"
+    elif "/roster/" in path:
+      kind = "roster"
+    else:
+      kind = "player"
+    filename = f"{kind}_{slugify(path)}.html"
+    (html_dir / filename).write_text(html, encoding="utf-8")
+    manifest.append({"path": path, "kind": kind, "file": f"html/{filename}"})
+
+  api_dir = out_dir / "api"
+  api_dir.mkdir(parents=True, exist_ok=True)
+  api_manifest: list[dict[str, str]] = []
+  for path, collection in synthetic_api(league, seed=seed).items():
+    filename = f"{slugify(path.replace(SEASON_PLACEHOLDER, 'season'))}.json"
+    (api_dir / filename).write_text(json.dumps(collection, indent=2), encoding="utf-8")
+    api_manifest.append({"path": path, "file": f"api/{filename}"})
+
+  manifest_path = out_dir / "manifest.json"
+  manifest_path.write_text(json.dumps({"pages": manifest, "api": api_manifest}, indent=2), encoding="utf-8")
+  return manifest_path
+
+
+def load_corpus(fixtures_dir: Path = FIXTURES_DIR) -> list[dict[str, str]]:
+  """Return saved pages as ``{"path", "kind", "html"}`` records."""
+  manifest = json.loads((fixtures_dir / "manifest.json").read_text(encoding="utf-8"))
+  pages: list[dict[str, str]] = []
+  for entry in manifest.get("pages", []):
+    pages.append(
+      {
+        "path": entry["path"],
+        "kind": entry["kind"],
+        "html": (fixtures_dir / entry["file"]).read_text(encoding="utf-8"),
+      }
+    )
+  return pages
+
+
+def load_api_corpus(fixtures_dir: Path = FIXTURES_DIR) -> dict[str, dict[str, Any]]:
+  """Return saved API collections keyed by endpoint path, as ``synthetic_api`` builds them."""
+  manifest = json.loads((fixtures_dir / "manifest.json").read_text(encoding="utf-8"))
+  return {
+    entry["path"]: json.loads((fixtures_dir / entry["file"]).read_text(encoding="utf-8"))
+    for entry in manifest.get("api", [])
+  }
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description="Regenerate the saved HTML and JSON API fixture corpus.")
+  parser.add_argument("--out", default=str(FIXTURES_DIR), help="Fixture directory to write.")
+  parser.add_argument("--seed", type=int, default=7)
+  args = parser.parse_args(argv)
+
+  manifest_path = write_corpus(Path(args.out), seed=args.seed)
+  print(f"Wrote fixture corpus manifest to {manifest_path}")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
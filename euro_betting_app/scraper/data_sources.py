@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import abc
+import argparse
+import datetime
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+import requests
+
+from fetcher import Fetcher
+
+DEFAULT_API_URL = "https://api-live.euroleague.net"
+
+# Items per paginated request; the live API accepts a few hundred.
+DEFAULT_PAGE_SIZE = 200
+
+SOURCES = ("auto", "api", "html")
+
+
+class ApiSchemaError(ValueError):
+  """An API response did not have the shape this client expects."""
+
+
+@dataclass(frozen=True)
+class LiveData:
+  """What a data source hands to ``assemble_live_data``."""
+
+  teams: list[dict[str, Any]]
+  players: list[dict[str, Any]]
+  # None when the source has no fixtures list (the build then mocks one).
+  schedule: list[dict[str, Any]] | None = None
+  source: str = ""
+
+
+class DataSource(abc.ABC):
+  name = "base"
+
+  @abc.abstractmethod
+  def fetch(self, *, max_teams: int | None = None, max_players: int | None = None) -> LiveData:
+    """Teams and players, at most ``max_teams``/``max_players`` of each."""
+
+
+def current_season_start(*, today: datetime.date | None = None) -> int:
+  """Start year of the season in progress; seasons start in the autumn."""
+  today = today or datetime.date.today()
+  return today.year if today.month >= 8 else today.year - 1
+
+
+def season_code(competition_code: str, season: str | None, *, today: datetime.date | None = None) -> str:
+  """The API's season code, e.g. ``E2024`` for the 2024-25 EuroLeague.
+
+  With no season, this is the one in progress.
+  """
+  start = int(str(season).strip()[:4]) if season else current_season_start(today=today)
+  return f"{competition_code}{start}"
+
+
+def _player_id(code: Any) -> str:
+  # People codes are "P003733"; site URLs and data.json use "003733".
+  return re.sub(r"\D", "", str(code))
+
+
+def _display_name(name: Any) -> str:
+  # "ABALDE, ALBERTO" -> "ALBERTO ABALDE", as the player pages title it.
+  last, sep, first = str(name).partition(",")
+  return f"{first.strip()} {last.strip()}".strip().upper() if sep else str(name).strip().upper()
+
+
+def _position(label: Any) -> str:
+  value = str(label).strip().lower()
+  if "center" in value:
+    return "C"
+  if "forward" in value:
+    return "SF"
+  return "PG"
+
+
+def _club_rank(entry: dict[str, Any]) -> tuple[bool, str]:
+  # Active spells first, then the most recent start; ISO dates sort as text.
+  return entry.get("active") is not False, str(entry.get("startDate") or "")
+
+
+def current_club_entries(people: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+  """One people entry per player id: the active club, else the latest one.
+
+  A player who moved mid-season is listed once per club, not necessarily in
+  date order. Ties go to the entry listed last.
+  """
+  entries: dict[str, dict[str, Any]] = {}
+  for entry in people:
+    player_id = _player_id(entry["person"]["code"])
+    known = entries.get(player_id)
+    if known is None or _club_rank(entry) >= _club_rank(known):
+      entries[player_id] = entry
+  return entries
+
+
+def games_to_schedule(
+  games: list[dict[str, Any]],
+  team_ids: set[str],
+  *,
+  season_code: str,
+) -> tuple[list[dict[str, Any]], dict[str, int], dict[str, int]]:
+  """Upcoming fixtures involving ``team_ids`` (by date) plus win and loss counts from played games."""
+  wins: dict[str, int] = {}
+  losses: dict[str, int] = {}
+  schedule: list[dict[str, Any]] = []
+  for game in sorted(games, key=lambda g: str(g.get("date", ""))):
+    home, away = str(game["local"]["club"]["code"]), str(game["road"]["club"]["code"])
+    if game.get("played"):
+      home_won = float(game["local"]["score"]) > float(game["road"]["score"])
+      winner, loser = (home, away) if home_won else (away, home)
+      wins[winner] = wins.get(winner, 0) + 1
+      losses[loser] = losses.get(loser, 0) + 1
+    elif home in team_ids or away in team_ids:
+      schedule.append(
+        {
+          "homeTeamId": home,
+          "awayTeamId": away,
+          "gameDate": str(game.get("date", "")),
+          "gameId": f"{season_code}_{game['gameCode']}",
+        }
+      )
+  return schedule, wins, losses
+
+
+class JsonApiSource(DataSource):
+  """Teams, rosters, per-game stat lines and results from the site's JSON API.
+
+  A season is four paginated collections: clubs, people, per-game player
+  averages and games. That is a handful of small JSON responses, against one
+  HTML page per roster and per player. Game results also give the real
+  fixture list and win-loss records, which the HTML pages do not expose.
+  """
+
+  name = "api"
+
+  def __init__(
+    self,
+    fetcher: Fetcher,
+    *,
+    api_url: str = DEFAULT_API_URL,
+    competition_code: str = "E",
+    season: str | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+  ) -> None:
+    self.fetcher = fetcher
+    self.api_url = api_url.rstrip("/")
+    self.competition_code = competition_code
+    self.season_code = season_code(competition_code, season)
+    self.page_size = page_size
+
+  def _pages(self, path: str, key: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = []
+    offset = 0
+    while True:
+      query = urlencode({**(params or {}), "limit": self.page_size, "offset": offset})
+      body = json.loads(self.fetcher.get_bytes(f"{self.api_url}/{path}?{query}"))
+      if not isinstance(body, dict) or not isinstance(body.get(key), list):
+        raise ApiSchemaError(f"{path}: expected a {key!r} list")
+      page = body[key]
+      items.extend(page)
+      offset += len(page)
+      if not page or offset >= int(body.get("total", offset)):
+        return items
+
+  def clubs(self) -> list[dict[str, Any]]:
+    return self._pages(f"v2/competitions/{self.competition_code}/seasons/{self.season_code}/clubs", "data")
+
+  def people(self) -> list[dict[str, Any]]:
+    return self._pages(
+      f"v2/competitions/{self.competition_code}/seasons/{self.season_code}/people",
+      "data",
+      {"personType": "J"},
+    )
+
+  def player_stats(self) -> list[dict[str, Any]]:
+    return self._pages(
+      f"v3/competitions/{self.competition_code}/statistics/players/traditional",
+      "players",
+      {"seasonMode": "Single", "seasonCode": self.season_code, "statisticMode": "perGame"},
+    )
+
+  def games(self) -> list[dict[str, Any]]:
+    return self._pages(f"v2/competitions/{self.competition_code}/seasons/{self.season_code}/games", "data")
+
+  def fetch(self, *, max_teams: int | None = None, max_players: int | None = None) -> LiveData:
+    try:
+      return self._fetch(max_teams=max_teams, max_players=max_players)
+    except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+      raise ApiSchemaError(f"Unexpected API response: {type(e).__name__}: {e}") from e
+
+  def _fetch(self, *, max_teams: int | None, max_players: int | None) -> LiveData:
+    clubs = self.clubs()[:max_teams]
+    team_ids = {str(c["code"]) for c in clubs}
+
+    schedule, wins, losses = games_to_schedule(self.games(), team_ids, season_code=self.season_code)
+
+    teams = [
+      {
+        "id": str(c["code"]),
+        "name": str(c.get("name", "")),
+        "logoUrl": str((c.get("images") or {}).get("crest", "")),
+        "record": f"{wins.get(str(c['code']), 0)}-{losses.get(str(c['code']), 0)}",
+        "logoCandidates": [u for u in [(c.get("images") or {}).get("crest")] if u],
+      }
+      for c in clubs
+    ]
+
+    averages = {_player_id(row["player"]["code"]): row for row in self.player_stats()}
+    players: list[dict[str, Any]] = []
+    for player_id, entry in current_club_entries(self.people()).items():
+      person = entry["person"]
+      team_id = str(entry["club"]["code"])
+      if team_id not in team_ids or entry.get("active") is False:
+        continue
+      images = person.get("images") or {}
+      image_urls = [u for u in (images.get("headshot"), images.get("action")) if u]
+      line = averages.get(player_id, {})
+      season_pts = round(float(line.get("pointsScored", 0.0)), 1)
+      players.append(
+        {
+          "id": player_id,
+          "name": _display_name(person.get("name", "")),
+          "teamId": team_id,
+          "position": _position(entry.get("positionName", "")),
+          "imageUrl": image_urls[0] if image_urls else "",
+          "seasonAvgPts": season_pts,
+          "seasonAvgReb": round(float(line.get("totalRebounds", 0.0)), 1),
+          "seasonAvgAst": round(float(line.get("assists", 0.0)), 1),
+          "seasonAvg3pm": round(float(line.get("threePointersMade", 0.0)), 1),
+          "last5AvgPts": season_pts,
+          "imageCandidates": image_urls,
+        }
+      )
+      if max_players is not None and len(players) >= max_players:
+        break
+
+    return LiveData(teams=teams, players=players, schedule=schedule or None, source=self.name)
+
+
+class FallbackSource(DataSource):
+  """Try each source in turn; a failing or empty source hands over to the next."""
+
+  def __init__(self, sources: list[DataSource]) -> None:
+    self.sources = sources
+    self.name = "+".join(s.name for s in sources)
+
+  def fetch(self, *, max_teams: int | None = None, max_players: int | None = None) -> LiveData:
+    error: Exception | None = None
+    for source in self.sources:
+      try:
+        data = source.fetch(max_teams=max_teams, max_players=max_players)
+      except (requests.RequestException, ApiSchemaError) as e:
+        print(f"[source] {source.name} failed ({type(e).__name__}: {e}); falling back")
+        error = e
+        continue
+      if data.teams and data.players:
+        return data
+      print(f"[source] {source.name} returned no teams or players; falling back")
+    if error is not None:
+      raise error
+    return LiveData(teams=[], players=[])
+
+
+def make_source(
+  kind: str,
+  *,
+  fetcher: Fetcher,
+  html: Callable[[], DataSource],
+  api_url: str | None = None,
+  competition_code: str = "E",
+  season: str | None = None,
+) -> DataSource:
+  """``api``, ``html``, or ``auto`` (the API with HTML scraping as the fallback)."""
+  if kind not in SOURCES:
+    raise ValueError(f"Unknown data source {kind!r}; expected one of {', '.join(SOURCES)}")
+  if kind == "html":
+    return html()
+  api = JsonApiSource(
+    fetcher,
+    api_url=api_url or os.environ.get("EUROLEAGUE_API_URL", DEFAULT_API_URL),
+    competition_code=competition_code,
+    season=season,
+  )
+  return api if kind == "api" else FallbackSource([api, html()])
+
+
+def main(argv: list[str] | None = None) -> int:
+  import euro_scraper
+  import replay_server
+
+  parser = argparse.ArgumentParser(
+    description="Compare the JSON API and HTML data sources against the local stand-in."
+  )
+  parser.add_argument("--teams", type=int, default=20)
+  parser.add_argument("--players-per-team", type=int, default=14)
+  parser.add_argument("--latency", default="fixed:0", help="Stand-in latency spec (see replay_server).")
+  args = parser.parse_args(argv)
+
+  pages = replay_server.load_pages(fixtures=None, teams=args.teams, players_per_team=args.players_per_team, seed=7)
+  api = replay_server.load_api(fixtures=None, teams=args.teams, players_per_team=args.players_per_team, seed=7)
+  server = replay_server.ReplayServer(
+    pages, api=api, profile=replay_server.FaultProfile(latency=args.latency)
+  ).start()
+  euro_scraper.configure_base_url(server.url)
+  try:
+    for kind in ("api", "html"):
+      fetcher = Fetcher()
+      euro_scraper.set_fetcher(fetcher)
+      start = time.perf_counter()
+      data = euro_scraper.build_euro_data_live(source=kind, api_url=server.url)
+      seconds = time.perf_counter() - start
+      stats = fetcher.stats.as_dict()
+      print(
+        f"{kind:>4}: {len(data['teams'])} teams, {len(data['players'])} players, "
+        f"{stats['requests']} requests, {stats['bytes'] / 1e6:.2f} MB, {seconds:.2f}s"
+      )
+  finally:
+    euro_scraper.set_fetcher(None)
+    server.stop()
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
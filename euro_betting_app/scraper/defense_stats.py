@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+POSITIONS = ("PG", "SG", "SF", "PF", "C")
+
+# Prop markets, and the game-log column each is summed from. "pra" is
+# derived as points + rebounds + assists.
+STAT_COLUMNS = {
+  "points": "points",
+  "rebounds": "rebounds",
+  "assists": "assists",
+  "threes_made": "threes_made",
+}
+PRA_PARTS = ("points", "rebounds", "assists")
+STATS = (*STAT_COLUMNS, "pra")
+
+# Player season averages (data.json keys) behind each stat, for the mock tensor.
+PLAYER_AVERAGE_KEYS = {
+  "points": "seasonAvgPts",
+  "rebounds": "seasonAvgReb",
+  "assists": "seasonAvgAst",
+  "threes_made": "seasonAvg3pm",
+}
+# Per-player defaults when no player at a position has a non-zero average.
+DEFAULT_AVERAGES = {"points": 12.0, "rebounds": 4.0, "assists": 2.5, "threes_made": 1.0}
+
+
+@dataclass(frozen=True)
+class DefenseTensor:
+  """Average allowed per game, as a team x position x stat array.
+
+  ``values[t, p, s]`` is what team ``teams[t]`` allowed to players at
+  ``positions[p]`` in ``stats[s]``, per game; NaN where it never faced one.
+  """
+
+  teams: tuple[str, ...]
+  positions: tuple[str, ...]
+  stats: tuple[str, ...]
+  values: "np.ndarray"
+
+  def matrix(self, stat: str = "points", *, digits: int = 2) -> dict[str, dict[str, float]]:
+    """One stat as ``{team: {position: allowed}}``, the ``defense_vs_position`` shape."""
+    import numpy as np
+
+    if stat not in self.stats:
+      return {}
+    plane = np.nan_to_num(self.values[:, :, self.stats.index(stat)], nan=0.0).round(digits)
+    return {team: dict(zip(self.positions, row)) for team, row in zip(self.teams, plane.tolist())}
+
+  def to_json(self, *, digits: int = 2) -> dict[str, Any]:
+    """Flat row-major values: ``values[(t * len(positions) + p) * len(stats) + s]``; null for NaN."""
+    import numpy as np
+
+    flat = self.values.round(digits).ravel()
+    return {
+      "teams": list(self.teams),
+      "positions": list(self.positions),
+      "stats": list(self.stats),
+      "values": [None if np.isnan(v) else v for v in flat.tolist()],
+    }
+
+  @classmethod
+  def from_json(cls, raw: dict[str, Any]) -> "DefenseTensor":
+    import numpy as np
+
+    teams, positions, stats = tuple(raw["teams"]), tuple(raw["positions"]), tuple(raw["stats"])
+    values = np.array([np.nan if v is None else v for v in raw["values"]], dtype=np.float64)
+    return cls(teams, positions, stats, values.reshape(len(teams), len(positions), len(stats)))
+
+
+def defense_tensor(
+  player_game_logs: "pd.DataFrame",
+  *,
+  opponent_team_id_col: str = "opponent_team_id",
+  position_col: str = "position",
+  game_id_col: str = "game_id",
+  stat_columns: dict[str, str] | None = None,
+  positions: tuple[str, ...] = POSITIONS,
+) -> DefenseTensor:
+  """Allowed-per-game for every stat from one pass over the game logs.
+
+  A team's allowed-per-game at a position is the mean over games of what that
+  position scored against it. That mean equals the position's total against
+  the team divided by the number of distinct games, so no per-game table is
+  needed. Rows are keyed by integer (team, position) codes. One weighted
+  ``bincount`` per stat gives the totals, and one ``np.unique`` over
+  (team, position, game) keys gives the game counts. Categorical columns
+  (``records.GameLogColumns``) are used through their codes and never
+  decoded. Stats whose column is missing from the logs are left out, and
+  ``pra`` is only added when its three parts are present. Positions must
+  already be normalised to ``positions``; other values are dropped.
+  """
+  import numpy as np
+  import pandas as pd
+
+  stat_columns = {s: c for s, c in (stat_columns or STAT_COLUMNS).items() if c in player_game_logs.columns}
+  stats = tuple(stat_columns)
+  if all(part in stat_columns for part in PRA_PARTS):
+    stats += ("pra",)
+  if player_game_logs.empty or not stat_columns:
+    return DefenseTensor((), positions, stats, np.empty((0, len(positions), len(stats))))
+
+  x = np.column_stack(
+    [
+      pd.to_numeric(player_game_logs[c], errors="coerce").fillna(0.0).to_numpy(np.float64)
+      for c in stat_columns.values()
+    ]
+  )
+  if "pra" in stats:
+    parts = [list(stat_columns).index(p) for p in PRA_PARTS]
+    x = np.column_stack([x, x[:, parts].sum(axis=1)])
+
+  team_codes, team_ids = pd.factorize(player_game_logs[opponent_team_id_col])
+  # Alphabetical team order, so output does not depend on row order.
+  team_ids = np.asarray(team_ids).astype(str)
+  order = np.argsort(team_ids, kind="stable")
+  rank = np.empty_like(order)
+  rank[order] = np.arange(len(order))
+  team_codes = np.where(team_codes >= 0, rank[team_codes], -1)
+  position_codes = pd.Categorical(player_game_logs[position_col], categories=list(positions)).codes
+  if game_id_col in player_game_logs.columns:
+    game_codes = pd.factorize(player_game_logs[game_id_col])[0]
+  else:
+    game_codes = np.arange(len(player_game_logs))
+
+  keep = (team_codes >= 0) & (position_codes >= 0)
+  n_cells = len(team_ids) * len(positions)
+  cell = team_codes[keep].astype(np.int64) * len(positions) + position_codes[keep]
+  x = x[keep]
+
+  totals = np.column_stack([np.bincount(cell, weights=x[:, s], minlength=n_cells) for s in range(len(stats))])
+  n_games = int(game_codes.max()) + 1 if len(game_codes) else 1
+  games_per_cell = np.bincount(np.unique(cell * n_games + game_codes[keep]) // n_games, minlength=n_cells)
+  with np.errstate(invalid="ignore", divide="ignore"):
+    values = np.where(games_per_cell[:, None] > 0, totals / games_per_cell[:, None], np.nan)
+
+  # Codes are already ranks, so rows come out in alphabetical team order.
+  values = values.reshape(len(team_ids), len(positions), len(stats))
+  seen = games_per_cell.reshape(len(team_ids), len(positions)).any(axis=1)
+  return DefenseTensor(tuple(team_ids[order][seen].tolist()), positions, stats, values[seen])
+
+
+def mock_defense_tensor(
+  teams: list[dict[str, Any]],
+  players: list[dict[str, Any]],
+  *,
+  rng: random.Random | None = None,
+) -> DefenseTensor:
+  """A plausible tensor for builds without game logs (live scrapes).
+
+  League averages per position and stat come from the players' season
+  averages. Each team and position gets one weak/strong/average factor,
+  applied to every stat alike, so a soft defence against centers is soft
+  across all markets. Without ``rng`` the factors are seeded from the team
+  ids, so rebuilding the same league gives the same factors. Only the league
+  averages then move between builds.
+  """
+  import numpy as np
+
+  if rng is None:
+    team_ids = json.dumps([str(t.get("id", "")) for t in teams]).encode("utf-8")
+    rng = random.Random(hashlib.sha256(team_ids).hexdigest())
+  base_stats = tuple(STAT_COLUMNS)
+  league = np.empty((len(POSITIONS), len(base_stats)))
+  for j, stat in enumerate(base_stats):
+    key = PLAYER_AVERAGE_KEYS[stat]
+    for i, pos in enumerate(POSITIONS):
+      # A zero average is what a page without that stat parses to, so it is not a sample.
+      samples = [float(p[key]) for p in players if p.get("position", "C") == pos and p.get(key)]
+      league[i, j] = sum(samples) / len(samples) if samples else DEFAULT_AVERAGES[stat]
+
+  ids: list[str] = []
+  rows: list["np.ndarray"] = []
+  for i, team in enumerate(teams):
+    team_id = team.get("id", "")
+    if not team_id:
+      continue
+    factors = np.empty(len(POSITIONS))
+    for k in range(len(POSITIONS)):
+      slot = (i * len(POSITIONS) + k) % 4
+      if slot == 0:
+        # Weak defender (allows 25-50% more)
+        factors[k] = rng.uniform(1.25, 1.5)
+      elif slot == 1:
+        # Strong defender (allows 50-75%)
+        factors[k] = rng.uniform(0.5, 0.75)
+      elif slot == 2:
+        # Average
+        factors[k] = rng.uniform(0.9, 1.1)
+      else:
+        # Slightly above average
+        factors[k] = rng.uniform(1.05, 1.2)
+    ids.append(team_id)
+    rows.append(league * factors[:, None])
+
+  values = np.stack(rows) if rows else np.empty((0, len(POSITIONS), len(base_stats)))
+  values[:, :, 0] = values[:, :, 0].clip(3.0, 25.0)
+  pra = values[:, :, [base_stats.index(s) for s in PRA_PARTS]].sum(axis=2, keepdims=True)
+  return DefenseTensor(tuple(ids), POSITIONS, STATS, np.concatenate([values, pra], axis=2).round(1))
+
+
+def main(argv: list[str] | None = None) -> int:
+  import corpus
+  from records import GameLogColumns
+
+  parser = argparse.ArgumentParser(
+    description="Time the multi-stat defense tensor against one points-only pass per stat."
+  )
+  parser.add_argument("--games", type=int, default=34, help="Games per team per season.")
+  parser.add_argument("--seasons", type=int, default=10, help="Seasons of history to stack.")
+  args = parser.parse_args(argv)
+
+  league = corpus.synthetic_league(seed=7)
+  rows: list[dict[str, Any]] = []
+  for season in range(args.seasons):
+    for row in corpus.synthetic_game_logs(league, games_per_team=args.games, seed=season):
+      row["game_id"] = f"S{season}_{row['game_id']}"
+      rows.append(row)
+  logs = GameLogColumns.from_records(rows).to_dataframe()
+
+  start = time.perf_counter()
+  tensor = defense_tensor(logs)
+  seconds = time.perf_counter() - start
+
+  import euro_scraper
+
+  start = time.perf_counter()
+  for column in STAT_COLUMNS.values():
+    euro_scraper.calculate_defense_vs_position(logs, points_col=column)
+  per_stat_seconds = time.perf_counter() - start
+
+  print(f"{len(logs)} game rows -> tensor {tensor.values.shape} ({', '.join(tensor.stats)})")
+  print(f"one pass: {seconds * 1000:.1f} ms; one pass per stat: {per_stat_seconds * 1000:.1f} ms")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -1,20 +1,130 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
+import os
 import re
+import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
-from urllib.parse import urljoin
+from typing import Any, Callable, Iterator
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit
 
 import requests
 
+from data_sources import DEFAULT_API_URL, SOURCES, DataSource, LiveData, current_season_start, make_source
+from defense_stats import DefenseTensor, defense_tensor, mock_defense_tensor
+from fetcher import Fetcher, PageCache
+from memory_profile import MemoryProfiler, profile_stage
+from raw_dataset import load_raw_dataset
+from rolling_stats import apply_rolling_stats, rolling_player_stats
+from slips import build_slips
+
 POSITIONS = ("PG", "SG", "SF", "PF", "C")
 
-EUROLEAGUE_BASE_URL = "https://www.euroleaguebasketball.net"
-EUROLEAGUE_TEAMS_URL = "https://www.euroleaguebasketball.net/euroleague/teams/"
-EUROLEAGUE_PLAYERS_URL = "https://www.euroleaguebasketball.net/euroleague/players/"
+DEFAULT_BASE_URL = "https://www.euroleaguebasketball.net"
+
+EUROLEAGUE_BASE_URL = DEFAULT_BASE_URL
+EUROLEAGUE_TEAMS_URL = f"{DEFAULT_BASE_URL}/euroleague/teams/"
+EUROLEAGUE_PLAYERS_URL = f"{DEFAULT_BASE_URL}/euroleague/players/"
+
+_FETCHER: Fetcher | None = None
+
+
+@dataclass(frozen=True)
+class Competition:
+  slug: str
+  code: str
+  name: str
+
+
+COMPETITIONS = {
+  "euroleague": Competition(slug="euroleague", code="E", name="EuroLeague"),
+  "eurocup": Competition(slug="eurocup", code="U", name="EuroCup"),
+}
+DEFAULT_COMPETITION = "euroleague"
+
+# Ranked image URLs kept per team/player so the asset stage can fall back when
+# the first choice turns out to be broken.
+MAX_IMAGE_CANDIDATES = 4
+
+
+def get_competition(slug: str) -> Competition:
+  try:
+    return COMPETITIONS[slug.strip().lower()]
+  except KeyError:
+    raise ValueError(
+      f"Unknown competition {slug!r}. Expected one of: {', '.join(COMPETITIONS)}"
+    ) from None
+
+
+def season_label(season: str) -> str:
+  """Normalise ``2024`` or ``2024-25`` to the site's ``2024-25`` season label."""
+  value = season.strip()
+  match = re.fullmatch(r"(\d{4})(?:-(\d{2}|\d{4}))?", value)
+  if not match:
+    raise ValueError(f"Unrecognised season {season!r}. Use e.g. 2024 or 2024-25.")
+  start = int(match.group(1))
+  return f"{start}-{(start + 1) % 100:02d}"
+
+
+def current_season_label() -> str:
+  """The season in progress, e.g. ``2025-26``."""
+  return season_label(str(current_season_start()))
+
+
+def _with_season(url: str, season: str | None) -> str:
+  if not season:
+    return url
+  parts = urlsplit(url)
+  query = parse_qs(parts.query)
+  query["season"] = [season_label(season)]
+  return parts._replace(query=urlencode(query, doseq=True)).geturl()
+
+
+def _url_context(url: str) -> tuple[str, str | None]:
+  """Competition slug and season encoded in a site URL."""
+  parts = urlsplit(url)
+  match = re.match(r"/(?:en/)?([a-z]+)/", parts.path)
+  competition = match.group(1) if match and match.group(1) in COMPETITIONS else DEFAULT_COMPETITION
+  season = parse_qs(parts.query).get("season", [None])[0]
+  return competition, season
+
+
+def _teams_url(competition: str) -> str:
+  return f"{EUROLEAGUE_BASE_URL}/{get_competition(competition).slug}/teams/"
+
+
+def _players_url(competition: str) -> str:
+  return f"{EUROLEAGUE_BASE_URL}/{get_competition(competition).slug}/players/"
+
+
+def configure_base_url(base_url: str) -> None:
+  """Point every scraper URL at ``base_url`` (e.g. a local replay server)."""
+  global EUROLEAGUE_BASE_URL, EUROLEAGUE_TEAMS_URL, EUROLEAGUE_PLAYERS_URL
+
+  base = base_url.rstrip("/")
+  EUROLEAGUE_BASE_URL = base
+  EUROLEAGUE_TEAMS_URL = f"{base}/euroleague/teams/"
+  EUROLEAGUE_PLAYERS_URL = f"{base}/euroleague/players/"
+
+
+configure_base_url(os.environ.get("EUROLEAGUE_BASE_URL", DEFAULT_BASE_URL))
+
+
+def get_fetcher() -> Fetcher:
+  global _FETCHER
+
+  if _FETCHER is None:
+    _FETCHER = Fetcher()
+  return _FETCHER
+
+
+def set_fetcher(fetcher: Fetcher | None) -> None:
+  global _FETCHER
+
+  _FETCHER = fetcher
 
 
 @dataclass(frozen=True)
@@ -23,37 +133,18 @@ class RawDataPaths:
   output_json: Path
 
 
-def _read_json(path: Path) -> dict[str, Any]:
-  return json.loads(path.read_text(encoding="utf-8"))
-
-
-def _get_soup(url: str) -> "BeautifulSoup":
+def _soup_from_html(html: str) -> "BeautifulSoup":
   from bs4 import BeautifulSoup  # type: ignore
 
-  headers = {
-    "User-Agent": (
-      "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-      "AppleWebKit/537.36 (KHTML, like Gecko) "
-      "Chrome/120.0.0.0 Safari/537.36"
-    )
-  }
+  return BeautifulSoup(html, "html.parser")
 
-  response = requests.get(url, timeout=30, headers=headers)
-  response.raise_for_status()
-  return BeautifulSoup(response.text, "html.parser")
+
+def _get_soup(url: str) -> "BeautifulSoup":
+  return _soup_from_html(_get_html(url))
 
 
 def _get_html(url: str) -> str:
-  headers = {
-    "User-Agent": (
-      "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-      "AppleWebKit/537.36 (KHTML, like Gecko) "
-      "Chrome/120.0.0.0 Safari/537.36"
-    )
-  }
-  response = requests.get(url, timeout=30, headers=headers)
-  response.raise_for_status()
-  return response.text
+  return get_fetcher().get_text(url)
 
 
 def _extract_og_meta(soup: "BeautifulSoup", property_name: str) -> str:
@@ -106,13 +197,14 @@ def _extract_record_from_text(text: str) -> str:
   return f"{match.group(1)}-{match.group(2)}"
 
 
-def _extract_team_code_from_player_html(html: str) -> str:
+def _extract_team_code_from_player_html(html: str, *, competition: str = DEFAULT_COMPETITION) -> str:
   # Try to locate a team code in links embedded in the HTML.
   # Example: /en/euroleague/teams/real-madrid/mad/
-  match = re.search(r"/en/euroleague/teams/[^/]+/([a-z0-9]{2,4})/", html)
+  slug = re.escape(get_competition(competition).slug)
+  match = re.search(rf"/en/{slug}/teams/[^/]+/([a-z0-9]{{2,4}})/", html)
   if match:
     return match.group(1).upper()
-  match = re.search(r"/en/euroleague/teams/[^/]+/roster/([a-z0-9]{2,4})/", html)
+  match = re.search(rf"/en/{slug}/teams/[^/]+/roster/([a-z0-9]{{2,4}})/", html)
   if match:
     return match.group(1).upper()
   return ""
@@ -252,6 +344,24 @@ def _extract_all_media_image_urls(html: str) -> list[str]:
   return ordered
 
 
+_PHOTO_RE = re.compile(r"\"photo\"\s*:\s*\"(https:[^\"]+)\"")
+_CREST_RES = tuple(re.compile(rf"\"{key}\"\s*:\s*\"(https:[^\"]+)\"") for key in ("crest", "logo"))
+
+
+def _rank_candidates(
+  candidates: list[str],
+  score: Callable[[str], tuple[int, ...]],
+  *,
+  limit: int | None = None,
+) -> list[str]:
+  # Best first, ties in page order (nlargest is stable). Zero scores
+  # (generic/league images) never qualify. limit=1 streams like a plain max().
+  scored = ((s, c) for c in dict.fromkeys(candidates) for s in (score(c),) if s[0] > 0)
+  if limit is None:
+    return [c for _, c in sorted(scored, key=lambda item: item[0], reverse=True)]
+  return [c for _, c in heapq.nlargest(limit, scored, key=lambda item: item[0])]
+
+
 def _pick_best_player_image_url(
   *,
   soup: "BeautifulSoup",
@@ -259,11 +369,30 @@ def _pick_best_player_image_url(
   player_name: str,
   player_id: str,
 ) -> str:
-  # Many player pages embed a direct headshot URL.
-  photo_match = re.search(r"\"photo\"\s*:\s*\"(https:[^\"]+)\"", html)
+  # Many player pages embed a direct headshot URL; skip scoring when they do.
+  photo_match = _PHOTO_RE.search(html)
   if photo_match:
     return photo_match.group(1).replace("\\/", "/")
 
+  ranked = _rank_player_image_urls(
+    soup=soup, html=html, player_name=player_name, player_id=player_id, limit=1
+  )
+  return ranked[0] if ranked else ""
+
+
+def _rank_player_image_urls(
+  *,
+  soup: "BeautifulSoup",
+  html: str,
+  player_name: str,
+  player_id: str,
+  limit: int | None = None,
+) -> list[str]:
+  explicit: list[str] = []
+  photo_match = _PHOTO_RE.search(html)
+  if photo_match:
+    explicit.append(photo_match.group(1).replace("\\/", "/"))
+
   candidates: list[str] = []
 
   for url, _ in _extract_jsonld_images(soup):
@@ -324,26 +453,33 @@ def _pick_best_player_image_url(
     name_bonus = 1 if (player_name and player_name.lower().split(" ")[0] in lu) else 0
     return (1, shape_bonus + ext_bonus, cdn_bonus, id_bonus + name_bonus)
 
-  best = ""
-  best_score = (0, 0, 0, 0)
-  for c in candidates:
-    s = score(c)
-    if s > best_score:
-      best_score = s
-      best = c
-
-  return best
+  ranked = _rank_candidates(candidates, score, limit=limit)
+  return list(dict.fromkeys(explicit + ranked))[:limit]
 
 
 def _pick_best_team_logo_url(*, soup: "BeautifulSoup", html: str, team_name: str) -> str:
-  # Team roster pages often embed the crest explicitly.
-  crest_match = re.search(r"\"crest\"\s*:\s*\"(https:[^\"]+)\"", html)
-  if crest_match:
-    return crest_match.group(1).replace("\\/", "/")
+  # Team roster pages often embed the crest explicitly; skip scoring when they do.
+  for pattern in _CREST_RES:
+    match = pattern.search(html)
+    if match:
+      return match.group(1).replace("\\/", "/")
+
+  ranked = _rank_team_logo_urls(soup=soup, html=html, team_name=team_name, limit=1)
+  return ranked[0] if ranked else ""
+
 
-  logo_match = re.search(r"\"logo\"\s*:\s*\"(https:[^\"]+)\"", html)
-  if logo_match:
-    return logo_match.group(1).replace("\\/", "/")
+def _rank_team_logo_urls(
+  *,
+  soup: "BeautifulSoup",
+  html: str,
+  team_name: str,
+  limit: int | None = None,
+) -> list[str]:
+  explicit: list[str] = []
+  for pattern in _CREST_RES:
+    match = pattern.search(html)
+    if match:
+      explicit.append(match.group(1).replace("\\/", "/"))
 
   candidates: list[str] = []
 
@@ -399,94 +535,59 @@ def _pick_best_team_logo_url(*, soup: "BeautifulSoup", html: str, team_name: str
 
     return (1, square_bonus, ext_bonus, cdn_bonus + name_bonus)
 
-  best = ""
-  best_score = (0, 0, 0, 0)
-  for c in candidates:
-    s = score(c)
-    if s > best_score:
-      best_score = s
-      best = c
-
-  return best
-
-
-def _extract_player_ids_from_roster_html(html: str) -> set[str]:
-  # Roster pages contain links like:
-  # /en/euroleague/players/alberto-abalde/003733/
-  ids = set(re.findall(r"/en/euroleague/players/[^/]+/(\d{4,})/", html))
-  return ids
+  ranked = _rank_candidates(candidates, score, limit=limit)
+  return list(dict.fromkeys(explicit + ranked))[:limit]
 
 
-def _extract_player_urls_from_roster_html(html: str) -> set[str]:
+def _extract_player_urls_from_roster_html(
+  html: str,
+  *,
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+) -> set[str]:
+  slug = re.escape(get_competition(competition).slug)
   urls = set(
-    urljoin(EUROLEAGUE_BASE_URL, path)
-    for path in set(re.findall(r"(/en/euroleague/players/[^/]+/\d{4,}/)", html))
+    _with_season(urljoin(EUROLEAGUE_BASE_URL, path), season)
+    for path in set(re.findall(rf"(/en/{slug}/players/[^/]+/\d{{4,}}/)", html))
   )
   return urls
 
 
-def scrape_team_player_map(*, teams: list[dict[str, Any]]) -> dict[str, str]:
-  player_id_to_team_id: dict[str, str] = {}
-  for team in teams:
-    team_id = str(team.get("id", ""))
-    roster_url = str(team.get("rosterUrl", ""))
-    if not team_id or not roster_url:
-      continue
-
-    roster_html = _get_html(roster_url)
-    for player_id in _extract_player_ids_from_roster_html(roster_html):
-      player_id_to_team_id.setdefault(player_id, team_id)
-
-  return player_id_to_team_id
+def parse_roster_page(roster_url: str, html: str, *, team_name: str) -> dict[str, Any]:
+  soup = _soup_from_html(html)
+  competition, season = _url_context(roster_url)
+  player_urls = _extract_player_urls_from_roster_html(html, competition=competition, season=season)
+  logo_urls = _rank_team_logo_urls(
+    soup=soup, html=html, team_name=team_name, limit=MAX_IMAGE_CANDIDATES
+  )
+  return {
+    "url": roster_url,
+    "logoUrl": logo_urls[0] if logo_urls else "",
+    "logoCandidates": logo_urls,
+    "record": _extract_record_from_text(soup.get_text(" ", strip=True)),
+    "playerUrls": sorted(player_urls),
+  }
 
 
-def scrape_players_from_rosters(
+def iter_team_links(
   *,
-  teams: list[dict[str, Any]],
-  max_players: int | None = None,
-) -> list[dict[str, Any]]:
-  player_urls: list[str] = []
-  seen: set[str] = set()
-
-  for team in teams:
-    roster_url = str(team.get("rosterUrl", ""))
-    if not roster_url:
-      continue
-    roster_html = _get_html(roster_url)
-    for url in sorted(_extract_player_urls_from_roster_html(roster_html)):
-      if url in seen:
-        continue
-      seen.add(url)
-      player_urls.append(url)
-      if max_players is not None and len(player_urls) >= max_players:
-        break
-    if max_players is not None and len(player_urls) >= max_players:
-      break
-
-  players: list[dict[str, Any]] = []
-  for url in player_urls:
-    details = scrape_player_details(url)
-    if details is not None:
-      players.append(details)
-
-  return players
-
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+) -> Iterator[tuple[str, str, str]]:
+  """``(code, name, roster_url)`` for each team on the listing page, in page order."""
+  soup = _get_soup(_with_season(_teams_url(competition), season))
+  slug = get_competition(competition).slug
 
-def scrape_teams(*, max_teams: int | None = None) -> list[dict[str, Any]]:
-  soup = _get_soup(EUROLEAGUE_TEAMS_URL)
-
-  teams: list[dict[str, Any]] = []
   seen_codes: set[str] = set()
-
   for a in soup.find_all("a", href=True):
     href = str(a["href"])
-    if "/en/euroleague/teams/" not in href:
+    if f"/en/{slug}/teams/" not in href:
       continue
     if "/roster/" not in href:
       continue
 
     # Example: /en/euroleague/teams/real-madrid/roster/mad/
-    match = re.search(r"/en/euroleague/teams/[^/]+/roster/([a-z0-9]+)/?", href)
+    match = re.search(rf"/en/{re.escape(slug)}/teams/[^/]+/roster/([a-z0-9]+)/?", href)
     if not match:
       continue
 
@@ -498,53 +599,66 @@ def scrape_teams(*, max_teams: int | None = None) -> list[dict[str, Any]]:
     if not name:
       continue
 
-    roster_url = _absolute_url(href)
-    roster_html = _get_html(roster_url)
-    roster_soup = _get_soup(roster_url)
-    logo_url = _pick_best_team_logo_url(
-      soup=roster_soup,
-      html=roster_html,
-      team_name=name,
-    )
-    record = _extract_record_from_text(roster_soup.get_text(" ", strip=True))
-
-    teams.append(
-      {
-        "id": code,
-        "name": name,
-        "logoUrl": logo_url,
-        "record": record,
-        "rosterUrl": roster_url,
-      }
-    )
     seen_codes.add(code)
+    yield code, name, _with_season(_absolute_url(href), season)
 
+
+def team_from_roster(code: str, name: str, roster: dict[str, Any]) -> dict[str, Any]:
+  return {
+    "id": code,
+    "name": name,
+    "logoUrl": roster["logoUrl"],
+    "record": roster["record"],
+    "rosterUrl": roster["url"],
+    "logoCandidates": roster["logoCandidates"],
+  }
+
+
+def scrape_teams(
+  *,
+  max_teams: int | None = None,
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+) -> list[dict[str, Any]]:
+  teams: list[dict[str, Any]] = []
+  for code, name, roster_url in iter_team_links(competition=competition, season=season):
+    roster = parse_roster_page(roster_url, _get_html(roster_url), team_name=name)
+    teams.append(team_from_roster(code, name, roster))
     if max_teams is not None and len(teams) >= max_teams:
       break
 
   return teams
 
 
-def _extract_team_code_from_player_page(soup: "BeautifulSoup") -> str:
+def _extract_team_code_from_player_page(
+  soup: "BeautifulSoup",
+  *,
+  competition: str = DEFAULT_COMPETITION,
+) -> str:
   # Prefer explicit team links like: /en/euroleague/teams/real-madrid/mad/
+  slug = re.escape(get_competition(competition).slug)
   for a in soup.find_all("a", href=True):
     href = str(a["href"])
-    match = re.search(r"/en/euroleague/teams/[^/]+/([a-z0-9]{2,4})/?", href)
+    match = re.search(rf"/en/{slug}/teams/[^/]+/([a-z0-9]{{2,4}})/?", href)
     if match:
       return match.group(1).upper()
-    match = re.search(r"/en/euroleague/teams/[^/]+/roster/([a-z0-9]{2,4})/?", href)
+    match = re.search(rf"/en/{slug}/teams/[^/]+/roster/([a-z0-9]{{2,4}})/?", href)
     if match:
       return match.group(1).upper()
   return ""
 
 
 def scrape_player_details(player_url: str) -> dict[str, Any] | None:
-  html = _get_html(player_url)
-  soup = _get_soup(player_url)
+  return parse_player_details(player_url, _get_html(player_url))
+
+
+def parse_player_details(player_url: str, html: str) -> dict[str, Any] | None:
+  soup = _soup_from_html(html)
+  competition, _ = _url_context(player_url)
 
   name = (
     _extract_og_meta(soup, "og:title")
-    .replace("| EuroLeague", "")
+    .replace(f"| {get_competition(competition).name}", "")
     .strip()
   )
   if not name:
@@ -558,6 +672,9 @@ def scrape_player_details(player_url: str) -> dict[str, Any] | None:
 
   text = soup.get_text(" ", strip=True)
   season_pts = _extract_first_float(r"([0-9]+(?:\.[0-9]+)?)\s*PTS", text) or 0.0
+  season_reb = _extract_first_float(r"([0-9]+(?:\.[0-9]+)?)\s*REB\b", text) or 0.0
+  season_ast = _extract_first_float(r"([0-9]+(?:\.[0-9]+)?)\s*AST\b", text) or 0.0
+  season_3pm = _extract_first_float(r"([0-9]+(?:\.[0-9]+)?)\s*3PM\b", text) or 0.0
 
   # Position appears near the header in a stable pattern:
   # "Guard" / "Forward" / "Center" before "Nationality".
@@ -566,12 +683,16 @@ def scrape_player_details(player_url: str) -> dict[str, Any] | None:
   if pos_match:
     position = _normalize_player_position(pos_match.group(1))
 
-  team_id = _extract_team_code_from_player_html(html) or _extract_team_code_from_player_page(soup)
-  image_url = _pick_best_player_image_url(
+  team_id = (
+    _extract_team_code_from_player_html(html, competition=competition)
+    or _extract_team_code_from_player_page(soup, competition=competition)
+  )
+  image_urls = _rank_player_image_urls(
     soup=soup,
     html=html,
     player_name=name,
     player_id=player_id,
+    limit=MAX_IMAGE_CANDIDATES,
   )
 
   return {
@@ -579,25 +700,35 @@ def scrape_player_details(player_url: str) -> dict[str, Any] | None:
     "name": name,
     "teamId": team_id,
     "position": position,
-    "imageUrl": image_url,
+    "imageUrl": image_urls[0] if image_urls else "",
     "seasonAvgPts": round(float(season_pts), 1),
+    "seasonAvgReb": round(float(season_reb), 1),
+    "seasonAvgAst": round(float(season_ast), 1),
+    "seasonAvg3pm": round(float(season_3pm), 1),
     "last5AvgPts": round(float(season_pts), 1),
+    "imageCandidates": image_urls,
   }
 
 
-def scrape_players(*, max_players: int | None = None) -> list[dict[str, Any]]:
-  soup = _get_soup(EUROLEAGUE_PLAYERS_URL)
+def scrape_players(
+  *,
+  max_players: int | None = None,
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+) -> list[dict[str, Any]]:
+  soup = _get_soup(_with_season(_players_url(competition), season))
+  slug = get_competition(competition).slug
 
   player_urls: list[str] = []
   seen: set[str] = set()
   for a in soup.find_all("a", href=True):
     href = str(a["href"])
-    if "/en/euroleague/players/" not in href:
+    if f"/en/{slug}/players/" not in href:
       continue
-    if not re.search(r"/en/euroleague/players/[^/]+/\d{4,}/", href):
+    if not re.search(rf"/en/{re.escape(slug)}/players/[^/]+/\d{{4,}}/", href):
       continue
 
-    url = _absolute_url(href)
+    url = _with_season(_absolute_url(href), season)
     if url in seen:
       continue
 
@@ -608,7 +739,12 @@ def scrape_players(*, max_players: int | None = None) -> list[dict[str, Any]]:
 
   players: list[dict[str, Any]] = []
   for url in player_urls:
-    details = scrape_player_details(url)
+    try:
+      details = scrape_player_details(url)
+    except requests.RequestException as e:
+      # One unreachable player page should not sink the whole build.
+      print(f"Skipping player page {url}: {e}")
+      continue
     if details is not None:
       players.append(details)
 
@@ -616,19 +752,11 @@ def scrape_players(*, max_players: int | None = None) -> list[dict[str, Any]]:
 
 
 def get_standings(raw_json_path: str | Path = "scraper/raw_input.json") -> pd.DataFrame:
-  import pandas as pd
-
-  raw = _read_json(Path(raw_json_path))
-  rows = raw.get("standings", [])
-  return pd.DataFrame(rows)
+  return load_raw_dataset(raw_json_path).frame("standings")
 
 
 def get_player_stats(raw_json_path: str | Path = "scraper/raw_input.json") -> pd.DataFrame:
-  import pandas as pd
-
-  raw = _read_json(Path(raw_json_path))
-  rows = raw.get("player_stats", [])
-  return pd.DataFrame(rows)
+  return load_raw_dataset(raw_json_path).frame("player_stats")
 
 
 def _normalize_position(value: Any) -> str:
@@ -647,6 +775,28 @@ def _normalize_position(value: Any) -> str:
   return "PG"
 
 
+def calculate_defense_tensor(
+  player_game_logs: "pd.DataFrame",
+  *,
+  opponent_team_id_col: str = "opponent_team_id",
+  position_col: str = "position",
+  game_id_col: str = "game_id",
+  stat_columns: dict[str, str] | None = None,
+) -> DefenseTensor:
+  """Allowed per game by team x position x stat (points, rebounds, assists, threes, PRA)."""
+  logs = player_game_logs
+  if not logs.empty:
+    logs = logs.assign(**{position_col: logs[position_col].map(_normalize_position)})
+  return defense_tensor(
+    logs,
+    opponent_team_id_col=opponent_team_id_col,
+    position_col=position_col,
+    game_id_col=game_id_col,
+    stat_columns=stat_columns,
+    positions=POSITIONS,
+  )
+
+
 def calculate_defense_vs_position(
   player_game_logs: "pd.DataFrame",
   *,
@@ -655,75 +805,70 @@ def calculate_defense_vs_position(
   points_col: str = "points",
   game_id_col: str = "game_id",
 ) -> dict[str, dict[str, float]]:
-  import pandas as pd
-
   if player_game_logs.empty:
     return {}
 
-  df = player_game_logs.copy()
-  df[position_col] = df[position_col].map(_normalize_position)
-  df[points_col] = pd.to_numeric(df[points_col], errors="coerce").fillna(0.0)
-
-  if game_id_col not in df.columns:
-    df[game_id_col] = df.index.astype(str)
-
-  grouped = (
-    df.groupby([opponent_team_id_col, position_col, game_id_col])[points_col]
-    .sum()
-    .reset_index()
+  tensor = calculate_defense_tensor(
+    player_game_logs,
+    opponent_team_id_col=opponent_team_id_col,
+    position_col=position_col,
+    game_id_col=game_id_col,
+    stat_columns={"points": points_col},
   )
-
-  per_game_allowed = (
-    grouped.groupby([opponent_team_id_col, position_col])[points_col]
-    .mean()
-    .reset_index()
-  )
-
-  matrix: dict[str, dict[str, float]] = {}
-  for _, row in per_game_allowed.iterrows():
-    team_id = str(row[opponent_team_id_col])
-    position = str(row[position_col])
-    allowed = float(row[points_col])
-
-    team_row = matrix.setdefault(team_id, {p: 0.0 for p in POSITIONS})
-    team_row[position] = round(allowed, 2)
-
-  return matrix
+  return tensor.matrix("points")
 
 
-def build_euro_data(raw_json_path: str | Path) -> dict[str, Any]:
+def build_euro_data(raw_json_path: str | Path, *, profiler: MemoryProfiler | None = None) -> dict[str, Any]:
   requested_path = Path(raw_json_path)
-  if requested_path.exists():
-    raw = _read_json(requested_path)
-  else:
-    fallback_path = Path("resources/data.json")
-    if fallback_path.exists():
-      raw = _read_json(fallback_path)
+  with profile_stage(profiler, "load"):
+    if requested_path.exists():
+      dataset = load_raw_dataset(requested_path)
     else:
-      raise FileNotFoundError(
-        f"Raw input not found: {requested_path}. "
-        f"Also missing fallback: {fallback_path}."
-      )
-
-  teams = raw.get("teams", [])
-  schedule = raw.get("schedule", [])
-  players = raw.get("players", [])
-
-  import pandas as pd
-
-  player_game_logs_df = pd.DataFrame(raw.get("player_game_logs", []))
-  defense_vs_position = calculate_defense_vs_position(player_game_logs_df)
-
-  return {
+      fallback_path = Path("resources/data.json")
+      if fallback_path.exists():
+        print(f"Raw input not found: {requested_path}; rebuilding from {fallback_path}.")
+        dataset = load_raw_dataset(fallback_path)
+      else:
+        raise FileNotFoundError(
+          f"Raw input not found: {requested_path}. "
+          f"Also missing fallback: {fallback_path}."
+        )
+
+    # Copies: the dataset is shared across calls and rolling stats update players in place.
+    teams = dataset.records("teams")
+    schedule = dataset.records("schedule")
+    players = dataset.records("players")
+    player_game_logs_df = dataset.game_logs()
+
+  with profile_stage(profiler, "defense"):
+    # Every market from one groupby; points keep their defense_vs_position shape for the app.
+    tensor = calculate_defense_tensor(player_game_logs_df)
+  with profile_stage(profiler, "rolling"):
+    # Real recency stats when game logs exist; otherwise players keep what they came with.
+    apply_rolling_stats(players, rolling_player_stats(player_game_logs_df))
+
+  data = {
     "teams": teams,
     "players": players,
-    "defense_vs_position": defense_vs_position,
+    "defense_vs_position": tensor.matrix("points"),
+    "defense_tensor": tensor.to_json(),
     "schedule": schedule,
   }
+  with profile_stage(profiler, "score"):
+    data["slips"] = build_slips(data)
+  return data
+
 
+def _generate_mock_schedule(
+  teams: list[dict[str, Any]],
+  *,
+  today: "datetime.date | None" = None,
+) -> list[dict[str, Any]]:
+  """Generate a mock schedule for all teams.
 
-def _generate_mock_schedule(teams: list[dict[str, Any]]) -> list[dict[str, Any]]:
-  """Generate a mock schedule for all teams."""
+  Games start tomorrow. With ``today`` the schedule depends only on its
+  arguments, and every game tips off at 20:00.
+  """
   import datetime
   import itertools
   
@@ -731,7 +876,10 @@ def _generate_mock_schedule(teams: list[dict[str, Any]]) -> list[dict[str, Any]]
   team_ids = [t.get("id", "") for t in teams if t.get("id")]
   
   # Create simple round-robin schedule
-  start_date = datetime.datetime.now() + datetime.timedelta(days=1)
+  if today is None:
+    start_date = datetime.datetime.now() + datetime.timedelta(days=1)
+  else:
+    start_date = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time(20, 0))
   
   for i, (team_a, team_b) in enumerate(itertools.combinations(team_ids, 2)):
     game_date = start_date + datetime.timedelta(days=(i % 30))
@@ -745,108 +893,181 @@ def _generate_mock_schedule(teams: list[dict[str, Any]]) -> list[dict[str, Any]]
   return schedule
 
 
-def _generate_mock_defense_stats(
-  teams: list[dict[str, Any]],
-  players: list[dict[str, Any]],
-) -> dict[str, dict[str, float]]:
-  """Generate mock defense stats for all teams by position."""
-  import random
-  
-  POSITIONS = ["PG", "SG", "SF", "PF", "C"]
-  defense_vs_position = {}
-  
-  # Calculate league average by position
-  position_stats = {pos: {"total": 0.0, "count": 0} for pos in POSITIONS}
-  
-  for player in players:
-    pos = player.get("position", "C")
-    avg_pts = player.get("seasonAvgPts", 10.0)
-    position_stats[pos]["total"] += avg_pts
-    position_stats[pos]["count"] += 1
-  
-  # Set defaults for missing positions
-  league_avg = {}
-  for pos in POSITIONS:
-    stats = position_stats[pos]
-    if stats["count"] > 0:
-      league_avg[pos] = stats["total"] / stats["count"]
-    else:
-      league_avg[pos] = 12.0
-  
-  # Generate defense stats for each team with intentional variation
-  for i, team in enumerate(teams):
-    team_id = team.get("id", "")
-    if not team_id:
-      continue
-    
-    team_defense = {}
-    
-    for pos in POSITIONS:
-      # Create varied defense stats
-      team_pos_idx = i * 5 + POSITIONS.index(pos)
-      
-      if team_pos_idx % 4 == 0:
-        # Weak defender (allows 25-50% more)
-        factor = random.uniform(1.25, 1.5)
-      elif team_pos_idx % 4 == 1:
-        # Strong defender (allows 50-75%)
-        factor = random.uniform(0.5, 0.75)
-      elif team_pos_idx % 4 == 2:
-        # Average
-        factor = random.uniform(0.9, 1.1)
-      else:
-        # Slightly above average
-        factor = random.uniform(1.05, 1.2)
-      
-      allowed_pts = league_avg.get(pos, 12.0) * factor
-      allowed_pts = max(3.0, min(25.0, allowed_pts))
-      
-      team_defense[pos] = round(allowed_pts, 1)
-    
-    defense_vs_position[team_id] = team_defense
-  
-  return defense_vs_position
+class HtmlSource(DataSource):
+  """Scrape the site's team and player pages; the fallback for the JSON API."""
+
+  name = "html"
+
+  def __init__(
+    self,
+    *,
+    competition: str = DEFAULT_COMPETITION,
+    season: str | None = None,
+    parse_workers: int = 1,
+    fetch_workers: int = 8,
+  ) -> None:
+    self.competition = competition
+    self.season = season
+    self.parse_workers = parse_workers
+    self.fetch_workers = fetch_workers
+
+  def fetch(self, *, max_teams: int | None = None, max_players: int | None = None) -> LiveData:
+    from parse_pool import make_parse_executor, parse_page
+    from pipeline import PlayerPipeline
+
+    competition, season = self.competition, self.season
+    executor = None
+    if self.parse_workers > 1:
+      executor = make_parse_executor(self.parse_workers, base_url=EUROLEAGUE_BASE_URL)
+    try:
+      result = PlayerPipeline(
+        fetcher=get_fetcher(),
+        team_links=lambda: iter_team_links(competition=competition, season=season),
+        parse_roster=lambda url, html, name: parse_roster_page(url, html, team_name=name),
+        make_team=team_from_roster,
+        parse_player=parse_player_details,
+        max_teams=max_teams,
+        max_players=max_players,
+        fetch_workers=self.fetch_workers,
+        parse_executor=executor,
+        pool_parse=parse_page,
+      ).run()
+    finally:
+      if executor is not None:
+        executor.shutdown()
+    print(f"[pipeline] {result.report()}")
+
+    players = result.players
+    if not players:
+      players = scrape_players(max_players=max_players, competition=competition, season=season)
+    return LiveData(teams=result.teams, players=players, source=self.name)
+
+
+def sitemap_sync(
+  fetcher: Fetcher,
+  sitemap_url: str,
+  *,
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+) -> "SitemapSync":
+  """A ``SitemapSync`` whose cache keys match the URLs this scraper fetches."""
+  from sitemap import SitemapSync
+
+  return SitemapSync(
+    fetcher,
+    sitemap_url,
+    competition_slug=get_competition(competition).slug,
+    # Sitemaps list canonical pages; the scrape asks for them on this base URL, for this season.
+    page_url=lambda loc: _with_season(_absolute_url(urlsplit(loc).path), season),
+    listings=[_with_season(_teams_url(competition), season)],
+  )
 
 
-def build_euro_data_live(*, max_teams: int | None = None, max_players: int | None = None) -> dict[str, Any]:
-  teams = scrape_teams(max_teams=max_teams)
+def build_euro_data_live(
+  *,
+  max_teams: int | None = None,
+  max_players: int | None = None,
+  parse_workers: int = 1,
+  fetch_workers: int = 8,
+  competition: str = DEFAULT_COMPETITION,
+  season: str | None = None,
+  assets_dir: str | Path | None = None,
+  asset_workers: int = 8,
+  sitemap_url: str | None = None,
+  source: str = "html",
+  api_url: str | None = None,
+) -> dict[str, Any]:
+  sync = None
+  if sitemap_url is not None and source != "api":
+    # Unchanged pages are then served from the cache; only the diff hits the network.
+    sync = sitemap_sync(
+      get_fetcher(),
+      urljoin(EUROLEAGUE_BASE_URL + "/", sitemap_url),
+      competition=competition,
+      season=season,
+    )
+    print(f"[sitemap] {sync.plan().as_dict()}")
+
+  if api_url is None and EUROLEAGUE_BASE_URL != DEFAULT_BASE_URL:
+    # A replay server stands in for both the site and its API.
+    api_url = EUROLEAGUE_BASE_URL
+  live = make_source(
+    source,
+    fetcher=get_fetcher(),
+    html=lambda: HtmlSource(
+      competition=competition,
+      season=season,
+      parse_workers=parse_workers,
+      fetch_workers=fetch_workers,
+    ),
+    api_url=api_url,
+    competition_code=get_competition(competition).code,
+    season=season,
+  ).fetch(max_teams=max_teams, max_players=max_players)
+  teams, players = live.teams, live.players
+  print(f"[source] {live.source}: {len(teams)} teams, {len(players)} players")
+
+  if assets_dir is not None:
+    from assets import build_assets
+
+    build_assets(
+      teams=teams,
+      players=players,
+      out_dir=assets_dir,
+      fetcher=get_fetcher(),
+      workers=asset_workers,
+    )
 
-  player_id_to_team_id = scrape_team_player_map(teams=teams)
+  data = assemble_live_data(teams, players, schedule=live.schedule)
+  if sync is not None:
+    sync.commit()
+  return data
 
-  # Prefer roster-based players so teamId is guaranteed.
-  players = scrape_players_from_rosters(teams=teams, max_players=max_players)
-  if not players:
-    players = scrape_players(max_players=max_players)
 
-  # Ensure all players have a teamId that exists.
-  team_ids = {t.get("id", "") for t in teams}
-  for p in players:
-    pid = str(p.get("id", ""))
-    mapped = player_id_to_team_id.get(pid, "")
-    if mapped:
-      p["teamId"] = mapped
-    if p.get("teamId") not in team_ids:
-      p["teamId"] = ""
+# Keys the scrape stages use internally that never go into data.json.
+_SCRAPE_ONLY_KEYS = frozenset({"rosterUrl", "logoCandidates", "imageCandidates"})
 
-  for t in teams:
-    t.pop("rosterUrl", None)
 
-  # Generate mock schedule and defense stats
-  schedule = _generate_mock_schedule(teams)
-  defense_vs_position = _generate_mock_defense_stats(teams, players)
+def assemble_live_data(
+  teams: list[dict[str, Any]],
+  players: list[dict[str, Any]],
+  *,
+  schedule: list[dict[str, Any]] | None = None,
+  defense_vs_position: dict[str, dict[str, float]] | None = None,
+  defense_tensor: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+  """Build the data.json payload; pass ``schedule``/``defense_*`` from an earlier one to reuse them."""
+  teams = [{k: v for k, v in t.items() if k not in _SCRAPE_ONLY_KEYS} for t in teams]
+  players = [{k: v for k, v in p.items() if k not in _SCRAPE_ONLY_KEYS} for p in players]
 
-  return {
+  # Generate mock schedule and defense stats
+  if schedule is None:
+    schedule = _generate_mock_schedule(teams)
+  if defense_vs_position is None or defense_tensor is None:
+    mock = mock_defense_tensor(teams, players)
+    defense_vs_position = mock.matrix("points", digits=1)
+    defense_tensor = mock.to_json(digits=1)
+
+  data = {
     "teams": teams,
     "players": players,
     "defense_vs_position": defense_vs_position,
+    "defense_tensor": defense_tensor,
     "schedule": schedule,
   }
+  data["slips"] = build_slips(data)
+  return data
 
 
 def save_to_json(data: dict[str, Any], *, output_path: str | Path) -> Path:
   path = Path(output_path)
   path.parent.mkdir(parents=True, exist_ok=True)
-  path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+  # Write-then-rename so readers (the app, a watch loop's consumers) never see a partial file.
+  fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+  with os.fdopen(fd, "w", encoding="utf-8") as f:
+    f.write(json.dumps(data, indent=2))
+  os.chmod(tmp, 0o644)
+  os.replace(tmp, path)
   return path
 
 
@@ -890,6 +1111,38 @@ def scrape_basketball_reference_euroleague(*, url: str) -> dict[str, Any]:
   }
 
 
+def _run_watch(args: argparse.Namespace, competitions: list[str]) -> int:
+  from shards import expand_seasons, plan_shards
+  from watch import PollPolicy, Watcher
+
+  specs = plan_shards(competitions, expand_seasons(args.season))
+  if len(specs) > 1:
+    raise SystemExit("--watch follows a single competition and season.")
+
+  # Conditional requests need somewhere to keep bodies and validators.
+  cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="euro-watch-")
+  set_fetcher(Fetcher(cache=PageCache(cache_dir, namespace=specs[0].name)))
+
+  watcher = Watcher(
+    output_path=args.out,
+    competition=specs[0].competition,
+    season=specs[0].season,
+    policy=PollPolicy(idle=args.poll_idle, near=args.poll_near),
+    max_teams=args.max_teams,
+    events_path=args.events,
+    # The replay stand-in serves the API too, as in build_euro_data_live.
+    api_url=args.api_url
+    or (EUROLEAGUE_BASE_URL if EUROLEAGUE_BASE_URL != DEFAULT_BASE_URL else None)
+    or os.environ.get("EUROLEAGUE_API_URL", DEFAULT_API_URL),
+  )
+  try:
+    watcher.run()
+  except KeyboardInterrupt:
+    pass
+  print(f"[watch] stopped after {watcher.writes} writes; fetch stats: {get_fetcher().stats.as_dict()}")
+  return 0
+
+
 def main(argv: list[str] | None = None) -> int:
   parser = argparse.ArgumentParser()
   parser.add_argument(
@@ -909,6 +1162,178 @@ def main(argv: list[str] | None = None) -> int:
     default=None,
     help="Limit number of players scraped (useful for debugging).",
   )
+  parser.add_argument(
+    "--parse-workers",
+    type=int,
+    default=1,
+    help="Parse player pages on this many processes (1 keeps parsing in-process).",
+  )
+  parser.add_argument(
+    "--fetch-workers",
+    type=int,
+    default=8,
+    help="Concurrent player page downloads; rosters, downloads and parsing run as overlapping stages.",
+  )
+  parser.add_argument(
+    "--base-url",
+    default=None,
+    help=(
+      "Override the EuroLeague site root, e.g. a local replay server "
+      "(defaults to $EUROLEAGUE_BASE_URL or the real site)."
+    ),
+  )
+  parser.add_argument(
+    "--competition",
+    action="append",
+    default=None,
+    help=f"Competition to scrape ({', '.join(COMPETITIONS)}); repeat for several.",
+  )
+  parser.add_argument(
+    "--season",
+    action="append",
+    default=None,
+    help="Season to scrape, e.g. 2024, 2024-25 or a range 2020:2024; repeat for several.",
+  )
+  parser.add_argument(
+    "--shard-dir",
+    default=None,
+    help=(
+      "Scrape every competition x season as an independent shard into this directory "
+      "(implied when more than one is requested) and write a merged index.json."
+    ),
+  )
+  parser.add_argument(
+    "--shard-workers",
+    type=int,
+    default=4,
+    help="Number of shards scraped in parallel.",
+  )
+  parser.add_argument(
+    "--cache-dir",
+    default=None,
+    help="Cache fetched pages on disk here; each shard gets its own namespace.",
+  )
+  parser.add_argument(
+    "--cache-ttl",
+    type=float,
+    default=None,
+    help="Seconds before a cached page is refetched (default: never).",
+  )
+  parser.add_argument(
+    "--watch",
+    action="store_true",
+    help=(
+      "Keep running after the first scrape: poll roster pages with conditional "
+      "requests, more often around the schedule's tip-offs, and rewrite --out "
+      "atomically whenever something changes (implies --live)."
+    ),
+  )
+  parser.add_argument(
+    "--poll-idle",
+    type=float,
+    default=30 * 60,
+    help="Seconds between roster polls for teams with no game coming up (--watch).",
+  )
+  parser.add_argument(
+    "--poll-near",
+    type=float,
+    default=60,
+    help="Seconds between roster polls from lineup announcements to tip-off (--watch).",
+  )
+  parser.add_argument(
+    "--source",
+    choices=SOURCES,
+    default="html",
+    help=(
+      "Where live data comes from: HTML scraping (the default), the site's JSON API, "
+      "or auto (the API, falling back to HTML when it fails)."
+    ),
+  )
+  parser.add_argument(
+    "--api-url",
+    default=None,
+    help="Override the JSON API root (defaults to $EUROLEAGUE_API_URL, the --base-url stand-in, or the real API).",
+  )
+  parser.add_argument(
+    "--sitemap",
+    nargs="?",
+    const="/sitemap.xml",
+    default=None,
+    help=(
+      "Read the site's sitemap (or this sitemap URL) and refetch only team/player "
+      "pages whose lastmod moved since the last run; the rest come from "
+      "--cache-dir, which this requires."
+    ),
+  )
+  parser.add_argument(
+    "--assets-dir",
+    default=None,
+    help=(
+      "Prefetch and validate every logo/headshot, falling back to the next-ranked "
+      "image when one is broken, and write thumbnails, a team-logo sprite and "
+      "manifest.json here (per shard in shard mode)."
+    ),
+  )
+  parser.add_argument(
+    "--asset-workers",
+    type=int,
+    default=8,
+    help="Concurrent image fetches for --assets-dir.",
+  )
+  parser.add_argument(
+    "--analytics-dir",
+    default=None,
+    help=(
+      "Also export game logs, player snapshots and defense stats here as Parquet "
+      "partitioned by season and team (needs pyarrow; see analytics_export.py)."
+    ),
+  )
+  parser.add_argument(
+    "--events",
+    default=None,
+    help=(
+      "Compare each build with the data.json it replaces and append new green-light "
+      "tips, dropped tips and large line or defense moves to this sequence-numbered "
+      "feed, for push notifications (see tip_feed.py)."
+    ),
+  )
+  parser.add_argument(
+    "--stage-dir",
+    default=None,
+    help=(
+      "Run the HTML build as stages (discover, fetch, extract, aggregate, score, "
+      "export), keeping each stage's output here keyed by a hash of its inputs and "
+      "code, so unchanged stages are not redone (implies --live; see stages.py)."
+    ),
+  )
+  parser.add_argument(
+    "--only",
+    default=None,
+    metavar="STAGE",
+    help="With --stage-dir: run just this stage on the last run's upstream outputs.",
+  )
+  parser.add_argument(
+    "--from",
+    dest="from_stage",
+    default=None,
+    metavar="STAGE",
+    help="With --stage-dir: reuse the last run's outputs before this stage and run it and everything after.",
+  )
+  parser.add_argument(
+    "--force",
+    action="store_true",
+    help="With --stage-dir: re-run the selected stages even when their inputs are unchanged.",
+  )
+  parser.add_argument(
+    "--profile-memory",
+    default=None,
+    metavar="REPORT",
+    help=(
+      "Record traced peak memory, RSS and the top allocation sites for each build "
+      "stage, print a summary and write the report (JSON) here. Slows the build "
+      "down; see memory_profile.py for budgets."
+    ),
+  )
   parser.add_argument(
     "--raw",
     default="scraper/raw_input.json",
@@ -921,13 +1346,105 @@ def main(argv: list[str] | None = None) -> int:
   )
 
   args = parser.parse_args(argv)
+  if args.base_url:
+    configure_base_url(args.base_url)
+
+  competitions = args.competition or [DEFAULT_COMPETITION]
+  profiler = MemoryProfiler() if args.profile_memory else None
+  if profiler is not None and args.watch:
+    raise SystemExit("--profile-memory profiles a single build, not --watch.")
+  if args.sitemap and not args.cache_dir:
+    raise SystemExit("--sitemap needs --cache-dir to serve unchanged pages from.")
+  if (args.only or args.from_stage or args.force) and not args.stage_dir:
+    raise SystemExit("--only, --from and --force apply to a staged build; add --stage-dir.")
+  if args.analytics_dir and not (args.live or args.stage_dir or args.season):
+    raise SystemExit("--analytics-dir needs --season for a raw build, e.g. --season 2024.")
+  if args.watch:
+    return _run_watch(args, competitions)
+  if args.live or args.stage_dir:
+    from shards import expand_seasons, plan_shards, run_shards
+
+    specs = plan_shards(competitions, expand_seasons(args.season))
+    if args.stage_dir and len(specs) > 1:
+      raise SystemExit("--stage-dir builds one competition and season at a time.")
+    if args.shard_dir or len(specs) > 1:
+      if profiler is not None:
+        raise SystemExit("--profile-memory profiles a single build; shards run in their own processes.")
+      shard_dir = args.shard_dir or str(Path(args.out).parent / "shards")
+      print(f"Scraping {len(specs)} shards into {shard_dir}...")
+      index_path = run_shards(
+        specs,
+        out_dir=shard_dir,
+        # Pass explicitly: when run as a script this module is __main__, not the
+        # euro_scraper module that shards imports.
+        base_url=EUROLEAGUE_BASE_URL,
+        workers=args.shard_workers,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl,
+        max_teams=args.max_teams,
+        max_players=args.max_players,
+        parse_workers=args.parse_workers,
+        fetch_workers=args.fetch_workers,
+        with_assets=bool(args.assets_dir),
+        asset_workers=args.asset_workers,
+        sitemap_url=args.sitemap,
+        source=args.source,
+        api_url=args.api_url,
+      )
+      print(f"Wrote shard index to {index_path}")
+      return 0
+
+    if args.cache_dir:
+      set_fetcher(
+        Fetcher(cache=PageCache(args.cache_dir, namespace=specs[0].name, max_age=args.cache_ttl))
+      )
+    if args.stage_dir:
+      from stages import StageError, run_staged_build
+
+      try:
+        run_staged_build(
+          specs[0],
+          stage_dir=args.stage_dir,
+          base_url=EUROLEAGUE_BASE_URL,
+          fetcher=get_fetcher(),
+          only=args.only,
+          start=args.from_stage,
+          force=args.force,
+          max_teams=args.max_teams,
+          max_players=args.max_players,
+          fetch_workers=args.fetch_workers,
+          parse_workers=args.parse_workers,
+          out=args.out,
+          analytics_dir=args.analytics_dir,
+          events_path=args.events,
+          profiler=profiler,
+        )
+      except (StageError, ValueError) as e:
+        raise SystemExit(str(e))
+      if profiler is not None:
+        profiler.write_report(args.profile_memory)
+      return 0
 
   print("Fetching fresh EuroLeague data...")
   try:
     if args.live:
-      data = build_euro_data_live(max_teams=args.max_teams, max_players=args.max_players)
+      # The live stages overlap on threads, so they are profiled as one.
+      with profile_stage(profiler, "scrape"):
+        data = build_euro_data_live(
+          max_teams=args.max_teams,
+          max_players=args.max_players,
+          parse_workers=args.parse_workers,
+          fetch_workers=args.fetch_workers,
+          competition=specs[0].competition,
+          season=specs[0].season,
+          assets_dir=args.assets_dir,
+          asset_workers=args.asset_workers,
+          sitemap_url=args.sitemap,
+          source=args.source,
+          api_url=args.api_url,
+        )
     else:
-      data = build_euro_data(args.raw)
+      data = build_euro_data(args.raw, profiler=profiler)
   except ImportError as e:
     raise SystemExit(
       "Missing dependency for scraping. Install with: pip install beautifulsoup4\n"
@@ -937,7 +1454,27 @@ def main(argv: list[str] | None = None) -> int:
   print(
     f"Scraped {len(data.get('teams', []))} teams and {len(data.get('players', []))} players."
   )
-  save_to_json(data, output_path=args.out)
+  if args.events:
+    from tip_feed import read_previous, update_feed
+
+    previous = read_previous(args.out)
+  with profile_stage(profiler, "save"):
+    save_to_json(data, output_path=args.out)
+  if args.events:
+    events = update_feed(args.events, previous, data)
+    print(f"Appended {len(events)} events to {args.events}")
+  if args.analytics_dir:
+    from analytics_export import export_analytics
+
+    # Live scrapes have no game logs; the raw build's parse is memoised, so this is not a re-read.
+    game_logs = None if args.live or not Path(args.raw).exists() else load_raw_dataset(args.raw).game_logs()
+    # A live build is the season in progress; a raw build's season was required above.
+    season = season_label(args.season[0]) if args.season else current_season_label()
+    with profile_stage(profiler, "analytics"):
+      written = export_analytics(args.analytics_dir, data, game_logs=game_logs, season=season)
+    print(f"Exported {written} to {args.analytics_dir}")
+  if profiler is not None:
+    profiler.write_report(args.profile_memory)
   return 0
 
 
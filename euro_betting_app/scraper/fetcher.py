@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+
+DEFAULT_HEADERS = {
+  "User-Agent": (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+  )
+}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Never sleep longer than this on a single Retry-After, whatever the server asks for.
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Percentiles come from the most recent requests only, so --watch runs stay bounded.
+MAX_LATENCY_SAMPLES = 10_000
+
+
+class PageCache:
+  """On-disk response cache; each namespace is its own directory tree."""
+
+  def __init__(
+    self,
+    root: str | Path,
+    *,
+    namespace: str = "default",
+    max_age: float | None = None,
+  ) -> None:
+    parts = [re.sub(r"[^A-Za-z0-9_.-]+", "_", p) for p in namespace.split("/") if p]
+    self.root = Path(root).joinpath(*parts or ["default"])
+    self.namespace = namespace
+    self.max_age = max_age
+
+  def path_for(self, url: str) -> Path:
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return self.root / digest[:2] / f"{digest}.body"
+
+  def get(self, url: str) -> bytes | None:
+    path = self.path_for(url)
+    try:
+      if self.max_age is not None and time.time() - path.stat().st_mtime > self.max_age:
+        return None
+      return path.read_bytes()
+    except FileNotFoundError:
+      return None
+
+  def peek(self, url: str) -> bytes | None:
+    """Return the cached body whatever its age (for revalidation)."""
+    try:
+      return self.path_for(url).read_bytes()
+    except FileNotFoundError:
+      return None
+
+  def validators(self, url: str) -> dict[str, str]:
+    try:
+      return json.loads(self.path_for(url).with_suffix(".meta").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+      return {}
+
+  def touch(self, url: str) -> None:
+    # A 304 proves the copy is current; restart its max_age clock.
+    try:
+      os.utime(self.path_for(url))
+    except FileNotFoundError:
+      pass
+
+  def evict(self, url: str) -> None:
+    # The page is known to have changed; the next get must go to the network.
+    path = self.path_for(url)
+    for stale in (path, path.with_suffix(".meta")):
+      try:
+        stale.unlink()
+      except FileNotFoundError:
+        pass
+
+  def _write(self, path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+      f.write(data)
+    os.replace(tmp, path)
+
+  def put(self, url: str, body: bytes, *, validators: dict[str, str] | None = None) -> None:
+    path = self.path_for(url)
+    if validators:
+      self._write(path.with_suffix(".meta"), json.dumps(validators).encode("utf-8"))
+    self._write(path, body)
+
+
+@dataclass
+class FetchStats:
+  requests: int = 0
+  retries: int = 0
+  failures: int = 0
+  cache_hits: int = 0
+  not_modified: int = 0
+  bytes: int = 0
+  latencies: collections.deque[float] = field(
+    default_factory=lambda: collections.deque(maxlen=MAX_LATENCY_SAMPLES)
+  )
+
+  def as_dict(self) -> dict[str, float]:
+    ordered = sorted(self.latencies)
+
+    def pct(q: float) -> float:
+      if not ordered:
+        return 0.0
+      index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+      return round(ordered[index] * 1000, 1)
+
+    return {
+      "requests": self.requests,
+      "retries": self.retries,
+      "failures": self.failures,
+      "cache_hits": self.cache_hits,
+      "not_modified": self.not_modified,
+      "bytes": self.bytes,
+      "p50_ms": pct(0.50),
+      "p95_ms": pct(0.95),
+      "p99_ms": pct(0.99),
+      "max_ms": pct(1.0),
+    }
+
+
+def _validators(response: requests.Response) -> dict[str, str]:
+  out: dict[str, str] = {}
+  if response.headers.get("ETag"):
+    out["etag"] = response.headers["ETag"]
+  if response.headers.get("Last-Modified"):
+    out["last_modified"] = response.headers["Last-Modified"]
+  return out
+
+
+class Fetcher:
+  """Shared HTTP client: one keep-alive session, retries with backoff and timing stats."""
+
+  def __init__(
+    self,
+    *,
+    timeout: float = 30,
+    retries: int = 3,
+    backoff: float = 0.5,
+    session: requests.Session | None = None,
+    cache: PageCache | None = None,
+  ) -> None:
+    self.cache = cache
+    self.timeout = timeout
+    self.retries = retries
+    self.backoff = backoff
+    self.session = session or requests.Session()
+    self.session.headers.update(DEFAULT_HEADERS)
+    self.stats = FetchStats()
+    self._lock = threading.Lock()
+
+  def _sleep_before_retry(self, attempt: int, response: requests.Response | None) -> None:
+    delay = self.backoff * (2 ** attempt)
+    if response is not None:
+      retry_after = response.headers.get("Retry-After", "")
+      try:
+        delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER_SECONDS))
+      except ValueError:
+        pass
+    time.sleep(delay)
+
+  def get(self, url: str, *, headers: dict[str, str] | None = None) -> requests.Response:
+    last_error: Exception | None = None
+    for attempt in range(self.retries + 1):
+      if attempt:
+        with self._lock:
+          self.stats.retries += 1
+
+      start = time.perf_counter()
+      response: requests.Response | None = None
+      try:
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        # Touch the body so slow or truncated transfers surface here and are retried.
+        body = response.content
+      except (requests.ConnectionError, requests.Timeout) as e:
+        last_error = e
+      else:
+        elapsed = time.perf_counter() - start
+        with self._lock:
+          self.stats.requests += 1
+          self.stats.bytes += len(body)
+          self.stats.latencies.append(elapsed)
+        if response.status_code not in RETRY_STATUSES:
+          response.raise_for_status()
+          return response
+        last_error = requests.HTTPError(
+          f"{response.status_code} Server Error for url: {url}",
+          response=response,
+        )
+
+      if attempt < self.retries:
+        self._sleep_before_retry(attempt, response)
+
+    with self._lock:
+      self.stats.failures += 1
+    assert last_error is not None
+    raise last_error
+
+  def open_stream(self, url: str) -> requests.Response:
+    """GET ``url`` without reading the body; the caller reads ``response.raw`` and closes it.
+
+    Retries like ``get`` up to the headers. The body is never cached or held in
+    memory, which is what large sitemaps need.
+    """
+    last_error: Exception | None = None
+    for attempt in range(self.retries + 1):
+      if attempt:
+        with self._lock:
+          self.stats.retries += 1
+
+      start = time.perf_counter()
+      response: requests.Response | None = None
+      try:
+        response = self.session.get(url, timeout=self.timeout, stream=True)
+      except (requests.ConnectionError, requests.Timeout) as e:
+        last_error = e
+      else:
+        with self._lock:
+          self.stats.requests += 1
+          self.stats.latencies.append(time.perf_counter() - start)
+        if response.status_code not in RETRY_STATUSES:
+          if not response.ok:
+            response.close()
+          response.raise_for_status()
+          # Let urllib3 undo Content-Encoding: gzip while the caller reads.
+          response.raw.decode_content = True
+          return response
+        response.close()
+        last_error = requests.HTTPError(
+          f"{response.status_code} Server Error for url: {url}",
+          response=response,
+        )
+
+      if attempt < self.retries:
+        self._sleep_before_retry(attempt, response)
+
+    with self._lock:
+      self.stats.failures += 1
+    assert last_error is not None
+    raise last_error
+
+  def get_bytes(self, url: str) -> bytes:
+    if self.cache is not None:
+      cached = self.cache.get(url)
+      if cached is not None:
+        with self._lock:
+          self.stats.cache_hits += 1
+        return cached
+
+    response = self.get(url)
+    body = response.content
+    if self.cache is not None:
+      self.cache.put(url, body, validators=_validators(response))
+    return body
+
+  def revalidate(self, url: str) -> tuple[bytes, bool]:
+    """Refetch ``url`` conditionally and return ``(body, changed)``.
+
+    The cached ETag/Last-Modified go out as If-None-Match/If-Modified-Since, so
+    an unchanged page costs a bodyless 304. Servers that ignore them still work;
+    the body is then compared with the cached copy.
+    """
+    cached = self.cache.peek(url) if self.cache is not None else None
+    headers: dict[str, str] = {}
+    if cached is not None:
+      stored = self.cache.validators(url)
+      if "etag" in stored:
+        headers["If-None-Match"] = stored["etag"]
+      if "last_modified" in stored:
+        headers["If-Modified-Since"] = stored["last_modified"]
+
+    response = self.get(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+      with self._lock:
+        self.stats.not_modified += 1
+      self.cache.touch(url)
+      return cached, False
+
+    body = response.content
+    if self.cache is not None:
+      self.cache.put(url, body, validators=_validators(response))
+    return body, body != cached
+
+  def get_text(self, url: str) -> str:
+    # The site serves UTF-8 but does not always say so; requests would fall back
+    # to ISO-8859-1 and mangle accented player names.
+    return self.get_bytes(url).decode("utf-8", errors="replace")
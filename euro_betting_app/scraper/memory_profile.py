@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+DEFAULT_BUDGETS = Path(__file__).parent / "memory_budgets.json"
+DATASETS = ("synthetic", "fixtures")
+
+# Allocation sites listed per stage.
+DEFAULT_TOP = 8
+# Budgets are the measured peak times this, so ordinary noise stays under them.
+BUDGET_HEADROOM = 1.5
+# Budgets never go below this many KiB; a small stage's peak is relatively noisy.
+BUDGET_FLOOR_KIB = 256.0
+
+
+@dataclass
+class StageMemory:
+  name: str
+  seconds: float
+  # Traced Python allocations, relative to the stage's start: the highest point
+  # reached and what was still held when it returned.
+  peak_kib: float
+  retained_kib: float
+  # Process RSS when the stage returned, and how much it raised the high-water mark.
+  rss_kib: float | None
+  max_rss_growth_kib: float | None
+  # Lines holding the most newly allocated memory when the stage returned.
+  top_sites: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _max_rss_kib() -> float | None:
+  try:
+    import resource
+  except ImportError:  # Windows
+    return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # Kilobytes on Linux, bytes on macOS.
+  return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def _rss_kib() -> float | None:
+  try:
+    with open("/proc/self/statm", encoding="ascii") as f:
+      resident_pages = int(f.read().split()[1])
+  except (OSError, IndexError, ValueError):
+    return None
+  return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024
+
+
+class MemoryProfiler:
+  """Traced peak, RSS and top allocation sites for each stage of a build.
+
+  Stages must run one after another on one thread; a stage's numbers include
+  anything other threads allocate meanwhile. tracemalloc slows allocation
+  down and adds its own bookkeeping to RSS, so use this to compare stages and
+  builds, not to size a runner.
+  """
+
+  def __init__(self, *, top: int = DEFAULT_TOP) -> None:
+    self.top = top
+    self.stages: list[StageMemory] = []
+
+  @contextlib.contextmanager
+  def stage(self, name: str) -> Iterator[None]:
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+      tracemalloc.start()
+    gc.collect()
+    before = self._snapshot()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    max_rss = _max_rss_kib()
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      seconds = time.perf_counter() - start
+      current, peak = tracemalloc.get_traced_memory()
+      after = self._snapshot()
+      max_rss_after = _max_rss_kib()
+      self.stages.append(
+        StageMemory(
+          name=name,
+          seconds=round(seconds, 3),
+          peak_kib=round((peak - base) / 1024, 1),
+          retained_kib=round((current - base) / 1024, 1),
+          rss_kib=None if (rss := _rss_kib()) is None else round(rss, 1),
+          max_rss_growth_kib=(
+            None if max_rss is None or max_rss_after is None else round(max_rss_after - max_rss, 1)
+          ),
+          top_sites=self._top_sites(after, before),
+        )
+      )
+      if started_tracing:
+        tracemalloc.stop()
+
+  def _snapshot(self) -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+      (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        # A lazy import inside a stage is module loading, not the stage's data.
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+      )
+    )
+
+  def _top_sites(self, after: tracemalloc.Snapshot, before: tracemalloc.Snapshot) -> list[dict[str, Any]]:
+    sites = []
+    for stat in after.compare_to(before, "lineno")[: self.top]:
+      if stat.size_diff <= 0:
+        break
+      frame = stat.traceback[0]
+      sites.append(
+        {"site": f"{frame.filename}:{frame.lineno}", "kib": round(stat.size_diff / 1024, 1), "blocks": stat.count_diff}
+      )
+    return sites
+
+  def report(self) -> dict[str, Any]:
+    return {
+      "meta": {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "maxRssKib": _max_rss_kib(),
+      },
+      "stages": [asdict(s) for s in self.stages],
+    }
+
+  def write_report(self, path: str | Path) -> None:
+    print(self.summary())
+    Path(path).write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+    print(f"Wrote memory report to {path}")
+
+  def summary(self) -> str:
+    lines = [f"{'stage':<12} {'seconds':>8} {'peak KiB':>11} {'held KiB':>11} {'RSS KiB':>10}  top site"]
+    for s in self.stages:
+      top = s.top_sites[0]["site"].rsplit(os.sep, 1)[-1] if s.top_sites else "-"
+      rss = f"{s.rss_kib:>10.0f}" if s.rss_kib is not None else f"{'-':>10}"
+      lines.append(f"{s.name:<12} {s.seconds:>8.3f} {s.peak_kib:>11.1f} {s.retained_kib:>11.1f} {rss}  {top}")
+    return "\n".join(lines)
+
+
+def profile_stage(profiler: MemoryProfiler | None, name: str) -> ContextManager[None]:
+  """``profiler.stage(name)``, or a no-op when not profiling."""
+  return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
+
+
+def profile_synthetic(profiler: MemoryProfiler, *, seasons: int = 3, out_dir: Path) -> None:
+  """The raw-input build over a synthetic league with ``seasons`` of game logs."""
+  import corpus
+  import euro_scraper
+  from raw_dataset import clear_raw_dataset_cache
+
+  raw_path = out_dir / "raw_input.json"
+  raw = corpus.synthetic_raw_input(corpus.synthetic_league(), seasons=seasons)
+  raw_path.write_text(json.dumps(raw), encoding="utf-8")
+  del raw
+  # A parse cached by an earlier run would hide the load stage's peak.
+  clear_raw_dataset_cache()
+  data = euro_scraper.build_euro_data(raw_path, profiler=profiler)
+  with profiler.stage("save"):
+    euro_scraper.save_to_json(data, output_path=out_dir / "data.json")
+
+
+def profile_fixtures(profiler: MemoryProfiler, *, out_dir: Path) -> None:
+  """The HTML build's parse, aggregate and save steps over the saved fixture corpus."""
+  import corpus
+  import euro_scraper
+
+  pages = corpus.load_corpus()
+  # Load the HTML parser first, so its modules are not charged to extract.
+  euro_scraper._soup_from_html("<html></html>")
+  with profiler.stage("extract"):
+    teams = []
+    for page in (p for p in pages if p["kind"] == "roster"):
+      url = euro_scraper._absolute_url(page["path"])
+      code = page["path"].rstrip("/").rsplit("/", 1)[-1].upper()
+      roster = euro_scraper.parse_roster_page(url, page["html"], team_name=code)
+      teams.append(euro_scraper.team_from_roster(code, code, roster))
+    players = []
+    for page in (p for p in pages if p["kind"] == "player"):
+      details = euro_scraper.parse_player_details(euro_scraper._absolute_url(page["path"]), page["html"])
+      if details is not None:
+        players.append(details)
+  with profiler.stage("aggregate"):
+    data = euro_scraper.assemble_live_data(teams, players)
+  with profiler.stage("save"):
+    euro_scraper.save_to_json(data, output_path=out_dir / "data.json")
+
+
+def check_budgets(report: dict[str, Any], budgets: dict[str, float]) -> list[str]:
+  """Stages whose traced peak exceeded their budget (KiB); unbudgeted stages pass."""
+  over = []
+  for stage in report["stages"]:
+    limit = budgets.get(stage["name"])
+    if limit is not None and stage["peak_kib"] > limit:
+      over.append(f"{stage['name']}: peak {stage['peak_kib']:.0f} KiB > budget {limit:.0f} KiB")
+  return over
+
+
+def budgets_from(report: dict[str, Any], *, headroom: float = BUDGET_HEADROOM) -> dict[str, float]:
+  return {
+    s["name"]: round(max(s["peak_kib"], BUDGET_FLOOR_KIB) * headroom)
+    for s in report["stages"]
+  }
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Profile peak memory per build stage on the synthetic or fixture dataset, and check it against budgets."
+  )
+  parser.add_argument(
+    "--dataset", choices=DATASETS, action="append", help="Dataset to profile (repeatable; default both)."
+  )
+  parser.add_argument("--seasons", type=int, default=3, help="Seasons of synthetic game logs.")
+  parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Allocation sites listed per stage.")
+  parser.add_argument("--report", default=None, help="Write the per-stage report (JSON) here.")
+  parser.add_argument(
+    "--check",
+    nargs="?",
+    const=str(DEFAULT_BUDGETS),
+    default=None,
+    help="Exit non-zero when a stage's traced peak exceeds its budget.",
+  )
+  parser.add_argument(
+    "--save-budgets",
+    nargs="?",
+    const=str(DEFAULT_BUDGETS),
+    default=None,
+    help=f"Store the measured peaks times {BUDGET_HEADROOM} as the new budgets.",
+  )
+  args = parser.parse_args(argv)
+
+  reports: dict[str, Any] = {}
+  with tempfile.TemporaryDirectory(prefix="euro-memory-") as tmp:
+    for dataset in args.dataset or DATASETS:
+      profiler = MemoryProfiler(top=args.top)
+      if dataset == "synthetic":
+        profile_synthetic(profiler, seasons=args.seasons, out_dir=Path(tmp))
+      else:
+        profile_fixtures(profiler, out_dir=Path(tmp))
+      reports[dataset] = profiler.report()
+      print(f"[{dataset}]\n{profiler.summary()}\n")
+
+  if args.report:
+    Path(args.report).write_text(json.dumps(reports, indent=2), encoding="utf-8")
+  if args.save_budgets:
+    budgets = {"seasons": args.seasons, **{name: budgets_from(r) for name, r in reports.items()}}
+    Path(args.save_budgets).write_text(json.dumps(budgets, indent=2) + "\n", encoding="utf-8")
+    print(f"Saved budgets to {args.save_budgets}")
+
+  if args.check:
+    budgets = json.loads(Path(args.check).read_text(encoding="utf-8"))
+    if budgets.get("seasons", args.seasons) != args.seasons:
+      raise SystemExit(f"Budgets in {args.check} are for --seasons {budgets['seasons']}.")
+    over = [
+      f"{name} {line}" for name, report in reports.items() for line in check_budgets(report, budgets.get(name, {}))
+    ]
+    if over:
+      print("Over budget:\n  " + "\n  ".join(over))
+      return 1
+    print("All stages within budget.")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+DEFAULT_ALIASES = Path(__file__).parent / "player_aliases.json"
+
+# Below this a candidate is reported as unresolved rather than guessed.
+MIN_CONFIDENCE = 0.6
+# Matches at or above this are remembered as aliases when learning is on.
+LEARN_CONFIDENCE = 0.9
+# Several players fit equally well and the team hint cannot pick one; below
+# MIN_CONFIDENCE, so by default such names are unresolved rather than guessed.
+AMBIGUOUS_CONFIDENCE = 0.5
+
+# Letters NFKD leaves alone (no combining-mark decomposition).
+_FOLD = str.maketrans(
+  {"đ": "d", "ð": "d", "ø": "o", "ł": "l", "ß": "ss", "æ": "ae", "œ": "oe", "ı": "i", "þ": "th"}
+)
+_SUFFIXES = frozenset({"jr", "sr", "ii", "iii", "iv"})
+
+
+def normalize_name(name: str) -> str:
+  """Lowercase, accent-free, punctuation-free, single-spaced."""
+  text = unicodedata.normalize("NFKD", name.lower().translate(_FOLD))
+  text = "".join(ch for ch in text if not unicodedata.combining(ch))
+  return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def name_tokens(name: str) -> list[str]:
+  return [t for t in normalize_name(name).split() if t not in _SUFFIXES]
+
+
+def _key(tokens: Iterable[str]) -> str:
+  # Order-insensitive, so "Dessert, Brice" and "Brice Dessert" collide.
+  return " ".join(sorted(tokens))
+
+
+def _trigrams(tokens: list[str]) -> set[str]:
+  grams: set[str] = set()
+  for token in tokens:
+    padded = f" {token} "
+    grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+  return grams
+
+
+@dataclass(frozen=True)
+class Match:
+  player_id: str
+  name: str
+  team_id: str
+  confidence: float
+  method: str
+  # Other players fit just as well; ``player_id`` is only the first of them.
+  ambiguous: bool = False
+
+
+class NameResolver:
+  """Resolve free-text player names from other sources to scraped player ids.
+
+  Built once over ``players``. The index holds three maps: an exact map from
+  order-insensitive token keys, token postings, and character-trigram
+  postings. A lookup only scores the handful of players that share trigrams
+  with the query, instead of fuzzy-comparing against every player.
+  """
+
+  def __init__(
+    self,
+    players: list[dict[str, Any]],
+    *,
+    aliases: dict[str, str] | None = None,
+  ) -> None:
+    self.players = players
+    self._ids = [str(p.get("id", "")) for p in players]
+    self._row_by_id = {pid: i for i, pid in enumerate(self._ids)}
+    self._tokens = [name_tokens(str(p.get("name", ""))) for p in players]
+    self._grams = [_trigrams(tokens) for tokens in self._tokens]
+
+    self._exact: dict[str, list[int]] = collections.defaultdict(list)
+    self._by_token: dict[str, list[int]] = collections.defaultdict(list)
+    self._by_gram: dict[str, list[int]] = collections.defaultdict(list)
+    for row, tokens in enumerate(self._tokens):
+      self._exact[_key(tokens)].append(row)
+      for token in set(tokens):
+        self._by_token[token].append(row)
+      for gram in self._grams[row]:
+        self._by_gram[gram].append(row)
+
+    self.aliases: dict[str, str] = {}
+    for alias, player_id in (aliases or {}).items():
+      # Persisted aliases outlive rosters; drop those for players who left, so
+      # the next save_aliases prunes them.
+      if player_id not in self._row_by_id:
+        print(f"Dropping alias {alias!r}: player {player_id} is not in the current data")
+        continue
+      self.add_alias(alias, player_id)
+
+  @classmethod
+  def from_files(
+    cls,
+    data_path: str | Path,
+    *,
+    aliases_path: str | Path | None = DEFAULT_ALIASES,
+  ) -> "NameResolver":
+    data = json.loads(Path(data_path).read_text(encoding="utf-8"))
+    aliases: dict[str, str] = {}
+    if aliases_path is not None and Path(aliases_path).exists():
+      aliases = json.loads(Path(aliases_path).read_text(encoding="utf-8"))
+    return cls(data.get("players", []), aliases=aliases)
+
+  def add_alias(self, alias: str, player_id: str) -> None:
+    if player_id not in self._row_by_id:
+      raise ValueError(f"Unknown player id: {player_id}")
+    self.aliases[_key(name_tokens(alias))] = player_id
+
+  def save_aliases(self, path: str | Path = DEFAULT_ALIASES) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+      json.dump(dict(sorted(self.aliases.items())), f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+  def _match(self, row: int, confidence: float, method: str, *, ambiguous: bool = False) -> Match:
+    player = self.players[row]
+    return Match(
+      player_id=self._ids[row],
+      name=str(player.get("name", "")),
+      team_id=str(player.get("teamId", "")),
+      confidence=round(AMBIGUOUS_CONFIDENCE if ambiguous else confidence, 3),
+      method=method,
+      ambiguous=ambiguous,
+    )
+
+  def _prefer_team(self, rows: list[int], team_id: str | None) -> list[int]:
+    if team_id and len(rows) > 1:
+      on_team = [r for r in rows if str(self.players[r].get("teamId", "")) == team_id]
+      return on_team or rows
+    return rows
+
+  def _initials_match(self, query: list[str], row: int) -> bool:
+    # "N. Mirotic" / "Mirotic N": every one-letter token must start some other name token.
+    full = [t for t in query if len(t) > 1]
+    initials = [t for t in query if len(t) == 1]
+    candidate = list(self._tokens[row])
+    for token in full:
+      if token not in candidate:
+        return False
+      candidate.remove(token)
+    return all(any(c.startswith(i) for c in candidate) for i in initials)
+
+  def resolve(
+    self,
+    name: str,
+    *,
+    team_id: str | None = None,
+    min_confidence: float = MIN_CONFIDENCE,
+    learn: bool = False,
+  ) -> Match | None:
+    """Best player for ``name`` (optionally on ``team_id``), or None if nothing is confident enough.
+
+    Lookups go alias table, then exact token set, then initials or a lone
+    surname, then trigram similarity. Exact, initial or surname hits that the
+    team cannot narrow to one player score ``AMBIGUOUS_CONFIDENCE``, below the
+    default ``min_confidence``, so they come back as None rather than as an
+    arbitrary player.
+    """
+    tokens = name_tokens(name)
+    if not tokens:
+      return None
+    key = _key(tokens)
+
+    alias = self.aliases.get(key)
+    if alias is not None:
+      return self._match(self._row_by_id[alias], 1.0, "alias")
+
+    match: Match | None = None
+    rows = self._prefer_team(self._exact.get(key, []), team_id)
+    if rows:
+      match = self._match(rows[0], 1.0, "exact", ambiguous=len(rows) > 1)
+
+    if match is None and any(len(t) == 1 for t in tokens):
+      full = [t for t in tokens if len(t) > 1]
+      pool = self._by_token.get(full[0], []) if full else []
+      rows = self._prefer_team([r for r in pool if self._initials_match(tokens, r)], team_id)
+      if rows:
+        match = self._match(rows[0], 0.95, "initials", ambiguous=len(rows) > 1)
+
+    if match is None and len(tokens) == 1:
+      # Box scores often print surnames alone; fine when only one player has it.
+      rows = self._prefer_team(self._by_token.get(tokens[0], []), team_id)
+      if rows:
+        match = self._match(rows[0], 0.85, "surname", ambiguous=len(rows) > 1)
+
+    if match is None:
+      match = self._fuzzy(tokens, team_id)
+
+    if match is None or match.confidence < min_confidence:
+      return None
+    if learn and match.confidence >= LEARN_CONFIDENCE and match.method != "exact":
+      self.aliases[key] = match.player_id
+    return match
+
+  def _fuzzy(self, tokens: list[str], team_id: str | None) -> Match | None:
+    grams = _trigrams(tokens)
+    shared: collections.Counter[int] = collections.Counter()
+    for gram in grams:
+      shared.update(self._by_gram.get(gram, ()))
+    if not shared:
+      return None
+
+    best_row, best_score, runner_up = -1, 0.0, 0.0
+    for row, common in shared.most_common(20):
+      # Dice coefficient over trigram sets, nudged by a team hint.
+      score = 2.0 * common / (len(grams) + len(self._grams[row]))
+      if team_id and str(self.players[row].get("teamId", "")) == team_id:
+        score = min(1.0, score + 0.1)
+      if score > best_score:
+        best_row, best_score, runner_up = row, score, best_score
+      elif score > runner_up:
+        runner_up = score
+
+    # A near tie with another player is not a confident answer.
+    if best_score - runner_up < 0.1:
+      best_score *= 0.8
+    return self._match(best_row, best_score, "fuzzy")
+
+  def resolve_many(
+    self,
+    names: Iterable[str | tuple[str, str | None]],
+    **kwargs: Any,
+  ) -> list[Match | None]:
+    out: list[Match | None] = []
+    for item in names:
+      name, team_id = item if isinstance(item, tuple) else (item, None)
+      out.append(self.resolve(name, team_id=team_id, **kwargs))
+    return out
+
+
+def _perturb(name: str, rng: random.Random) -> str:
+  """A plausible external spelling of ``name`` for the self-benchmark."""
+  parts = name.title().split()
+  choice = rng.randrange(5)
+  if choice == 0 and len(parts) > 1:
+    return f"{parts[-1]}, {' '.join(parts[:-1])}"
+  if choice == 1 and len(parts) > 1:
+    return f"{parts[0][0]}. {' '.join(parts[1:])}"
+  if choice == 2:
+    accented = str.maketrans({"c": "č", "s": "š", "z": "ž", "e": "é", "a": "á"})
+    return " ".join(parts).translate(accented)
+  if choice == 3:
+    word = parts[-1]
+    i = rng.randrange(1, max(2, len(word) - 1))
+    parts[-1] = word[:i] + word[i + 1 :]
+    return " ".join(parts)
+  return " ".join(parts) + " Jr."
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description="Resolve external player names to scraped player ids.")
+  parser.add_argument("--data", default="resources/data.json", help="data.json with players.")
+  parser.add_argument("--aliases", default=str(DEFAULT_ALIASES), help="Persisted alias table (JSON).")
+  parser.add_argument(
+    "--names", default=None, help="File of names to resolve, one per line (optionally NAME<TAB>TEAM)."
+  )
+  parser.add_argument("--learn", action="store_true", help="Save confident non-exact matches as aliases.")
+  parser.add_argument("--bench", type=int, default=0, help="Resolve this many perturbed player names and report speed.")
+  args = parser.parse_args(argv)
+
+  start = time.perf_counter()
+  resolver = NameResolver.from_files(args.data, aliases_path=args.aliases)
+  print(f"Indexed {len(resolver.players)} players in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+  if args.bench:
+    rng = random.Random(7)
+    sample = [rng.choice(resolver.players) for _ in range(args.bench)]
+    queries = [_perturb(str(p.get("name", "")), rng) for p in sample]
+    start = time.perf_counter()
+    matches = resolver.resolve_many(queries)
+    seconds = time.perf_counter() - start
+    correct = sum(1 for m, p in zip(matches, sample) if m is not None and m.player_id == str(p.get("id")))
+    # Names several players fit equally: withheld by default, but a guess would often be wrong.
+    ambiguous = sum(
+      1
+      for m, guess in zip(matches, resolver.resolve_many(queries, min_confidence=0.0))
+      if m is None and guess is not None and guess.ambiguous
+    )
+    unresolved = sum(1 for m in matches if m is None) - ambiguous
+    print(
+      f"{len(queries)} names in {seconds:.3f}s ({len(queries) / seconds:,.0f}/s): "
+      f"{correct} correct, {ambiguous} ambiguous, {unresolved} unresolved, "
+      f"{len(queries) - correct - ambiguous - unresolved} wrong"
+    )
+
+  if args.names:
+    for line in Path(args.names).read_text(encoding="utf-8").splitlines():
+      if not line.strip():
+        continue
+      name, _, team = line.partition("\t")
+      match = resolver.resolve(name, team_id=team.strip() or None, learn=args.learn)
+      if match is None:
+        print(f"{name}\t-\tunresolved")
+      else:
+        print(f"{name}\t{match.player_id}\t{match.name}\t{match.confidence:.3f}\t{match.method}")
+
+  if args.learn:
+    resolver.save_aliases(args.aliases)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
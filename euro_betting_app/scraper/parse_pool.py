@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import euro_scraper
+
+# (kind, url, raw body) where kind is "player" or "roster".
+Page = tuple[str, str, bytes]
+
+DEFAULT_CHUNK_SIZE = 8
+
+
+def parse_page(kind: str, url: str, body: bytes) -> dict[str, Any] | None:
+  html = body.decode("utf-8", errors="replace")
+  if kind == "player":
+    return euro_scraper.parse_player_details(url, html)
+  if kind == "roster":
+    return euro_scraper.parse_roster_page(url, html, team_name="")
+  raise ValueError(f"Unknown page kind: {kind}")
+
+
+def _parse_chunk(chunk: list[Page]) -> list[dict[str, Any] | None]:
+  return [parse_page(kind, url, body) for kind, url, body in chunk]
+
+
+def make_parse_executor(workers: int, *, base_url: str | None = None) -> ProcessPoolExecutor:
+  """A process pool whose workers parse ``parse_page`` calls against ``base_url``."""
+  return ProcessPoolExecutor(
+    max_workers=workers,
+    # Workers may be spawned rather than forked; hand over the configured site root.
+    initializer=euro_scraper.configure_base_url,
+    initargs=(base_url or euro_scraper.EUROLEAGUE_BASE_URL,),
+  )
+
+
+def parse_pages(
+  pages: list[Page],
+  *,
+  workers: int | None = None,
+  chunk_size: int = DEFAULT_CHUNK_SIZE,
+  base_url: str | None = None,
+) -> list[dict[str, Any] | None]:
+  """Parse raw pages on a process pool, returning results in input order.
+
+  Soup construction and the image-scoring regexes are CPU-bound, so threads
+  would serialise on the GIL. Pages are shipped in chunks to amortise pickling;
+  only the small extracted records travel back.
+  """
+  workers = workers or os.cpu_count() or 1
+  if workers <= 1 or len(pages) <= chunk_size:
+    return _parse_chunk(pages)
+
+  chunks = [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+  results: list[dict[str, Any] | None] = []
+  with make_parse_executor(workers, base_url=base_url) as pool:
+    for chunk_results in pool.map(_parse_chunk, chunks):
+      results.extend(chunk_results)
+  return results
+
+
+def _corpus_pages(fixtures_dir: Path, copies: int) -> list[Page]:
+  import corpus
+
+  pages: list[Page] = []
+  for page in corpus.load_corpus(fixtures_dir):
+    if page["kind"] not in ("player", "roster"):
+      continue
+    url = euro_scraper._absolute_url(page["path"])
+    pages.append((page["kind"], url, page["html"].encode("utf-8")))
+  return pages * copies
+
+
+def main(argv: list[str] | None = None) -> int:
+  import corpus
+
+  parser = argparse.ArgumentParser(
+    description="Compare single-process and process-pool parsing over the fixture corpus."
+  )
+  parser.add_argument("--fixtures", default=str(corpus.FIXTURES_DIR))
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+  parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+  parser.add_argument(
+    "--copies",
+    type=int,
+    default=20,
+    help="Parse the corpus this many times over so the pool has enough work.",
+  )
+  args = parser.parse_args(argv)
+
+  pages = _corpus_pages(Path(args.fixtures), args.copies)
+
+  start = time.perf_counter()
+  serial = parse_pages(pages, workers=1)
+  serial_seconds = time.perf_counter() - start
+
+  start = time.perf_counter()
+  pooled = parse_pages(pages, workers=args.workers, chunk_size=args.chunk_size)
+  pooled_seconds = time.perf_counter() - start
+
+  if pooled != serial:
+    print("Pool results differ from single-process results.")
+    return 1
+
+  print(f"Pages parsed:     {len(pages)}")
+  print(f"Single process:   {serial_seconds:.2f}s")
+  print(f"{args.workers} workers:        {pooled_seconds:.2f}s (chunk size {args.chunk_size})")
+  print(f"Speedup:          {serial_seconds / pooled_seconds:.2f}x")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+import requests
+
+from fetcher import Fetcher
+
+# Marks the end of a stage's output.
+_DONE = object()
+
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 32
+
+
+@dataclass
+class StageStats:
+  items: int = 0
+  # Time spent working, excluding waits on the queues either side.
+  busy_seconds: float = 0.0
+
+  def as_dict(self) -> dict[str, float]:
+    return {"items": self.items, "busySeconds": round(self.busy_seconds, 3)}
+
+
+@dataclass
+class PipelineResult:
+  teams: list[dict[str, Any]]
+  players: list[dict[str, Any]]
+  stages: dict[str, StageStats] = field(default_factory=dict)
+  wall_seconds: float = 0.0
+
+  def report(self) -> dict[str, Any]:
+    return {
+      "wallSeconds": round(self.wall_seconds, 3),
+      "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+    }
+
+
+class _Stopped(Exception):
+  pass
+
+
+class PlayerPipeline:
+  """rosters -> player URLs -> fetched pages -> parsed records -> collector.
+
+  Every stage runs concurrently and hands over through bounded queues. A
+  stage that gets ahead blocks on a full queue instead of piling up pages in
+  memory, and player pages start downloading as soon as the first roster
+  is parsed. Once ``max_players`` URLs are queued, the roster stage stops, so
+  no further rosters or player pages are requested. Teams whose roster was
+  never read are left out.
+
+  The scraper's functions are passed in, rather than imported, so this works
+  with whichever ``euro_scraper`` module (or ``__main__``) holds the fetcher
+  and site root.
+  """
+
+  def __init__(
+    self,
+    *,
+    fetcher: Fetcher,
+    team_links: Callable[[], Iterable[tuple[str, str, str]]],
+    parse_roster: Callable[[str, str, str], dict[str, Any]],
+    make_team: Callable[[str, str, dict[str, Any]], dict[str, Any]],
+    parse_player: Callable[[str, str], dict[str, Any] | None],
+    max_teams: int | None = None,
+    max_players: int | None = None,
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    parse_executor: Executor | None = None,
+    pool_parse: Callable[[str, str, bytes], dict[str, Any] | None] | None = None,
+  ) -> None:
+    self.fetcher = fetcher
+    self.team_links = team_links
+    self.parse_roster = parse_roster
+    self.make_team = make_team
+    self.parse_player = parse_player
+    self.max_teams = max_teams
+    self.max_players = max_players
+    self.fetch_workers = max(1, fetch_workers)
+    # Optional process pool for parsing; ``pool_parse`` must be picklable (parse_pool.parse_page).
+    self.parse_executor = parse_executor
+    self.pool_parse = pool_parse
+
+    self.urls: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+    self.pages: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+    self.records: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+    # ``stop``: no more rosters are needed. ``abort``: a stage failed, drop everything.
+    self.stop = threading.Event()
+    self.abort = threading.Event()
+    self.errors: list[BaseException] = []
+    self.stats = {name: StageStats() for name in ("rosters", "fetch", "parse", "collect")}
+    self._stats_lock = threading.Lock()
+
+    self.teams: list[dict[str, Any]] = []
+    # First roster to list a player URL owns it, as with a sequential scrape.
+    self.team_of_url: dict[str, str] = {}
+
+  def _put(self, q: queue.Queue[Any], item: Any) -> None:
+    # Give up on a full queue once the run is aborting. End markers always go
+    # through, because every consumer drains to its end marker.
+    while True:
+      try:
+        q.put(item, timeout=0.1)
+        return
+      except queue.Full:
+        if self.abort.is_set() and item is not _DONE:
+          raise _Stopped from None
+
+  def _fail(self, error: BaseException) -> None:
+    self.errors.append(error)
+    self.abort.set()
+    self.stop.set()
+
+  def _busy(self, stage: str, seconds: float) -> None:
+    with self._stats_lock:
+      self.stats[stage].busy_seconds += seconds
+      self.stats[stage].items += 1
+
+  def _rosters(self) -> None:
+    queued = 0
+    try:
+      start = time.perf_counter()
+      for code, name, roster_url in self.team_links():
+        if self.stop.is_set():
+          break
+        html = self.fetcher.get_text(roster_url)
+        roster = self.parse_roster(roster_url, html, name)
+        self.teams.append(self.make_team(code, name, roster))
+
+        new_urls = [u for u in roster["playerUrls"] if u not in self.team_of_url]
+        if self.max_players is not None:
+          new_urls = new_urls[: self.max_players - queued]
+        for url in new_urls:
+          self.team_of_url[url] = code
+        self._busy("rosters", time.perf_counter() - start)
+
+        for url in new_urls:
+          self._put(self.urls, url)
+        queued += len(new_urls)
+        if self.max_players is not None and queued >= self.max_players:
+          # Enough pages are queued; no more rosters are needed.
+          self.stop.set()
+        if self.max_teams is not None and len(self.teams) >= self.max_teams:
+          break
+        start = time.perf_counter()
+    except _Stopped:
+      pass
+    except BaseException as e:
+      self._fail(e)
+    finally:
+      for _ in range(self.fetch_workers):
+        self._put(self.urls, _DONE)
+
+  def _fetch(self) -> None:
+    while True:
+      url = self.urls.get()
+      if url is _DONE:
+        break
+      if self.abort.is_set():
+        continue
+      start = time.perf_counter()
+      try:
+        body = self.fetcher.get_bytes(url)
+        self._busy("fetch", time.perf_counter() - start)
+        self._put(self.pages, (url, body))
+      except _Stopped:
+        continue
+      except requests.RequestException as e:
+        # One unreachable player page should not sink the whole build.
+        print(f"Skipping player page {url}: {e}")
+      except BaseException as e:
+        self._fail(e)
+    self._put(self.pages, _DONE)
+
+  def _emit(self, url: str, details: dict[str, Any] | None) -> None:
+    if details is not None:
+      self._put(self.records, (url, details))
+
+  def _parse(self) -> None:
+    remaining = self.fetch_workers
+    in_flight: collections.deque[tuple[str, Future[Any]]] = collections.deque()
+    while remaining:
+      item = self.pages.get()
+      if item is _DONE:
+        remaining -= 1
+        continue
+      if self.abort.is_set():
+        continue
+      url, body = item
+      start = time.perf_counter()
+      try:
+        if self.parse_executor is None:
+          self._emit(url, self.parse_player(url, body.decode("utf-8", errors="replace")))
+        else:
+          # Raw bytes go to the pool; up to a queue's worth are parsed at once.
+          in_flight.append((url, self.parse_executor.submit(self.pool_parse, "player", url, body)))
+          while len(in_flight) >= self.pages.maxsize or (in_flight and in_flight[0][1].done()):
+            done_url, future = in_flight.popleft()
+            self._emit(done_url, future.result())
+      except _Stopped:
+        continue
+      except BaseException as e:
+        self._fail(e)
+      self._busy("parse", time.perf_counter() - start)
+
+    try:
+      while in_flight and not self.abort.is_set():
+        done_url, future = in_flight.popleft()
+        self._emit(done_url, future.result())
+    except _Stopped:
+      pass
+    except BaseException as e:
+      self._fail(e)
+    self._put(self.records, _DONE)
+
+  def run(self) -> PipelineResult:
+    start = time.perf_counter()
+    threads = [threading.Thread(target=self._rosters, name="rosters", daemon=True)]
+    threads += [
+      threading.Thread(target=self._fetch, name=f"fetch-{i}", daemon=True) for i in range(self.fetch_workers)
+    ]
+    threads.append(threading.Thread(target=self._parse, name="parse", daemon=True))
+    for thread in threads:
+      thread.start()
+
+    collected: list[tuple[str, dict[str, Any]]] = []
+    seen: set[str] = set()
+    while True:
+      item = self.records.get()
+      if item is _DONE:
+        break
+      tick = time.perf_counter()
+      url, details = item
+      if details["id"] not in seen:
+        seen.add(details["id"])
+        # Roster membership is authoritative for teamId.
+        details["teamId"] = self.team_of_url.get(url, details.get("teamId", ""))
+        collected.append((url, details))
+      self._busy("collect", time.perf_counter() - tick)
+
+    for thread in threads:
+      thread.join()
+    if self.errors:
+      raise self.errors[0]
+
+    # Roster order rather than completion order, so output is stable run to run.
+    order = {url: i for i, url in enumerate(self.team_of_url)}
+    collected.sort(key=lambda item: order.get(item[0], len(order)))
+    team_ids = {t["id"] for t in self.teams}
+    players = [details for _, details in collected]
+    for p in players:
+      if p.get("teamId") not in team_ids:
+        p["teamId"] = ""
+    return PipelineResult(
+      teams=self.teams,
+      players=players,
+      stages=self.stats,
+      wall_seconds=time.perf_counter() - start,
+    )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import collections
+import copy
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from records import GameLogColumns
+
+# Parsed files kept in memory; a notebook or server rarely touches more than a couple.
+MAX_CACHED_FILES = 8
+
+
+class RawDataset:
+  """One parsed raw input file, with lazily built DataFrames per section.
+
+  Sections are the top-level keys (``standings``, ``player_stats``,
+  ``player_game_logs``, ...). Each frame is built on first use and kept.
+  Callers get copies (or, for game logs, a fresh zero-copy view over cached
+  columns), so mutating a result never leaks into the next call. Use
+  ``load_raw_dataset`` rather than the constructor to share parses across
+  calls.
+  """
+
+  def __init__(self, path: str | Path, raw: dict[str, Any], *, signature: tuple[int, int] = (0, 0)) -> None:
+    self.path = Path(path)
+    self.raw = raw
+    self.signature = signature
+    self._frames: dict[str, "pd.DataFrame"] = {}
+    self._game_logs: GameLogColumns | None = None
+    self._lock = threading.Lock()
+
+  def records(self, section: str) -> list[Any]:
+    """A deep copy of a section's raw rows, safe to mutate."""
+    return copy.deepcopy(self.raw.get(section, []))
+
+  def frame(self, section: str) -> "pd.DataFrame":
+    import pandas as pd
+
+    with self._lock:
+      df = self._frames.get(section)
+      if df is None:
+        df = self._frames[section] = pd.DataFrame(self.raw.get(section, []))
+    return df.copy()
+
+  def game_log_columns(self) -> GameLogColumns:
+    with self._lock:
+      if self._game_logs is None:
+        self._game_logs = GameLogColumns.from_records(self.raw.get("player_game_logs", []))
+      return self._game_logs
+
+  def game_logs(self) -> "pd.DataFrame":
+    return self.game_log_columns().to_dataframe()
+
+
+_CACHE: "collections.OrderedDict[Path, RawDataset]" = collections.OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _signature(path: Path) -> tuple[int, int]:
+  stat = path.stat()
+  return stat.st_mtime_ns, stat.st_size
+
+
+def load_raw_dataset(path: str | Path) -> RawDataset:
+  """The parsed dataset for ``path``, reparsed only when its mtime or size changes."""
+  key = Path(path).resolve()
+  signature = _signature(key)
+  with _CACHE_LOCK:
+    cached = _CACHE.get(key)
+    if cached is not None and cached.signature == signature:
+      _CACHE.move_to_end(key)
+      return cached
+
+  raw = json.loads(key.read_text(encoding="utf-8"))
+  # Re-stat: a write that landed during the read must not be cached under the old signature.
+  dataset = RawDataset(key, raw, signature=signature if _signature(key) == signature else (0, 0))
+  with _CACHE_LOCK:
+    _CACHE[key] = dataset
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > MAX_CACHED_FILES:
+      _CACHE.popitem(last=False)
+  return dataset
+
+
+def clear_raw_dataset_cache() -> None:
+  with _CACHE_LOCK:
+    _CACHE.clear()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+# Marks a key that a raw game-log row did not have, so round trips stay exact.
+_MISSING = object()
+
+
+def _code_dtype(n_categories: int) -> str:
+  # Same narrowing pandas applies to Categorical codes; matching it lets
+  # to_dataframe reuse our arrays instead of re-encoding them.
+  if n_categories < 2 ** 7 - 1:
+    return "int8"
+  if n_categories < 2 ** 15 - 1:
+    return "int16"
+  return "int32"
+
+
+class GameLogColumns:
+  """Column-oriented ``player_game_logs``.
+
+  Each key becomes one NumPy array. String columns (team ids, positions, game
+  and player ids) are interned into small integer codes plus a category table, with
+  ``team_id`` and ``opponent_team_id`` sharing one table so codes are
+  comparable. Numbers and booleans are stored natively. Anything else, and
+  keys missing from some rows, fall back to an object column so that
+  ``to_records`` reproduces the input exactly.
+  """
+
+  # Columns that share the team code table.
+  TEAM_COLUMNS = ("team_id", "opponent_team_id")
+
+  def __init__(
+    self,
+    *,
+    length: int,
+    columns: dict[str, Any],
+    categories: dict[str, list[str]],
+    category_of: dict[str, str],
+  ) -> None:
+    self.length = length
+    self.columns = columns
+    self.categories = categories
+    self.category_of = category_of
+
+  def __len__(self) -> int:
+    return self.length
+
+  @classmethod
+  def from_records(cls, rows: list[dict[str, Any]]) -> "GameLogColumns":
+    import numpy as np
+
+    keys: dict[str, None] = {}
+    for row in rows:
+      for k in row:
+        keys.setdefault(k, None)
+
+    columns: dict[str, Any] = {}
+    categories: dict[str, list[str]] = {}
+    category_of: dict[str, str] = {}
+    lookups: dict[str, dict[str, int]] = {}
+
+    for key in keys:
+      values = [row.get(key, _MISSING) for row in rows]
+      kinds = {type(v) for v in values}
+
+      if kinds == {bool}:
+        columns[key] = np.fromiter(values, dtype=np.bool_, count=len(values))
+      elif kinds == {int}:
+        columns[key] = np.fromiter(values, dtype=np.int64, count=len(values))
+      elif kinds == {float}:
+        columns[key] = np.fromiter(values, dtype=np.float64, count=len(values))
+      elif kinds == {str}:
+        table = "team" if key in cls.TEAM_COLUMNS else key
+        lookup = lookups.setdefault(table, {})
+        names = categories.setdefault(table, [])
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, v in enumerate(values):
+          code = lookup.get(v)
+          if code is None:
+            code = lookup[v] = len(names)
+            names.append(sys.intern(v))
+          codes[i] = code
+        columns[key] = codes
+        category_of[key] = table
+      else:
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        columns[key] = column
+
+    for key, table in category_of.items():
+      columns[key] = columns[key].astype(_code_dtype(len(categories[table])), copy=False)
+
+    return cls(length=len(rows), columns=columns, categories=categories, category_of=category_of)
+
+  def to_records(self) -> list[dict[str, Any]]:
+    decoded: dict[str, list[Any]] = {}
+    for key, column in self.columns.items():
+      table = self.category_of.get(key)
+      if table is not None:
+        names = self.categories[table]
+        decoded[key] = [names[c] for c in column.tolist()]
+      else:
+        decoded[key] = column.tolist()
+
+    rows: list[dict[str, Any]] = [{} for _ in range(self.length)]
+    for key, values in decoded.items():
+      for row, v in zip(rows, values):
+        if v is not _MISSING:
+          row[key] = v
+    return rows
+
+  def to_dataframe(self) -> "pd.DataFrame":
+    """Wrap the columns in a DataFrame without copying them.
+
+    String columns become ``Categorical`` over the existing code arrays; the
+    shared team table keeps ``team_id``/``opponent_team_id`` categories aligned.
+    """
+    import pandas as pd
+
+    data: dict[str, Any] = {}
+    for key, column in self.columns.items():
+      table = self.category_of.get(key)
+      if table is not None:
+        dtype = pd.CategoricalDtype(self.categories[table])
+        data[key] = pd.Categorical.from_codes(column, dtype=dtype, validate=False)
+      elif column.dtype == object:
+        data[key] = pd.array(
+          [None if v is _MISSING else v for v in column.tolist()],
+          dtype=object,
+        )
+      else:
+        data[key] = column
+    return pd.DataFrame(data, copy=False)
+
+  @property
+  def nbytes(self) -> int:
+    total = sum(column.nbytes for column in self.columns.values())
+    total += sum(sys.getsizeof(name) for names in self.categories.values() for name in names)
+    return total
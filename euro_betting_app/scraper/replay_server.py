@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import argparse
+import collections
+import datetime
+import hashlib
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import corpus
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+  """Parse a latency distribution spec into a sampler returning seconds.
+
+  Supported specs (values in milliseconds):
+    fixed:MS, uniform:LO,HI, lognormal:MEDIAN,SIGMA
+  """
+  kind, _, raw = spec.partition(":")
+  values = [float(v) for v in raw.split(",") if v.strip()] if raw else []
+  kind = kind.strip().lower()
+
+  if kind == "fixed" and len(values) <= 1:
+    ms = values[0] if values else 0.0
+    return lambda rng: ms / 1000
+  if kind == "uniform" and len(values) == 2:
+    lo, hi = values
+    return lambda rng: rng.uniform(lo, hi) / 1000
+  if kind == "lognormal" and len(values) == 2:
+    median, sigma = values
+    return lambda rng: median * rng.lognormvariate(0.0, sigma) / 1000
+  raise ValueError(f"Unsupported latency spec: {spec!r}")
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+  latency: str = "fixed:0"
+  # Probability that a request starts a burst of ``burst_length`` error responses.
+  error_rate: float = 0.0
+  burst_length: int = 1
+  error_statuses: tuple[int, ...] = (429, 503)
+  # Probability that a body is trickled out over ``slow_body_seconds``.
+  slow_body_rate: float = 0.0
+  slow_body_seconds: float = 1.0
+  # Probability that the connection is reset before any response is sent.
+  reset_rate: float = 0.0
+  seed: int = 0
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+  server: "ReplayServer"
+  protocol_version = "HTTP/1.1"
+  # Headers and body go out in separate writes; without this, Nagle plus delayed
+  # ACKs add ~40ms to every keep-alive response and swamp the injected latency.
+  disable_nagle_algorithm = True
+
+  def log_message(self, format: str, *args: Any) -> None:
+    pass
+
+  def do_GET(self) -> None:
+    start = time.perf_counter()
+    path = urlsplit(self.path).path
+    outcome = self.server.serve(self, path)
+    self.server.record(path, outcome, time.perf_counter() - start)
+
+
+class ReplayServer(ThreadingHTTPServer):
+  """Local stand-in for euroleaguebasketball.net serving pages under the real URL layout."""
+
+  daemon_threads = True
+
+  def __init__(
+    self,
+    pages: dict[str, str],
+    *,
+    profile: FaultProfile = FaultProfile(),
+    host: str = "127.0.0.1",
+    port: int = 0,
+    api: dict[str, dict[str, Any]] | None = None,
+  ) -> None:
+    super().__init__((host, port), _ReplayHandler)
+    self.pages = pages
+    self.api = api or {}
+    self.profile = profile
+    self._sample_latency = parse_latency(profile.latency)
+    self._rng = random.Random(profile.seed)
+    self._lock = threading.Lock()
+    self._burst_remaining = 0
+    self.log: list[tuple[str, str, float]] = []
+    self._lastmods: dict[str, tuple[str, str]] = {}
+    self._thread: threading.Thread | None = None
+
+  @property
+  def url(self) -> str:
+    host, port = self.server_address[:2]
+    return f"http://{host}:{port}"
+
+  def start(self) -> "ReplayServer":
+    self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self) -> None:
+    self.shutdown()
+    self.server_close()
+    if self._thread is not None:
+      self._thread.join()
+
+  def record(self, path: str, outcome: str, seconds: float) -> None:
+    with self._lock:
+      self.log.append((path, outcome, seconds))
+
+  def _draw(self) -> tuple[float, int | None, bool, bool]:
+    profile = self.profile
+    with self._lock:
+      rng = self._rng
+      delay = self._sample_latency(rng)
+      status = None
+      if self._burst_remaining > 0:
+        self._burst_remaining -= 1
+        status = rng.choice(profile.error_statuses)
+      elif profile.error_rate and rng.random() < profile.error_rate:
+        self._burst_remaining = max(0, profile.burst_length - 1)
+        status = rng.choice(profile.error_statuses)
+      reset = bool(profile.reset_rate) and rng.random() < profile.reset_rate
+      slow = bool(profile.slow_body_rate) and rng.random() < profile.slow_body_rate
+    return delay, status, reset, slow
+
+  def serve(self, handler: BaseHTTPRequestHandler, path: str) -> str:
+    delay, status, reset, slow = self._draw()
+    if delay > 0:
+      time.sleep(delay)
+
+    if reset:
+      # SO_LINGER with a zero timeout makes close() send RST instead of FIN.
+      handler.connection.setsockopt(
+        socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+      )
+      handler.connection.close()
+      handler.close_connection = True
+      return "reset"
+
+    if status is not None:
+      body = f"Injected {status}".encode()
+      handler.send_response(status)
+      if status == 429:
+        handler.send_header("Retry-After", "0")
+      handler.send_header("Content-Type", "text/plain")
+      handler.send_header("Content-Length", str(len(body)))
+      handler.end_headers()
+      handler.wfile.write(body)
+      return str(status)
+
+    content_type = "text/html; charset=utf-8"
+    html = self.pages.get(path)
+    if html is None:
+      html = self.sitemap(path)
+    if html is None:
+      html = self.api_response(path, urlsplit(handler.path).query)
+      content_type = "application/json"
+    if html is None:
+      body = b"Not Found"
+      handler.send_response(404)
+      handler.send_header("Content-Length", str(len(body)))
+      handler.end_headers()
+      handler.wfile.write(body)
+      return "404"
+
+    body = html.encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+    if handler.headers.get("If-None-Match") == etag:
+      handler.send_response(304)
+      handler.send_header("ETag", etag)
+      handler.end_headers()
+      return "304"
+
+    handler.send_response(200)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.send_header("ETag", etag)
+    handler.end_headers()
+    if not slow:
+      handler.wfile.write(body)
+      return "200"
+
+    chunks = 10
+    step = max(1, len(body) // chunks)
+    for offset in range(0, len(body), step):
+      handler.wfile.write(body[offset:offset + step])
+      handler.wfile.flush()
+      time.sleep(self.profile.slow_body_seconds / chunks)
+    return "200-slow"
+
+  def _lastmod(self, path: str) -> str:
+    # A page's lastmod moves whenever its content does, like a CMS-generated sitemap.
+    digest = hashlib.sha1(self.pages[path].encode("utf-8")).hexdigest()
+    known = self._lastmods.get(path)
+    if known is None or known[0] != digest:
+      stamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+      known = self._lastmods[path] = (digest, stamp)
+    return known[1]
+
+  def sitemap(self, path: str) -> str | None:
+    """Serve ``/sitemap.xml`` as an index of per-section sitemaps of every page."""
+    sections: dict[str, list[str]] = {}
+    for page in sorted(self.pages):
+      sections.setdefault("players" if "/players/" in page else "teams", []).append(page)
+
+    with self._lock:
+      if path == "/sitemap.xml":
+        entries = [
+          (f"/sitemap-{name}.xml", max(self._lastmod(p) for p in pages), "sitemap")
+          for name, pages in sorted(sections.items())
+        ]
+        wrapper = "sitemapindex"
+      elif path.startswith("/sitemap-") and path[len("/sitemap-") : -len(".xml")] in sections:
+        entries = [(p, self._lastmod(p), "url") for p in sections[path[len("/sitemap-") : -len(".xml")]]]
+        wrapper = "urlset"
+      else:
+        return None
+
+    items = "".join(
+      f"<{tag}><loc>{self.url}{loc}</loc><lastmod>{lastmod}</lastmod></{tag}>" for loc, lastmod, tag in entries
+    )
+    return (
+      '<?xml version="1.0" encoding="UTF-8"?>'
+      f'<{wrapper} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</{wrapper}>'
+    )
+
+  def api_response(self, path: str, query: str) -> str | None:
+    """Page through a stand-in JSON API collection with ``limit``/``offset``."""
+    key = re.sub(r"/seasons/[A-Z]\d{4}/", f"/seasons/{corpus.SEASON_PLACEHOLDER}/", path.strip("/"))
+    collection = self.api.get(key)
+    if collection is None:
+      return None
+    params = parse_qs(query)
+    offset = int(params.get("offset", ["0"])[0])
+    limit = int(params.get("limit", ["100"])[0])
+    items = collection["items"]
+    return json.dumps({collection["key"]: items[offset : offset + limit], "total": len(items)})
+
+  def outcome_counts(self) -> dict[str, int]:
+    with self._lock:
+      return dict(collections.Counter(outcome for _, outcome, _ in self.log))
+
+
+def load_pages(
+  *,
+  fixtures: str | None,
+  teams: int,
+  players_per_team: int,
+  seed: int,
+  competitions: tuple[str, ...] = ("euroleague",),
+) -> dict[str, str]:
+  if fixtures:
+    return {p["path"]: p["html"] for p in corpus.load_corpus(Path(fixtures))}
+
+  pages: dict[str, str] = {}
+  for offset, competition in enumerate(competitions):
+    league = corpus.synthetic_league(
+      seed=seed + offset,
+      n_teams=teams,
+      players_per_team=players_per_team,
+      competition=competition,
+    )
+    pages.update(corpus.synthetic_pages(league, seed=seed + offset))
+  return pages
+
+
+def load_api(
+  *,
+  fixtures: str | None,
+  teams: int,
+  players_per_team: int,
+  seed: int,
+  competitions: tuple[str, ...] = ("euroleague",),
+) -> dict[str, dict[str, Any]]:
+  """The stand-in JSON API's collections, matching ``load_pages`` for the same arguments."""
+  if fixtures:
+    return corpus.load_api_corpus(Path(fixtures))
+
+  api: dict[str, dict[str, Any]] = {}
+  for offset, competition in enumerate(competitions):
+    league = corpus.synthetic_league(
+      seed=seed + offset,
+      n_teams=teams,
+      players_per_team=players_per_team,
+      competition=competition,
+    )
+    api.update(corpus.synthetic_api(league, seed=seed + offset))
+  return api
+
+
+def run_load_test(
+  server: ReplayServer,
+  *,
+  max_teams: int | None = None,
+  max_players: int | None = None,
+  retries: int = 3,
+  backoff: float = 0.05,
+  timeout: float = 10,
+  source: str = "html",
+) -> dict[str, Any]:
+  """Run the full live pipeline against ``server`` and report throughput and tail latency."""
+  import euro_scraper
+  from fetcher import Fetcher
+
+  expected_players = sum(1 for path in server.pages if "/players/" in path)
+  previous_base = euro_scraper.EUROLEAGUE_BASE_URL
+  fetcher = Fetcher(retries=retries, backoff=backoff, timeout=timeout)
+  euro_scraper.configure_base_url(server.url)
+  euro_scraper.set_fetcher(fetcher)
+
+  error = ""
+  data: dict[str, Any] = {}
+  start = time.perf_counter()
+  try:
+    data = euro_scraper.build_euro_data_live(
+      max_teams=max_teams,
+      max_players=max_players,
+      source=source,
+      api_url=server.url,
+    )
+  except Exception as e:  # the report should describe failures, not crash on them
+    error = f"{type(e).__name__}: {e}"
+  wall = time.perf_counter() - start
+
+  euro_scraper.configure_base_url(previous_base)
+  euro_scraper.set_fetcher(None)
+
+  stats = fetcher.stats.as_dict()
+  players = len(data.get("players", []))
+  target_players = min(expected_players, max_players) if max_players else expected_players
+  return {
+    "ok": not error,
+    "error": error,
+    "wall_seconds": round(wall, 3),
+    "pages_per_second": round(stats["requests"] / wall, 1) if wall else 0.0,
+    "teams": len(data.get("teams", [])),
+    "players": players,
+    "player_completeness": round(players / target_players, 3) if target_players else 1.0,
+    "client": stats,
+    "server": server.outcome_counts(),
+    "profile": server.profile.__dict__,
+  }
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Serve recorded or synthetic EuroLeague pages with injected latency and faults."
+  )
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8765)
+  parser.add_argument("--fixtures", default=None, help="Serve a recorded fixture corpus directory.")
+  parser.add_argument("--teams", type=int, default=len(corpus.LEAGUE_TEAMS), help="Synthetic teams.")
+  parser.add_argument("--players-per-team", type=int, default=14, help="Synthetic players per team.")
+  parser.add_argument("--seed", type=int, default=7)
+  parser.add_argument(
+    "--competitions",
+    default="euroleague",
+    help="Comma-separated competitions to synthesise (e.g. euroleague,eurocup).",
+  )
+  parser.add_argument(
+    "--latency",
+    default="fixed:0",
+    help="Latency distribution in ms: fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA.",
+  )
+  parser.add_argument("--error-rate", type=float, default=0.0, help="Chance a request starts an error burst.")
+  parser.add_argument("--burst", type=int, default=1, help="Consecutive error responses per burst.")
+  parser.add_argument(
+    "--error-statuses",
+    default="429,503",
+    help="Comma-separated statuses to draw injected errors from.",
+  )
+  parser.add_argument("--slow-body-rate", type=float, default=0.0, help="Chance a body is trickled out.")
+  parser.add_argument("--slow-body-seconds", type=float, default=1.0, help="Transfer time of a slow body.")
+  parser.add_argument("--reset-rate", type=float, default=0.0, help="Chance a connection is reset.")
+  parser.add_argument(
+    "--load-test",
+    action="store_true",
+    help="Run build_euro_data_live against the server, print a report and exit.",
+  )
+  parser.add_argument(
+    "--source",
+    choices=("html", "api", "auto"),
+    default="html",
+    help="Data source --load-test drives (the stand-in serves both the pages and the JSON API).",
+  )
+  parser.add_argument("--max-teams", type=int, default=None)
+  parser.add_argument("--max-players", type=int, default=None)
+  parser.add_argument("--retries", type=int, default=3, help="Client retries per request in --load-test.")
+  parser.add_argument("--report", default=None, help="Write the --load-test report to this JSON path.")
+  parser.add_argument(
+    "--min-completeness",
+    type=float,
+    default=1.0,
+    help="Fail --load-test when fewer than this fraction of players were scraped.",
+  )
+  args = parser.parse_args(argv)
+
+  profile = FaultProfile(
+    latency=args.latency,
+    error_rate=args.error_rate,
+    burst_length=args.burst,
+    error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s.strip()),
+    slow_body_rate=args.slow_body_rate,
+    slow_body_seconds=args.slow_body_seconds,
+    reset_rate=args.reset_rate,
+    seed=args.seed,
+  )
+  pages = load_pages(
+    fixtures=args.fixtures,
+    teams=args.teams,
+    players_per_team=args.players_per_team,
+    seed=args.seed,
+    competitions=tuple(c.strip() for c in args.competitions.split(",") if c.strip()),
+  )
+  api = load_api(
+    fixtures=args.fixtures,
+    teams=args.teams,
+    players_per_team=args.players_per_team,
+    seed=args.seed,
+    competitions=tuple(c.strip() for c in args.competitions.split(",") if c.strip()),
+  )
+  port = 0 if args.load_test else args.port
+  server = ReplayServer(pages, profile=profile, host=args.host, port=port, api=api)
+
+  if not args.load_test:
+    print(f"Serving {len(pages)} pages and {len(api)} API collections at {server.url} (Ctrl+C to stop)")
+    print(f"Point the scraper at it with: --base-url {server.url}")
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+    finally:
+      server.server_close()
+    return 0
+
+  server.start()
+  try:
+    report = run_load_test(
+      server,
+      max_teams=args.max_teams,
+      max_players=args.max_players,
+      retries=args.retries,
+      source=args.source,
+    )
+  finally:
+    server.stop()
+
+  print(json.dumps(report, indent=2))
+  if args.report:
+    Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+  if not report["ok"] or report["player_completeness"] < args.min_completeness:
+    print("Load test failed.", file=sys.stderr)
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
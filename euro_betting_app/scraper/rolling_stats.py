@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Any
+
+# Output columns, named as they appear on players in data.json.
+STAT_COLUMNS = (
+  "gamesPlayed",
+  "seasonAvgPts",
+  "last5AvgPts",
+  "last10AvgPts",
+  "ewmaPts",
+  "homeAvgPts",
+  "awayAvgPts",
+  "ptsStdDev",
+  "last5GamePts",
+)
+
+DEFAULT_EWMA_SPAN = 5
+
+# Season prefix of a game id: "S3_R01_..." (synthetic history) or "E2024_123" (API).
+_SEASON_PREFIX = re.compile(r"(?:S(\d+)|[A-Z](\d{4}))_")
+
+
+def season_order(
+  player_game_logs: "pd.DataFrame",
+  *,
+  season_col: str = "season",
+  date_col: str = "game_date",
+  game_id_col: str = "game_id",
+) -> "np.ndarray":
+  """An integer per row that orders seasons (or dates) oldest first; all zeros when unknown.
+
+  Uses ``season_col`` when present, then ``date_col`` (ISO dates sort as
+  text), then a season prefix on ``game_id_col``. Rounds restart every
+  season, so without this a multi-season log interleaves season 1 round 1
+  with season 2 round 1.
+  """
+  import numpy as np
+  import pandas as pd
+
+  for col in (season_col, date_col):
+    if col in player_game_logs.columns:
+      return pd.factorize(player_game_logs[col].astype(str), sort=True)[0]
+  ids = player_game_logs[game_id_col] if game_id_col in player_game_logs.columns else None
+  # Ids share one format, so the first tells whether they carry a season; most logs do not.
+  if ids is not None and len(ids) and _SEASON_PREFIX.match(str(ids.iloc[0])):
+    codes, uniques = pd.factorize(ids)
+    # Parse each distinct id once.
+    season = np.array([_season_of_id(str(u)) for u in uniques], dtype=np.int64)
+    return np.where(codes >= 0, season[codes], -1)
+  return np.zeros(len(player_game_logs), dtype=np.int64)
+
+
+def _season_of_id(game_id: str) -> int:
+  match = _SEASON_PREFIX.match(game_id)
+  return int(match.group(1) or match.group(2)) if match else -1
+
+
+def rolling_player_stats(
+  player_game_logs: "pd.DataFrame",
+  *,
+  player_col: str = "player_id",
+  points_col: str = "points",
+  order_col: str = "round",
+  home_col: str = "is_home",
+  ewma_span: int = DEFAULT_EWMA_SPAN,
+) -> "pd.DataFrame":
+  """Per-player recency stats from game logs, indexed by player id.
+
+  Everything is computed over all players at once. Rows are sorted by
+  (player, season, ``order_col``), with the season from ``season_order``,
+  so each player's games form one contiguous run in time order. A
+  single cumulative sum then gives any trailing window as
+  ``csum[end] - csum[max(start, end - k)]``. Per-player totals use
+  ``np.bincount``. The work is one sort plus linear passes, with no
+  per-player Python loop. Logs without ``order_col`` are taken in input order.
+
+  The EWMA matches ``Series.ewm(span=ewma_span).mean()`` at each player's
+  latest game. ``ptsStdDev`` is the sample standard deviation. Home/away
+  averages are NaN for players with no games on that side.
+  """
+  import numpy as np
+  import pandas as pd
+
+  if player_game_logs.empty:
+    return pd.DataFrame(columns=list(STAT_COLUMNS), index=pd.Index([], name=player_col))
+
+  codes, player_ids = pd.factorize(player_game_logs[player_col])
+  points = pd.to_numeric(player_game_logs[points_col], errors="coerce").fillna(0.0).to_numpy(np.float64)
+  if home_col in player_game_logs.columns:
+    home = player_game_logs[home_col].fillna(False).to_numpy(bool)
+  else:
+    home = np.zeros(len(points), dtype=bool)
+  if order_col in player_game_logs.columns:
+    # sort=True makes the codes rank-ordered, whatever the column's dtype.
+    order = pd.factorize(player_game_logs[order_col], sort=True)[0]
+  else:
+    order = np.arange(len(points))
+
+  season_rank = season_order(player_game_logs)
+
+  keep = codes >= 0
+  if season_rank.any():
+    perm = np.lexsort((order[keep], season_rank[keep], codes[keep]))
+  else:
+    perm = np.lexsort((order[keep], codes[keep]))
+  c = codes[keep][perm]
+  x = points[keep][perm]
+  h = home[keep][perm]
+  n_players = len(player_ids)
+
+  counts = np.bincount(c, minlength=n_players)
+  ends = np.cumsum(counts)
+  starts = ends - counts
+  csum = np.concatenate(([0.0], np.cumsum(x)))
+
+  def trailing_mean(k: int) -> "np.ndarray":
+    lo = np.maximum(starts, ends - k)
+    return (csum[ends] - csum[lo]) / (ends - lo)
+
+  season = (csum[ends] - csum[starts]) / counts
+
+  # Deviations from each player's own mean keep the variance numerically stable.
+  dev = x - season[c]
+  std = np.sqrt(np.bincount(c, weights=dev * dev, minlength=n_players) / np.maximum(counts - 1, 1))
+  std[counts < 2] = 0.0
+
+  # Weights are raised from the latest game backwards so they never overflow.
+  alpha = 2.0 / (ewma_span + 1)
+  age = (ends[c] - 1) - np.arange(len(x))
+  weights = (1.0 - alpha) ** age
+  ewma = np.bincount(c, weights=weights * x, minlength=n_players) / np.bincount(
+    c, weights=weights, minlength=n_players
+  )
+
+  home_games = np.bincount(c, weights=h, minlength=n_players)
+  home_pts = np.bincount(c, weights=x * h, minlength=n_players)
+  away_games = counts - home_games
+  away_pts = (csum[ends] - csum[starts]) - home_pts
+  with np.errstate(invalid="ignore", divide="ignore"):
+    home_avg = np.where(home_games > 0, home_pts / home_games, np.nan)
+    away_avg = np.where(away_games > 0, away_pts / away_games, np.nan)
+
+  # Last five games, oldest first (the app reads last > first as an uptrend).
+  idx = ends[:, None] - 5 + np.arange(5)[None, :]
+  in_run = idx >= starts[:, None]
+  last5 = np.where(in_run, x[np.maximum(idx, 0)], np.nan).round(1)
+
+  stats = pd.DataFrame(
+    {
+      "gamesPlayed": counts,
+      "seasonAvgPts": season.round(1),
+      "last5AvgPts": trailing_mean(5).round(1),
+      "last10AvgPts": trailing_mean(10).round(1),
+      "ewmaPts": ewma.round(1),
+      "homeAvgPts": home_avg.round(1),
+      "awayAvgPts": away_avg.round(1),
+      "ptsStdDev": std.round(2),
+      "last5GamePts": [row[~np.isnan(row)].tolist() for row in last5],
+    },
+    index=pd.Index(np.asarray(player_ids).astype(str), name=player_col),
+  )
+  return stats
+
+
+def apply_rolling_stats(players: list[dict[str, Any]], stats: "pd.DataFrame") -> int:
+  """Copy stats onto matching ``players`` entries in place; returns how many matched."""
+  import math
+
+  if stats.empty:
+    return 0
+
+  by_id = stats.to_dict(orient="index")
+  matched = 0
+  for player in players:
+    row = by_id.get(str(player.get("id", "")))
+    if row is None:
+      continue
+    matched += 1
+    for key in STAT_COLUMNS:
+      value = row[key]
+      if isinstance(value, float) and math.isnan(value):
+        continue
+      player[key] = int(value) if key == "gamesPlayed" else value
+  return matched
+
+
+def main(argv: list[str] | None = None) -> int:
+  import corpus
+  from records import GameLogColumns
+
+  parser = argparse.ArgumentParser(description="Time the rolling stats engine on synthetic game logs.")
+  parser.add_argument("--teams", type=int, default=len(corpus.LEAGUE_TEAMS))
+  parser.add_argument("--players-per-team", type=int, default=14)
+  parser.add_argument("--games", type=int, default=34, help="Games per team per season.")
+  parser.add_argument("--seasons", type=int, default=10, help="Seasons of history to stack.")
+  args = parser.parse_args(argv)
+
+  league = corpus.synthetic_league(seed=7, n_teams=args.teams, players_per_team=args.players_per_team)
+  rows: list[dict[str, Any]] = []
+  for season in range(args.seasons):
+    for row in corpus.synthetic_game_logs(league, games_per_team=args.games, seed=season):
+      row["game_id"] = f"S{season}_{row['game_id']}"
+      rows.append(row)
+  logs = GameLogColumns.from_records(rows).to_dataframe()
+
+  start = time.perf_counter()
+  stats = rolling_player_stats(logs)
+  seconds = time.perf_counter() - start
+  print(f"{len(logs)} game rows, {len(stats)} players: {seconds * 1000:.1f} ms")
+  print(stats.head().to_string())
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import euro_scraper
+from fetcher import Fetcher, PageCache
+
+CURRENT_SEASON = "current"
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+  competition: str
+  season: str | None
+
+  @property
+  def name(self) -> str:
+    return f"{self.competition}/{self.season or CURRENT_SEASON}"
+
+  def output_path(self, out_dir: Path) -> Path:
+    return out_dir / self.competition / (self.season or CURRENT_SEASON) / "data.json"
+
+
+def expand_seasons(values: list[str] | None) -> list[str | None]:
+  """Expand ``2024``, ``2024-25`` and ``2020:2024`` style arguments into season labels."""
+  if not values:
+    return [None]
+
+  seasons: list[str | None] = []
+  for value in values:
+    first, sep, last = value.partition(":")
+    if sep:
+      start = int(euro_scraper.season_label(first)[:4])
+      end = int(euro_scraper.season_label(last)[:4])
+      step = 1 if end >= start else -1
+      seasons.extend(euro_scraper.season_label(str(y)) for y in range(start, end + step, step))
+    else:
+      seasons.append(euro_scraper.season_label(value))
+
+  # Preserve order while de-duping.
+  return list(dict.fromkeys(seasons))
+
+
+def plan_shards(competitions: list[str], seasons: list[str | None]) -> list[ShardSpec]:
+  for competition in competitions:
+    euro_scraper.get_competition(competition)
+  return [ShardSpec(competition=c, season=s) for c in competitions for s in seasons]
+
+
+def _run_shard(
+  spec: ShardSpec,
+  *,
+  out_dir: str,
+  base_url: str,
+  cache_dir: str | None,
+  cache_ttl: float | None,
+  max_teams: int | None,
+  max_players: int | None,
+  parse_workers: int,
+  fetch_workers: int,
+  with_assets: bool,
+  asset_workers: int,
+  sitemap_url: str | None,
+  source: str,
+  api_url: str | None,
+) -> dict[str, Any]:
+  # Runs in its own process: own fetcher, own cache namespace, own output file.
+  euro_scraper.configure_base_url(base_url)
+  cache = (
+    PageCache(cache_dir, namespace=spec.name, max_age=cache_ttl) if cache_dir else None
+  )
+  fetcher = Fetcher(cache=cache)
+  euro_scraper.set_fetcher(fetcher)
+
+  summary: dict[str, Any] = {"competition": spec.competition, "season": spec.season or CURRENT_SEASON}
+  start = time.perf_counter()
+  try:
+    data = euro_scraper.build_euro_data_live(
+      max_teams=max_teams,
+      max_players=max_players,
+      parse_workers=parse_workers,
+      fetch_workers=fetch_workers,
+      competition=spec.competition,
+      season=spec.season,
+      assets_dir=spec.output_path(Path(out_dir)).parent / "assets" if with_assets else None,
+      asset_workers=asset_workers,
+      sitemap_url=sitemap_url,
+      source=source,
+      api_url=api_url,
+    )
+    path = euro_scraper.save_to_json(data, output_path=spec.output_path(Path(out_dir)))
+  except Exception as e:  # one bad shard must not take the backfill down with it
+    summary.update({"ok": False, "error": f"{type(e).__name__}: {e}"})
+    traceback.print_exc()
+  else:
+    summary.update(
+      {
+        "ok": True,
+        "path": str(path.relative_to(out_dir)),
+        "teams": len(data.get("teams", [])),
+        "players": len(data.get("players", [])),
+      }
+    )
+  summary["seconds"] = round(time.perf_counter() - start, 2)
+  summary["fetch"] = fetcher.stats.as_dict()
+  return summary
+
+
+def build_merged_index(out_dir: Path, summaries: list[dict[str, Any]]) -> dict[str, Any]:
+  """Index every shard plus each player's (competition, season, team) appearances."""
+  players: dict[str, dict[str, Any]] = {}
+  for summary in summaries:
+    if not summary.get("ok"):
+      continue
+    data = json.loads((out_dir / summary["path"]).read_text(encoding="utf-8"))
+    for p in data.get("players", []):
+      entry = players.setdefault(str(p.get("id", "")), {"name": p.get("name", ""), "appearances": []})
+      entry["appearances"].append(
+        {
+          "competition": summary["competition"],
+          "season": summary["season"],
+          "teamId": p.get("teamId", ""),
+        }
+      )
+
+  return {
+    "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    "shards": summaries,
+    "players": players,
+  }
+
+
+def run_shards(
+  specs: list[ShardSpec],
+  *,
+  out_dir: str | Path,
+  base_url: str | None = None,
+  workers: int = 4,
+  cache_dir: str | Path | None = None,
+  cache_ttl: float | None = None,
+  max_teams: int | None = None,
+  max_players: int | None = None,
+  parse_workers: int = 1,
+  fetch_workers: int = 8,
+  with_assets: bool = False,
+  asset_workers: int = 8,
+  sitemap_url: str | None = None,
+  source: str = "html",
+  api_url: str | None = None,
+) -> Path:
+  """Scrape each (competition, season) shard in parallel and write a merged index.json."""
+  out = Path(out_dir)
+  out.mkdir(parents=True, exist_ok=True)
+  kwargs = {
+    "out_dir": str(out),
+    "base_url": base_url or euro_scraper.EUROLEAGUE_BASE_URL,
+    "cache_dir": str(cache_dir) if cache_dir else None,
+    "cache_ttl": cache_ttl,
+    "max_teams": max_teams,
+    "max_players": max_players,
+    "parse_workers": parse_workers,
+    "fetch_workers": fetch_workers,
+    "with_assets": with_assets,
+    "asset_workers": asset_workers,
+    "sitemap_url": sitemap_url,
+    "source": source,
+    "api_url": api_url,
+  }
+
+  summaries: list[dict[str, Any]] = []
+  with ProcessPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as pool:
+    futures = [pool.submit(_run_shard, spec, **kwargs) for spec in specs]
+    for spec, future in zip(specs, futures):
+      summary = future.result()
+      status = "ok" if summary["ok"] else f"FAILED ({summary['error']})"
+      print(f"[{spec.name}] {status} in {summary['seconds']}s")
+      summaries.append(summary)
+
+  index = build_merged_index(out, summaries)
+  return euro_scraper.save_to_json(index, output_path=out / "index.json")
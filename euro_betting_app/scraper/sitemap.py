@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+
+from fetcher import Fetcher, PageCache
+
+DEFAULT_SITEMAP_PATH = "/sitemap.xml"
+
+# Kept inside the cache namespace, next to the pages whose freshness it vouches for.
+STATE_FILE = "sitemap_state.json"
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+  loc: str
+  lastmod: str
+  # True for <sitemap> entries of a sitemap index, False for <url> entries.
+  is_sitemap: bool
+
+
+def iter_sitemap_entries(source: IO[bytes], *, gzipped: bool = False) -> Iterator[SitemapEntry]:
+  """Stream ``<url>``/``<sitemap>`` entries out of a sitemap or sitemap index.
+
+  Each entry is yielded as soon as its closing tag is parsed and then dropped
+  from the tree, so memory stays flat however many URLs the file lists.
+  """
+  if gzipped:
+    source = gzip.GzipFile(fileobj=source)
+
+  root: ET.Element | None = None
+  loc = lastmod = ""
+  for event, elem in ET.iterparse(source, events=("start", "end")):
+    if event == "start":
+      if root is None:
+        root = elem
+      continue
+    tag = elem.tag.rsplit("}", 1)[-1]
+    if tag == "loc":
+      loc = (elem.text or "").strip()
+    elif tag == "lastmod":
+      lastmod = (elem.text or "").strip()
+    elif tag in ("url", "sitemap"):
+      if loc:
+        yield SitemapEntry(loc=loc, lastmod=lastmod, is_sitemap=tag == "sitemap")
+      loc = lastmod = ""
+      assert root is not None
+      root.clear()
+
+
+def _read_sitemap(fetcher: Fetcher, url: str) -> Iterator[SitemapEntry]:
+  response = fetcher.open_stream(url)
+  try:
+    yield from iter_sitemap_entries(response.raw, gzipped=urlsplit(url).path.endswith(".gz"))
+  finally:
+    response.close()
+
+
+def tracked_pages(competition_slug: str) -> "re.Pattern[str]":
+  """Team and player pages of one competition; everything else in the sitemap is ignored."""
+  return re.compile(rf"^/en/{re.escape(competition_slug)}/(?:teams|players)/")
+
+
+@dataclass
+class SitemapDiff:
+  changed: list[str] = field(default_factory=list)
+  unchanged: list[str] = field(default_factory=list)
+  removed: list[str] = field(default_factory=list)
+  # Listed without a lastmod, so nothing can be said about them.
+  undated: int = 0
+  sitemaps_read: int = 0
+  sitemaps_skipped: int = 0
+  # Listing pages revalidated on every run, and how many of them had changed.
+  listings: int = 0
+  listings_changed: int = 0
+
+  def as_dict(self) -> dict[str, int]:
+    return {
+      "changed": len(self.changed),
+      "unchanged": len(self.unchanged),
+      "removed": len(self.removed),
+      "undated": self.undated,
+      "sitemapsRead": self.sitemaps_read,
+      "sitemapsSkipped": self.sitemaps_skipped,
+      "listings": self.listings,
+      "listingsChanged": self.listings_changed,
+    }
+
+
+def discover(
+  fetcher: Fetcher,
+  sitemap_url: str,
+  previous: dict[str, Any],
+  *,
+  track: "re.Pattern[str]",
+) -> tuple[SitemapDiff, dict[str, Any]]:
+  """Compare the site's sitemaps against ``previous`` state.
+
+  State maps each sitemap file to its own ``lastmod`` and to the ``lastmod``
+  of every tracked page it lists. A child sitemap whose ``lastmod`` in the
+  index has not moved is not downloaded; its pages keep their recorded dates.
+  Returns the diff and the new state, which the caller saves once the pages
+  have actually been fetched.
+  """
+  diff = SitemapDiff()
+  state: dict[str, Any] = {}
+  pending = [(sitemap_url, "")]
+  seen: set[str] = set()
+  while pending:
+    url, listed_lastmod = pending.pop()
+    if url in seen:
+      continue
+    seen.add(url)
+
+    known = previous.get(url)
+    if listed_lastmod and known is not None and known.get("lastmod") == listed_lastmod:
+      state[url] = known
+      diff.sitemaps_skipped += 1
+      continue
+
+    pages: dict[str, str] = {}
+    for entry in _read_sitemap(fetcher, url):
+      if entry.is_sitemap:
+        pending.append((entry.loc, entry.lastmod))
+      elif track.search(urlsplit(entry.loc).path):
+        pages[entry.loc] = entry.lastmod
+    state[url] = {"lastmod": listed_lastmod, "pages": pages}
+    diff.sitemaps_read += 1
+
+  before: dict[str, str] = {}
+  for sitemap in previous.values():
+    before.update(sitemap.get("pages", {}))
+  after: dict[str, str] = {}
+  for sitemap in state.values():
+    after.update(sitemap["pages"])
+
+  for url, lastmod in after.items():
+    if not lastmod:
+      diff.undated += 1
+    elif before.get(url) == lastmod:
+      diff.unchanged.append(url)
+    else:
+      diff.changed.append(url)
+  diff.removed = sorted(set(before) - set(after))
+  return diff, state
+
+
+class SitemapSync:
+  """Turn a page cache into "fetch only what the sitemap says changed".
+
+  ``plan`` reads the sitemaps and marks unchanged pages as fresh (the same
+  clock reset a 304 gives). It evicts new or modified ones, so the normal
+  scrape serves the former from disk and fetches only the latter. ``commit``
+  records the new ``lastmod`` values. Call it after the scrape succeeds, so a
+  failed run never vouches for pages it did not fetch.
+
+  ``page_url`` maps a sitemap ``<loc>`` to the URL the scraper caches it
+  under (its base URL, a ``?season=`` query). ``listings`` are pages the
+  sitemap does not cover, such as the teams listing. ``plan`` revalidates
+  them every time, since they are what finds new rosters.
+  """
+
+  def __init__(
+    self,
+    fetcher: Fetcher,
+    sitemap_url: str,
+    *,
+    competition_slug: str,
+    page_url: Callable[[str], str] | None = None,
+    listings: Iterable[str] = (),
+  ) -> None:
+    if fetcher.cache is None:
+      raise ValueError("Sitemap discovery needs a page cache to serve unchanged pages from.")
+    self.fetcher = fetcher
+    self.cache: PageCache = fetcher.cache
+    self.sitemap_url = sitemap_url
+    self.track = tracked_pages(competition_slug)
+    self.page_url = page_url or (lambda loc: loc)
+    self.listings = list(listings)
+    self.state_path = self.cache.root / STATE_FILE
+    self._state: dict[str, Any] | None = None
+
+  def load_state(self) -> dict[str, Any]:
+    try:
+      return json.loads(self.state_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+      return {}
+
+  def plan(self) -> SitemapDiff:
+    diff, self._state = discover(self.fetcher, self.sitemap_url, self.load_state(), track=self.track)
+    for loc in diff.unchanged:
+      self.cache.touch(self.page_url(loc))
+    for loc in diff.changed:
+      self.cache.evict(self.page_url(loc))
+    for url in self.listings:
+      # A conditional GET: an unchanged listing costs a 304 and stays cached.
+      _, changed = self.fetcher.revalidate(url)
+      diff.listings += 1
+      diff.listings_changed += int(changed)
+    return diff
+
+  def commit(self) -> None:
+    if self._state is None:
+      return
+    self.state_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=self.state_path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+      json.dump(self._state, f, separators=(",", ":"))
+    os.replace(tmp, self.state_path)
+
+
+def main(argv: list[str] | None = None) -> int:
+  import euro_scraper
+
+  parser = argparse.ArgumentParser(description="Show which team/player pages the sitemap says changed.")
+  parser.add_argument("--sitemap", default=None, help="Sitemap or sitemap index URL (default: <base>/sitemap.xml).")
+  parser.add_argument("--base-url", default=None, help="Site root, e.g. a local replay server.")
+  parser.add_argument("--cache-dir", required=True, help="Page cache whose state file to compare against.")
+  parser.add_argument("--namespace", default="euroleague/current", help="Cache namespace (a shard name).")
+  parser.add_argument("--competition", default=euro_scraper.DEFAULT_COMPETITION)
+  parser.add_argument("--season", default=None, help="Season the cached pages were scraped for, e.g. 2024.")
+  parser.add_argument("--commit", action="store_true", help="Apply the diff to the cache and save the state.")
+  args = parser.parse_args(argv)
+
+  if args.base_url:
+    euro_scraper.configure_base_url(args.base_url)
+  base_url = euro_scraper.EUROLEAGUE_BASE_URL
+  fetcher = Fetcher(cache=PageCache(args.cache_dir, namespace=args.namespace))
+  sync = euro_scraper.sitemap_sync(
+    fetcher,
+    args.sitemap or base_url.rstrip("/") + DEFAULT_SITEMAP_PATH,
+    competition=args.competition,
+    season=args.season,
+  )
+  if args.commit:
+    diff = sync.plan()
+    sync.commit()
+  else:
+    diff, _ = discover(fetcher, sync.sitemap_url, sync.load_state(), track=sync.track)
+  print(json.dumps(diff.as_dict(), indent=2))
+  for url in diff.changed:
+    print(url)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from tip_model import generate_tips
+
+# Decimal odds assumed for every leg; the scraped data has no bookmaker lines.
+DEFAULT_ODDS = 1.91
+
+# Placeholder mapping from confidenceScore to hit probability, not fitted to
+# any results: a coin flip at zero confidence, 65% at full confidence. Slip
+# probabilities and scores built on it are uncalibrated.
+BASE_HIT_RATE = 0.5
+CONFIDENCE_SLOPE = 0.15
+MAX_HIT_PROBABILITY = 0.95
+
+# Fields that come from the placeholder mapping; they stay out of data.json.
+UNCALIBRATED_FIELDS = ("hitProbability", "uncalibratedScore")
+
+MIN_LEGS = 2
+MAX_LEGS = 6
+DEFAULT_TOP_K = 10
+
+
+@dataclass(frozen=True)
+class SlipRules:
+  """Which combinations count as a slip.
+
+  ``max_per_game`` and ``max_per_team`` cap correlated legs. Two overs in the
+  same game (or for teammates) are not independent events, so their product
+  overstates the slip's hit probability.
+  """
+
+  min_legs: int = MIN_LEGS
+  max_legs: int = MAX_LEGS
+  max_per_game: int = 1
+  max_per_team: int = 1
+
+
+def leg_probability(tip: dict[str, Any]) -> float:
+  if "hitProbability" in tip:
+    return float(tip["hitProbability"])
+  confidence = float(tip.get("confidenceScore", 0.0))
+  return min(MAX_HIT_PROBABILITY, BASE_HIT_RATE + CONFIDENCE_SLOPE * confidence)
+
+
+def _leg(tip: dict[str, Any], probability: float, odds: float) -> dict[str, Any]:
+  return {
+    "playerId": tip.get("playerId", ""),
+    "teamId": tip.get("teamId", ""),
+    "gameId": tip.get("gameId", ""),
+    "suggestedLine": round(float(tip.get("suggestedLine", 0.0)), 1),
+    "direction": tip.get("direction", "over"),
+    "confidenceScore": round(float(tip.get("confidenceScore", 0.0)), 3),
+    "hitProbability": round(probability, 4),
+    "odds": odds,
+  }
+
+
+def optimise_slips(
+  tips: list[dict[str, Any]],
+  *,
+  top_k: int = DEFAULT_TOP_K,
+  rules: SlipRules = SlipRules(),
+  odds: float = DEFAULT_ODDS,
+) -> list[dict[str, Any]]:
+  """Top ``top_k`` slips by expected value, best first.
+
+  A leg's value is ``p * odds``. A slip pays the product of its legs' odds
+  and, with legs treated as independent, hits with the product of their
+  probabilities. Its return per unit staked is therefore the product of leg
+  values, and its expected value is that product minus one. Unless the tips
+  carry ``hitProbability``, ``p`` comes from the placeholder mapping, so the
+  value is reported as ``uncalibratedScore`` rather than an expected value.
+
+  The search is a depth-first branch and bound over legs sorted by value. The
+  best slip that can still be built from a prefix is the prefix times the
+  next-best legs, so a branch is cut as soon as that bound cannot beat the
+  current k-th best. Because legs are sorted, the bound only falls as the next
+  leg index rises, so one failed bound ends the whole loop at that depth.
+  Rules are checked as legs are added, so the bound stays valid (it ignores
+  them and is only ever too optimistic).
+  """
+  if top_k <= 0 or rules.min_legs > rules.max_legs:
+    return []
+
+  legs: list[tuple[float, float, float, dict[str, Any]]] = []
+  for tip in tips:
+    p = leg_probability(tip)
+    leg_odds = float(tip.get("odds", odds))
+    if p > 0 and leg_odds > 1:
+      legs.append((p * leg_odds, p, leg_odds, tip))
+  legs.sort(key=lambda leg: leg[0], reverse=True)
+  n = len(legs)
+  values = [leg[0] for leg in legs]
+  games = [str(leg[3].get("gameId", "")) or f"#{i}" for i, leg in enumerate(legs)]
+  teams = [str(leg[3].get("teamId", "")) or f"#{i}" for i, leg in enumerate(legs)]
+
+  # best_rest[j][d]: the largest product of legs after j that a slip whose
+  # d-th leg is j could still add (0 to max_legs - d more, meeting min_legs).
+  best_rest: list[list[float]] = []
+  for j in range(n):
+    row: list[float] = []
+    for depth in range(1, rules.max_legs + 1):
+      best, product = -math.inf, 1.0
+      for extra in range(0, rules.max_legs - depth + 1):
+        if extra:
+          if j + extra >= n:
+            break
+          product *= values[j + extra]
+        if depth + extra >= rules.min_legs:
+          best = max(best, product)
+      row.append(best)
+    best_rest.append(row)
+
+  heap: list[tuple[float, int, tuple[int, ...]]] = []
+  counter = 0
+  chosen: list[int] = []
+  game_count: dict[str, int] = {}
+  team_count: dict[str, int] = {}
+
+  def search(start: int, product: float) -> None:
+    nonlocal counter
+    depth = len(chosen) + 1
+    for j in range(start, n):
+      bound = product * values[j] * best_rest[j][depth - 1]
+      if len(heap) == top_k and bound <= heap[0][0]:
+        break
+      game, team = games[j], teams[j]
+      if game_count.get(game, 0) >= rules.max_per_game or team_count.get(team, 0) >= rules.max_per_team:
+        continue
+
+      value = product * values[j]
+      chosen.append(j)
+      game_count[game] = game_count.get(game, 0) + 1
+      team_count[team] = team_count.get(team, 0) + 1
+      if depth >= rules.min_legs:
+        counter += 1
+        entry = (value, -counter, tuple(chosen))
+        if len(heap) < top_k:
+          heapq.heappush(heap, entry)
+        elif value > heap[0][0]:
+          heapq.heapreplace(heap, entry)
+      if depth < rules.max_legs:
+        search(j + 1, value)
+      chosen.pop()
+      game_count[game] -= 1
+      team_count[team] -= 1
+
+  search(0, 1.0)
+
+  slips: list[dict[str, Any]] = []
+  for value, _, indices in sorted(heap, reverse=True):
+    picked = [legs[i] for i in indices]
+    slips.append(
+      {
+        "legs": [_leg(tip, p, leg_odds) for _, p, leg_odds, tip in picked],
+        "legCount": len(picked),
+        "combinedOdds": round(math.prod(leg[2] for leg in picked), 2),
+        "hitProbability": round(math.prod(leg[1] for leg in picked), 4),
+        "uncalibratedScore": round(value - 1.0, 4),
+      }
+    )
+  return slips
+
+
+def without_uncalibrated(slips: list[dict[str, Any]]) -> list[dict[str, Any]]:
+  """``slips`` minus the probabilities and scores that rest on the placeholder mapping."""
+  return [
+    {
+      **{k: v for k, v in slip.items() if k not in UNCALIBRATED_FIELDS},
+      "legs": [{k: v for k, v in leg.items() if k not in UNCALIBRATED_FIELDS} for leg in slip["legs"]],
+    }
+    for slip in slips
+  ]
+
+
+def build_slips(data: dict[str, Any], *, top_k: int = DEFAULT_TOP_K) -> list[dict[str, Any]]:
+  """Slips over the green-light tips the app would show for ``data``, in data.json form.
+
+  They are still ranked by the uncalibrated score, but it is not shipped.
+  """
+  return without_uncalibrated(optimise_slips(generate_tips(data), top_k=top_k))
+
+
+def synthetic_slate(n_tips: int, *, n_games: int = 10, seed: int = 7) -> list[dict[str, Any]]:
+  """A round's worth of scored tips, for timing the optimiser."""
+  rng = random.Random(seed)
+  tips = []
+  for i in range(n_tips):
+    game = rng.randrange(n_games)
+    team = f"T{game * 2 + rng.randrange(2)}"
+    tips.append(
+      {
+        "playerId": f"P{i:03d}",
+        "teamId": team,
+        "gameId": f"G{game}",
+        "suggestedLine": round(rng.uniform(6, 22), 1),
+        "direction": "over",
+        "confidenceScore": rng.random(),
+      }
+    )
+  return tips
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Rank multi-leg slips of green-light tips by an uncalibrated expected-value score."
+  )
+  parser.add_argument("--data", default="resources/data.json", help="data.json to generate tips from.")
+  parser.add_argument("--synthetic", type=int, default=0, help="Use this many synthetic tips instead of --data.")
+  parser.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+  parser.add_argument("--min-legs", type=int, default=MIN_LEGS)
+  parser.add_argument("--max-legs", type=int, default=MAX_LEGS)
+  parser.add_argument("--max-per-game", type=int, default=1)
+  parser.add_argument("--max-per-team", type=int, default=1)
+  args = parser.parse_args(argv)
+
+  if args.synthetic:
+    tips = synthetic_slate(args.synthetic)
+  else:
+    tips = generate_tips(json.loads(Path(args.data).read_text(encoding="utf-8")))
+  rules = SlipRules(
+    min_legs=args.min_legs,
+    max_legs=args.max_legs,
+    max_per_game=args.max_per_game,
+    max_per_team=args.max_per_team,
+  )
+
+  start = time.perf_counter()
+  slips = optimise_slips(tips, top_k=args.top, rules=rules)
+  seconds = time.perf_counter() - start
+  print(f"{len(tips)} tips -> {len(slips)} slips in {seconds * 1000:.1f} ms")
+  for slip in slips:
+    players = ", ".join(leg["playerId"] for leg in slip["legs"])
+    print(
+      f"score {slip['uncalibratedScore']:+.3f}  odds {slip['combinedOdds']:>7.2f}  "
+      f"p {slip['hitProbability']:.3f}  {players}"
+    )
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+import euro_scraper
+from fetcher import Fetcher
+from memory_profile import MemoryProfiler, profile_stage
+from shards import ShardSpec
+from tip_feed import read_previous, update_feed
+
+_HERE = Path(__file__).resolve().parent
+
+
+class StageError(RuntimeError):
+  """A stage cannot run, e.g. an upstream artifact was never built."""
+
+
+class ArtifactStore:
+  """Content-addressed objects plus a per-stage index of input key -> output.
+
+  ``objects/ab/cdef...`` holds each distinct output (and each fetched page)
+  once, named by its SHA-256. ``stages/<stage>/<key>`` points an input key at
+  the output it produced. ``runs/<shard>.json`` records which outputs the last
+  run of a shard used, so a later ``--only``/``--from`` run can pick up its
+  upstream.
+  """
+
+  def __init__(self, root: str | Path) -> None:
+    self.root = Path(root)
+
+  def _write(self, path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+      f.write(data)
+    os.replace(tmp, path)
+
+  def _object_path(self, digest: str) -> Path:
+    return self.root / "objects" / digest[:2] / digest[2:]
+
+  def put_bytes(self, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    path = self._object_path(digest)
+    if not path.exists():
+      self._write(path, data)
+    return digest
+
+  def get_bytes(self, digest: str) -> bytes:
+    return self._object_path(digest).read_bytes()
+
+  def put_json(self, value: Any) -> str:
+    return self.put_bytes(json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+  def get_json(self, digest: str) -> Any:
+    return json.loads(self.get_bytes(digest))
+
+  def lookup(self, stage: str, key: str) -> str | None:
+    path = self.root / "stages" / stage / key
+    try:
+      digest = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+      return None
+    return digest if self._object_path(digest).exists() else None
+
+  def record(self, stage: str, key: str, digest: str) -> None:
+    self._write(self.root / "stages" / stage / key, digest.encode("utf-8"))
+
+  def _manifest_path(self, shard: str) -> Path:
+    return self.root / "runs" / (shard.replace("/", "__") + ".json")
+
+  def load_manifest(self, shard: str) -> dict[str, Any]:
+    try:
+      return json.loads(self._manifest_path(shard).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+      return {}
+
+  def save_manifest(self, shard: str, manifest: dict[str, Any]) -> None:
+    self._write(self._manifest_path(shard), json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+@dataclass
+class StageContext:
+  store: ArtifactStore
+  fetcher: Fetcher
+  base_url: str
+  spec: ShardSpec
+  max_teams: int | None = None
+  max_players: int | None = None
+  fetch_workers: int = 8
+  parse_workers: int = 1
+  out: str = "resources/data.json"
+  analytics_dir: str | None = None
+  events_path: str | None = None
+  # Dates the mock schedule; part of the aggregate stage's key.
+  day: datetime.date = field(default_factory=datetime.date.today)
+
+
+@dataclass(frozen=True)
+class Stage:
+  name: str
+  deps: tuple[str, ...]
+  run: Callable[[StageContext, dict[str, Any]], Any]
+  # Settings that change the output, beyond the upstream artifacts.
+  params: Callable[[StageContext], dict[str, Any]] = lambda ctx: {}
+  # Source files (next to this module) whose contents version the stage's code.
+  code: tuple[str, ...] = ()
+  # False for stages that read the network or write files: they run whenever selected.
+  cache: bool = True
+
+
+def _discover(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  links = euro_scraper.iter_team_links(competition=ctx.spec.competition, season=ctx.spec.season)
+  return [list(link) for link in links][: ctx.max_teams]
+
+
+def _fetch(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  """Download every roster, then every player page those rosters list; bodies go to the store."""
+  links = upstream["discover"]
+  store = ctx.store
+  with ThreadPoolExecutor(max_workers=max(1, ctx.fetch_workers)) as pool:
+    roster_bodies = list(pool.map(lambda link: ctx.fetcher.get_bytes(link[2]), links))
+    rosters: list[dict[str, Any]] = []
+    team_of_url: dict[str, str] = {}
+    for (code, name, url), body in zip(links, roster_bodies):
+      rosters.append({"code": code, "name": name, "url": url, "body": store.put_bytes(body)})
+      html = body.decode("utf-8", errors="replace")
+      for player_url in euro_scraper.parse_roster_page(url, html, team_name=name)["playerUrls"]:
+        # First roster to list a player owns them, as with a sequential scrape.
+        team_of_url.setdefault(player_url, code)
+    player_urls = list(team_of_url)[: ctx.max_players]
+
+    def fetch_player(url: str) -> dict[str, Any] | None:
+      try:
+        return {"url": url, "teamId": team_of_url[url], "body": store.put_bytes(ctx.fetcher.get_bytes(url))}
+      except requests.RequestException as e:
+        # One unreachable player page should not sink the whole build.
+        print(f"Skipping player page {url}: {e}")
+        return None
+
+    players = [p for p in pool.map(fetch_player, player_urls) if p is not None]
+  return {"rosters": rosters, "players": players}
+
+
+def _extract(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  from parse_pool import parse_pages
+
+  pages = upstream["fetch"]
+  store = ctx.store
+  teams = []
+  for roster in pages["rosters"]:
+    html = store.get_bytes(roster["body"]).decode("utf-8", errors="replace")
+    parsed = euro_scraper.parse_roster_page(roster["url"], html, team_name=roster["name"])
+    teams.append(euro_scraper.team_from_roster(roster["code"], roster["name"], parsed))
+
+  parsed_players = parse_pages(
+    [("player", p["url"], store.get_bytes(p["body"])) for p in pages["players"]],
+    workers=ctx.parse_workers,
+    base_url=ctx.base_url,
+  )
+  players: list[dict[str, Any]] = []
+  seen: set[str] = set()
+  for page, details in zip(pages["players"], parsed_players):
+    if details is None or details["id"] in seen:
+      continue
+    seen.add(details["id"])
+    # Roster membership is authoritative for teamId.
+    details["teamId"] = page["teamId"]
+    players.append(details)
+  return {"teams": teams, "players": players}
+
+
+def _public(extracted: dict[str, Any]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+  strip = euro_scraper._SCRAPE_ONLY_KEYS
+  teams = [{k: v for k, v in t.items() if k not in strip} for t in extracted["teams"]]
+  players = [{k: v for k, v in p.items() if k not in strip} for p in extracted["players"]]
+  return teams, players
+
+
+def _aggregate(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  from defense_stats import mock_defense_tensor
+
+  teams, players = _public(upstream["extract"])
+  # Seeded by the team ids, so the same extract gives the same mock numbers.
+  tensor = mock_defense_tensor(teams, players)
+  return {
+    "schedule": euro_scraper._generate_mock_schedule(teams, today=ctx.day),
+    "defense_vs_position": tensor.matrix("points", digits=1),
+    "defense_tensor": tensor.to_json(digits=1),
+  }
+
+
+def _data(upstream: dict[str, Any]) -> dict[str, Any]:
+  teams, players = _public(upstream["extract"])
+  aggregate = upstream["aggregate"]
+  return {
+    "teams": teams,
+    "players": players,
+    "defense_vs_position": aggregate["defense_vs_position"],
+    "defense_tensor": aggregate["defense_tensor"],
+    "schedule": aggregate["schedule"],
+  }
+
+
+def _score(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  from slips import build_slips
+
+  return {"slips": build_slips(_data(upstream))}
+
+
+def _export(ctx: StageContext, upstream: dict[str, Any]) -> Any:
+  data = {**_data(upstream), "slips": upstream["score"]["slips"]}
+  previous = read_previous(ctx.out) if ctx.events_path else None
+  path = euro_scraper.save_to_json(data, output_path=ctx.out)
+  events: list[dict[str, Any]] = []
+  if ctx.events_path:
+    events = update_feed(ctx.events_path, previous, data)
+  written: dict[str, int] = {}
+  if ctx.analytics_dir:
+    from analytics_export import export_analytics
+
+    written = export_analytics(
+      ctx.analytics_dir, data, season=ctx.spec.season or euro_scraper.current_season_label()
+    )
+  return {
+    "path": str(path),
+    "teams": len(data["teams"]),
+    "players": len(data["players"]),
+    "analytics": written,
+    "events": [e["seq"] for e in events],
+  }
+
+
+STAGES: dict[str, Stage] = {
+  stage.name: stage
+  for stage in (
+    Stage(
+      "discover",
+      (),
+      _discover,
+      params=lambda ctx: {"base": ctx.base_url, "shard": ctx.spec.name, "maxTeams": ctx.max_teams},
+      cache=False,
+    ),
+    Stage("fetch", ("discover",), _fetch, params=lambda ctx: {"maxPlayers": ctx.max_players}, cache=False),
+    Stage("extract", ("fetch",), _extract, code=("euro_scraper.py", "parse_pool.py")),
+    Stage(
+      "aggregate",
+      ("extract",),
+      _aggregate,
+      # The mock schedule starts the day after ctx.day, so it goes stale daily.
+      params=lambda ctx: {"day": ctx.day.isoformat()},
+      code=("euro_scraper.py", "defense_stats.py"),
+    ),
+    Stage("score", ("extract", "aggregate"), _score, code=("slips.py", "tip_model.py")),
+    Stage(
+      "export",
+      ("extract", "aggregate", "score"),
+      _export,
+      params=lambda ctx: {"out": ctx.out, "analytics": ctx.analytics_dir, "events": ctx.events_path},
+      cache=False,
+    ),
+  )
+}
+
+
+@lru_cache(maxsize=None)
+def code_version(files: tuple[str, ...]) -> str:
+  digest = hashlib.sha256()
+  for name in files:
+    digest.update(name.encode("utf-8"))
+    digest.update((_HERE / name).read_bytes())
+  return digest.hexdigest()[:16]
+
+
+def stage_key(stage: Stage, ctx: StageContext, inputs: dict[str, str]) -> str:
+  """Hash of everything a stage's output depends on: code, settings and upstream outputs."""
+  payload = {
+    "stage": stage.name,
+    "code": code_version(stage.code),
+    "params": stage.params(ctx),
+    "inputs": inputs,
+  }
+  return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def select_stages(*, only: str | None = None, start: str | None = None) -> list[str]:
+  names = list(STAGES)
+  for name in (only, start):
+    if name is not None and name not in STAGES:
+      raise ValueError(f"Unknown stage {name!r}; expected one of {', '.join(names)}")
+  if only is not None:
+    return [only]
+  if start is not None:
+    # STAGES is in topological order, so everything after ``start`` is downstream of it.
+    return names[names.index(start):]
+  return names
+
+
+@dataclass
+class StageRun:
+  name: str
+  # "ran", "cached" (same key seen before) or "reused" (not selected; last run's output).
+  status: str
+  output: str
+  seconds: float = 0.0
+  summary: dict[str, Any] = field(default_factory=dict)
+
+
+def run_stages(
+  ctx: StageContext,
+  *,
+  only: str | None = None,
+  start: str | None = None,
+  force: bool = False,
+  profiler: MemoryProfiler | None = None,
+) -> list[StageRun]:
+  """Run the selected stages in order, reusing cached outputs where the key matches.
+
+  Stages before the selection are not run. Their outputs come from the
+  shard's last run, and a missing one is a ``StageError``. Stages after
+  ``--only`` are left as they were. A full run always re-runs ``discover`` and
+  ``fetch``. Downstream keys hash the content of their inputs, though, so
+  when the site has not changed everything after ``fetch`` is a cache hit.
+  """
+  selected = set(select_stages(only=only, start=start))
+  store = ctx.store
+  manifest = store.load_manifest(ctx.spec.name)
+  outputs: dict[str, str] = {}
+  loaded: dict[str, Any] = {}
+  runs: list[StageRun] = []
+
+  def load(name: str) -> Any:
+    if name not in loaded:
+      loaded[name] = store.get_json(outputs[name])
+    return loaded[name]
+
+  for name, stage in STAGES.items():
+    if name not in selected:
+      previous = manifest.get(name, {}).get("output")
+      if previous is not None:
+        outputs[name] = previous
+      continue
+
+    missing = [d for d in stage.deps if d not in outputs]
+    if missing:
+      earliest = next(n for n in STAGES if n not in outputs)
+      raise StageError(
+        f"{ctx.spec.name}: stage {name!r} needs {', '.join(missing)}, which has never been built; "
+        f"run with --from {earliest} first"
+      )
+    inputs = {d: outputs[d] for d in stage.deps}
+    key = stage_key(stage, ctx, inputs)
+    start_time = time.perf_counter()
+    digest = store.lookup(name, key) if stage.cache and not force else None
+    status = "cached"
+    if digest is None:
+      with profile_stage(profiler, name):
+        output = stage.run(ctx, {d: load(d) for d in stage.deps})
+      digest = store.put_json(output)
+      store.record(name, key, digest)
+      loaded[name] = output
+      status = "ran"
+    outputs[name] = digest
+    manifest[name] = {"key": key, "output": digest, "at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    runs.append(StageRun(name, status, digest, time.perf_counter() - start_time))
+
+  store.save_manifest(ctx.spec.name, manifest)
+  for name in STAGES:
+    if name not in selected and name in outputs:
+      runs.append(StageRun(name, "reused", outputs[name]))
+  runs.sort(key=lambda r: list(STAGES).index(r.name))
+  return runs
+
+
+def run_staged_build(
+  spec: ShardSpec,
+  *,
+  stage_dir: str | Path,
+  base_url: str,
+  fetcher: Fetcher,
+  only: str | None = None,
+  start: str | None = None,
+  force: bool = False,
+  profiler: MemoryProfiler | None = None,
+  **settings: Any,
+) -> list[StageRun]:
+  """Run the HTML build for one shard as stages; ``settings`` go to ``StageContext``."""
+  # Passed in rather than read from euro_scraper: when that runs as a script,
+  # this module sees a separate copy of it.
+  euro_scraper.configure_base_url(base_url)
+  euro_scraper.set_fetcher(fetcher)
+  ctx = StageContext(store=ArtifactStore(stage_dir), fetcher=fetcher, base_url=base_url, spec=spec, **settings)
+  runs = run_stages(ctx, only=only, start=start, force=force, profiler=profiler)
+  for run in runs:
+    print(f"[stage] {run.name:<9} {run.status:<6} {run.output[:12]} {run.seconds:6.2f}s")
+  return runs
+
+
+def stage_status(ctx: StageContext) -> list[dict[str, Any]]:
+  """Each stage's last output, and whether its code changed since."""
+  manifest = ctx.store.load_manifest(ctx.spec.name)
+  rows = []
+  for name, stage in STAGES.items():
+    entry = manifest.get(name)
+    row: dict[str, Any] = {"stage": name, "dependsOn": list(stage.deps), "built": entry is not None}
+    if entry is not None:
+      inputs = {d: manifest.get(d, {}).get("output", "") for d in stage.deps}
+      row["output"] = entry["output"][:12]
+      row["at"] = entry["at"]
+      if stage.cache:
+        row["upToDate"] = stage_key(stage, ctx, inputs) == entry["key"]
+    rows.append(row)
+  return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description="Show the build's stage graph and what is cached for a shard.")
+  parser.add_argument("--stage-dir", required=True, help="Artifact store written by euro_scraper.py --stage-dir.")
+  parser.add_argument("--competition", default=euro_scraper.DEFAULT_COMPETITION)
+  parser.add_argument("--season", default=None)
+  args = parser.parse_args(argv)
+
+  spec = ShardSpec(args.competition, euro_scraper.season_label(args.season) if args.season else None)
+  ctx = StageContext(
+    store=ArtifactStore(args.stage_dir),
+    fetcher=Fetcher(),
+    base_url=euro_scraper.EUROLEAGUE_BASE_URL,
+    spec=spec,
+  )
+  for row in stage_status(ctx):
+    print(json.dumps(row))
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
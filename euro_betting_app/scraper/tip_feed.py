@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import euro_scraper
+from tip_model import generate_tips
+
+FEED_VERSION = 1
+
+# NotificationService's bar for a "GREEN LIGHT" push.
+GREEN_LIGHT_CONFIDENCE = 0.85
+# Smallest moves worth a push: points on a suggested line, points allowed per game.
+DEFAULT_LINE_MOVE = 1.0
+DEFAULT_DEFENSE_MOVE = 1.5
+# Events kept in the feed; a client further behind than this reloads data.json.
+DEFAULT_RETAIN = 500
+
+
+@dataclass(frozen=True)
+class FeedRules:
+  green_light: float = GREEN_LIGHT_CONFIDENCE
+  line_move: float = DEFAULT_LINE_MOVE
+  defense_move: float = DEFAULT_DEFENSE_MOVE
+
+
+def tip_index(
+  data: dict[str, Any],
+  *,
+  green_light: float = GREEN_LIGHT_CONFIDENCE,
+) -> dict[tuple[str, str], dict[str, Any]]:
+  """Green-light tips keyed by ``(playerId, gameId)``."""
+  return {
+    (tip["playerId"], tip["gameId"]): tip
+    for tip in generate_tips(data)
+    if float(tip["confidenceScore"]) > green_light
+  }
+
+
+def defense_index(data: dict[str, Any]) -> dict[tuple[str, str], float]:
+  """``defense_vs_position`` flattened to ``(teamId, position) -> allowed``."""
+  return {
+    (team_id, position): float(allowed)
+    for team_id, row in data.get("defense_vs_position", {}).items()
+    for position, allowed in row.items()
+  }
+
+
+def _tip_fields(tip: dict[str, Any]) -> dict[str, Any]:
+  return {
+    "playerId": tip["playerId"],
+    "gameId": tip["gameId"],
+    "teamId": tip.get("teamId", ""),
+    "opponentId": tip.get("opponentId", ""),
+    "matchupDescription": tip.get("matchupDescription", ""),
+    "suggestedLine": round(float(tip["suggestedLine"]), 1),
+    "confidenceScore": round(float(tip["confidenceScore"]), 3),
+  }
+
+
+def diff_builds(
+  previous: dict[str, Any],
+  current: dict[str, Any],
+  *,
+  rules: FeedRules = FeedRules(),
+) -> list[dict[str, Any]]:
+  """What changed between two data.json payloads, as unnumbered events.
+
+  Both builds are indexed once, by tip and by defense cell. Every comparison
+  is then a dict lookup, so the cost is linear in the number of tips and
+  cells. Events are grouped by type and sorted by key, so the same two builds
+  always give the same log.
+  """
+  before = tip_index(previous, green_light=rules.green_light)
+  after = tip_index(current, green_light=rules.green_light)
+  events: list[dict[str, Any]] = []
+
+  for key in sorted(after.keys() - before.keys()):
+    events.append({"type": "new_green_light", **_tip_fields(after[key])})
+  for key in sorted(before.keys() - after.keys()):
+    # Fell below the bar or was not scored at all (the player moved, the game was played).
+    events.append({"type": "tip_dropped", **_tip_fields(before[key])})
+  for key in sorted(before.keys() & after.keys()):
+    old, new = float(before[key]["suggestedLine"]), float(after[key]["suggestedLine"])
+    if abs(new - old) >= rules.line_move:
+      events.append({"type": "projection_moved", **_tip_fields(after[key]), "from": round(old, 1)})
+
+  old_defense, new_defense = defense_index(previous), defense_index(current)
+  for key in sorted(old_defense.keys() & new_defense.keys()):
+    old, new = old_defense[key], new_defense[key]
+    if abs(new - old) >= rules.defense_move:
+      team_id, position = key
+      events.append(
+        {"type": "defense_moved", "teamId": team_id, "position": position, "from": round(old, 1), "to": round(new, 1)}
+      )
+  return events
+
+
+def load_feed(path: str | Path) -> dict[str, Any]:
+  try:
+    feed = json.loads(Path(path).read_text(encoding="utf-8"))
+  except FileNotFoundError:
+    return {"version": FEED_VERSION, "firstSeq": 1, "lastSeq": 0, "updatedAt": None, "events": []}
+  if feed.get("version") != FEED_VERSION:
+    raise ValueError(f"{path}: unsupported feed version {feed.get('version')!r}")
+  return feed
+
+
+def append_events(
+  feed: dict[str, Any],
+  events: list[dict[str, Any]],
+  *,
+  at: str,
+  retain: int = DEFAULT_RETAIN,
+) -> list[dict[str, Any]]:
+  """Number ``events`` after the feed's last one and append them, dropping the oldest past ``retain``."""
+  seq = int(feed["lastSeq"])
+  numbered = []
+  for event in events:
+    seq += 1
+    numbered.append({"seq": seq, "at": at, **event})
+  kept = (feed["events"] + numbered)[-retain:] if retain > 0 else []
+  feed.update(
+    {
+      "lastSeq": seq,
+      # Sequence numbers are never reused, so this stays right after trimming.
+      "firstSeq": kept[0]["seq"] if kept else seq + 1,
+      "updatedAt": at,
+      "events": kept,
+    }
+  )
+  return numbered
+
+
+def events_since(feed: dict[str, Any], seq: int) -> list[dict[str, Any]] | None:
+  """Events after ``seq``, or None when some were already trimmed (the client should reload data.json)."""
+  if seq + 1 < int(feed["firstSeq"]):
+    return None
+  # Events are in sequence order with no gaps, so this is an offset, not a search.
+  return feed["events"][max(0, seq + 1 - int(feed["firstSeq"])):]
+
+
+def update_feed(
+  path: str | Path,
+  previous: dict[str, Any] | None,
+  current: dict[str, Any],
+  *,
+  rules: FeedRules = FeedRules(),
+  retain: int = DEFAULT_RETAIN,
+) -> list[dict[str, Any]]:
+  """Append what changed since ``previous`` to the feed at ``path``; returns the new events.
+
+  With no previous build there is nothing to compare against, and clients
+  start from the full data.json anyway, so no events are written.
+  """
+  if previous is None:
+    return []
+  events = diff_builds(previous, current, rules=rules)
+  if not events:
+    return []
+  feed = load_feed(path)
+  at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+  numbered = append_events(feed, events, at=at, retain=retain)
+  euro_scraper.save_to_json(feed, output_path=path)
+  return numbered
+
+
+def read_previous(path: str | Path) -> dict[str, Any] | None:
+  """The data.json about to be replaced, if there is a readable one."""
+  try:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+  except (FileNotFoundError, ValueError):
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description="Diff two data.json builds into the tip change feed, or read the feed.")
+  parser.add_argument("--feed", required=True, help="Event feed JSON to append to or read.")
+  parser.add_argument("--previous", default=None, help="The earlier data.json.")
+  parser.add_argument("--data", default=None, help="The new data.json.")
+  parser.add_argument("--since", type=int, default=None, help="Print the events after this sequence number.")
+  parser.add_argument("--line-move", type=float, default=DEFAULT_LINE_MOVE)
+  parser.add_argument("--defense-move", type=float, default=DEFAULT_DEFENSE_MOVE)
+  args = parser.parse_args(argv)
+
+  if args.data:
+    if not args.previous:
+      raise SystemExit("--data needs --previous to diff against.")
+    events = update_feed(
+      args.feed,
+      read_previous(args.previous),
+      json.loads(Path(args.data).read_text(encoding="utf-8")),
+      rules=FeedRules(line_move=args.line_move, defense_move=args.defense_move),
+    )
+    print(f"Appended {len(events)} events to {args.feed}")
+
+  if args.since is not None:
+    events = events_since(load_feed(args.feed), args.since)
+    if events is None:
+      print(f"Events after {args.since} were trimmed; reload data.json.")
+      return 1
+    for event in events:
+      print(json.dumps(event))
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
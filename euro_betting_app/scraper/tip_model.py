@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# AnalysisEngine._leagueAveragePtsForPosition in lib/services/analysis_engine.dart.
+LEAGUE_AVERAGE_PTS = {"PG": 11.5, "SG": 12.0, "SF": 11.0, "PF": 10.5, "C": 11.8}
+
+
+@dataclass(frozen=True)
+class TipParams:
+  """The tunable constants of AnalysisEngine.generateTips, with the app's values."""
+
+  threshold: float = 1.15
+  recency_weight: float = 0.6
+  home_away: float = 0.05
+  clamp_low: float = 0.85
+  clamp_high: float = 1.25
+
+
+def win_percentage(record: str) -> float | None:
+  # Team.winPercentage: "W-L" or nothing.
+  parts = str(record).split("-")
+  if len(parts) != 2:
+    return None
+  try:
+    wins, losses = int(parts[0].strip()), int(parts[1].strip())
+  except ValueError:
+    return None
+  total = wins + losses
+  return wins / total if total > 0 else None
+
+
+def _next_game(team_id: str, schedule: list[dict[str, Any]]) -> dict[str, Any] | None:
+  # Like AnalysisEngine._findOpponentId: the first listed game the team plays in.
+  for game in schedule:
+    if team_id in (game.get("homeTeamId"), game.get("awayTeamId")):
+      if game.get("homeTeamId") and game.get("awayTeamId"):
+        return game
+  return None
+
+
+def generate_tips(data: dict[str, Any], params: TipParams = TipParams()) -> list[dict[str, Any]]:
+  """Python port of AnalysisEngine.generateTips over a data.json payload.
+
+  Returns tips in BettingTip's JSON shape, highest confidence first, with the
+  team, opponent and game ids added so tips can be grouped.
+  """
+  teams = {str(t.get("id", "")): t for t in data.get("teams", [])}
+  defenses = data.get("defense_vs_position", {})
+  schedule = data.get("schedule", [])
+
+  tips: list[dict[str, Any]] = []
+  for player in data.get("players", []):
+    team = teams.get(str(player.get("teamId", "")))
+    if team is None:
+      continue
+
+    game = _next_game(team["id"], schedule)
+    if game is not None:
+      is_home: bool | None = game["homeTeamId"] == team["id"]
+      opponent_id = game["awayTeamId"] if is_home else game["homeTeamId"]
+    else:
+      is_home, opponent_id = None, str(team.get("nextOpponentId", ""))
+    opponent = teams.get(opponent_id)
+    defense = defenses.get(opponent_id)
+    if opponent is None or defense is None:
+      continue
+
+    position = str(player.get("position", "PG"))
+    league_average = LEAGUE_AVERAGE_PTS.get(position, LEAGUE_AVERAGE_PTS["PG"])
+    allowed = float(defense.get(position, 0.0))
+    if allowed <= league_average * params.threshold:
+      continue
+
+    recency_weighted = float(player.get("last5AvgPts", 0.0)) * params.recency_weight + float(
+      player.get("seasonAvgPts", 0.0)
+    ) * (1.0 - params.recency_weight)
+    if is_home is not None:
+      recency_weighted *= 1 + params.home_away if is_home else 1 - params.home_away
+    multiplier = min(max(allowed / league_average, params.clamp_low), params.clamp_high)
+
+    confidence = min(1.0, max(0.0, (allowed / league_average - 1.0) / 0.5))
+    team_pct, opponent_pct = win_percentage(team.get("record", "")), win_percentage(
+      opponent.get("record", "")
+    )
+    if team_pct is not None and opponent_pct is not None:
+      if (team_pct > 0.8 and opponent_pct < 0.2) or (opponent_pct > 0.8 and team_pct < 0.2):
+        confidence *= 0.7
+
+    tips.append(
+      {
+        "playerId": str(player.get("id", "")),
+        "matchupDescription": f"{player.get('name', '')} vs {opponent.get('name', '')}",
+        "suggestedLine": recency_weighted * multiplier,
+        "direction": "over",
+        "confidenceScore": min(1.0, max(0.0, confidence)),
+        "reasoning": f"Opponent allows {allowed:.1f} pts to {position}s (Worst in League)",
+        "teamId": team["id"],
+        "opponentId": opponent_id,
+        "gameId": str(game.get("gameId", "")) if game is not None else "",
+      }
+    )
+
+  tips.sort(key=lambda t: t["confidenceScore"], reverse=True)
+  return tips
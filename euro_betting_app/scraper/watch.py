@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import datetime
+import heapq
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+import euro_scraper
+from data_sources import ApiSchemaError, JsonApiSource, games_to_schedule
+from fetcher import Fetcher
+from tip_feed import update_feed
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+  """How often to revalidate a team's roster, given its upcoming tip-offs (seconds)."""
+
+  idle: float = 30 * 60
+  pregame: float = 5 * 60
+  near: float = 60
+  # Start polling at ``pregame`` this long before tip-off ...
+  pregame_window: float = 6 * 3600
+  # ... and at ``near`` from when lineups are announced until the game starts.
+  near_window: float = 45 * 60
+  # After this long the game is over and box scores have landed.
+  game_length: float = 2.5 * 3600
+
+  def interval(self, now: float, tip_offs: list[float]) -> float:
+    wait = self.idle
+    for tip in tip_offs:
+      until = tip - now
+      if -self.game_length <= until <= self.near_window:
+        return self.near if until >= 0 else self.pregame
+      if 0 <= until <= self.pregame_window:
+        wait = min(wait, self.pregame)
+      elif until > self.pregame_window:
+        # Idle, but wake up in time for the pregame window.
+        wait = min(wait, max(self.near, until - self.pregame_window))
+    return wait
+
+
+def team_tip_offs(schedule: list[dict[str, Any]]) -> dict[str, list[float]]:
+  tips: dict[str, list[float]] = {}
+  for game in schedule:
+    try:
+      # fromisoformat only takes a "Z" suffix from Python 3.11.
+      tip = datetime.datetime.fromisoformat(str(game.get("gameDate", "")).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+      continue
+    for key in ("homeTeamId", "awayTeamId"):
+      team_id = str(game.get(key, ""))
+      if team_id:
+        tips.setdefault(team_id, []).append(tip)
+  for values in tips.values():
+    values.sort()
+  return tips
+
+
+class Watcher:
+  """Keeps data.json current by polling roster pages with conditional requests.
+
+  A poll that comes back 304 costs one bodyless round trip. Only when a roster
+  changes are its new or returning players fetched. A finished game triggers a
+  revalidation of that team's player pages, so season averages move without a
+  full re-scrape. The defense stats from the first scrape are kept, so they do
+  not move between polls.
+
+  Tip-offs come from the JSON API's games at ``api_url``, refreshed after each
+  finished game. When the API does not answer, data.json gets the usual mock
+  schedule, but polling stays at the idle rate: a made-up tip-off is no reason
+  to poll faster.
+  """
+
+  def __init__(
+    self,
+    *,
+    output_path: str | Path,
+    competition: str = euro_scraper.DEFAULT_COMPETITION,
+    season: str | None = None,
+    policy: PollPolicy = PollPolicy(),
+    max_teams: int | None = None,
+    events_path: str | Path | None = None,
+    api_url: str | None = None,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], None] = time.sleep,
+  ) -> None:
+    self.output_path = Path(output_path)
+    self.competition = competition
+    self.season = season
+    self.policy = policy
+    self.max_teams = max_teams
+    self.events_path = events_path
+    self.api_url = api_url
+    self.clock = clock
+    self.sleep = sleep
+
+    self.teams: list[dict[str, Any]] = []
+    self.roster_urls: dict[str, list[str]] = {}
+    self.players_by_url: dict[str, dict[str, Any]] = {}
+    self.schedule: list[dict[str, Any]] = []
+    self.defense: dict[str, dict[str, float]] | None = None
+    self.defense_tensor: dict[str, Any] | None = None
+    self.tip_offs: dict[str, list[float]] = {}
+    self.last_poll: dict[str, float] = {}
+    self.writes = 0
+
+  def _fetch_player(self, url: str) -> dict[str, Any] | None:
+    body, _ = euro_scraper.get_fetcher().revalidate(url)
+    return euro_scraper.parse_player_details(url, body.decode("utf-8", errors="replace"))
+
+  def load_schedule(self) -> list[dict[str, Any]] | None:
+    """Upcoming fixtures for the tracked teams from the JSON API, or None when it is unavailable."""
+    if self.api_url is None:
+      return None
+    # Uncached: the page cache would keep serving the first answer.
+    api = JsonApiSource(
+      Fetcher(),
+      api_url=self.api_url,
+      competition_code=euro_scraper.get_competition(self.competition).code,
+      season=self.season,
+    )
+    try:
+      games = api.games()
+      schedule, _, _ = games_to_schedule(games, {t["id"] for t in self.teams}, season_code=api.season_code)
+    except (requests.RequestException, ApiSchemaError, KeyError, TypeError, ValueError) as e:
+      print(f"[watch] no schedule from the API ({type(e).__name__}: {e}); polling at the idle rate")
+      return None
+    return schedule or None
+
+  def bootstrap(self) -> None:
+    """Full scrape once, keeping the roster URLs that later polls revalidate.
+
+    Each roster is fetched once, through ``revalidate``, so the validators
+    later polls send are already stored.
+    """
+    fetcher = euro_scraper.get_fetcher()
+    self.teams = []
+    for code, name, roster_url in euro_scraper.iter_team_links(competition=self.competition, season=self.season):
+      body, _ = fetcher.revalidate(roster_url)
+      roster = self._parse_roster(roster_url, body, name)
+      team = euro_scraper.team_from_roster(code, name, roster)
+      self._apply_roster(team, roster)
+      self.teams.append(team)
+      if self.max_teams is not None and len(self.teams) >= self.max_teams:
+        break
+
+    real_schedule = self.load_schedule()
+    self.schedule = real_schedule or []
+    data = self.snapshot()
+    self.schedule = data["schedule"]
+    self.defense = data["defense_vs_position"]
+    self.defense_tensor = data["defense_tensor"]
+    self.tip_offs = team_tip_offs(real_schedule) if real_schedule else {}
+    self.write(data)
+
+  @staticmethod
+  def _parse_roster(url: str, body: bytes, team_name: str) -> dict[str, Any]:
+    return euro_scraper.parse_roster_page(url, body.decode("utf-8", errors="replace"), team_name=team_name)
+
+  def _apply_roster(self, team: dict[str, Any], roster: dict[str, Any]) -> tuple[int, int]:
+    team["record"] = roster["record"] or team["record"]
+    team["logoUrl"] = roster["logoUrl"] or team["logoUrl"]
+
+    before = set(self.roster_urls.get(team["id"], []))
+    after = set(roster["playerUrls"])
+    self.roster_urls[team["id"]] = roster["playerUrls"]
+    for url in sorted(after - before):
+      try:
+        details = self._fetch_player(url)
+      except requests.RequestException as e:
+        print(f"Skipping player page {url}: {e}")
+        continue
+      if details is not None:
+        self.players_by_url[url] = details
+    return len(after - before), len(before - after)
+
+  def poll_team(self, team: dict[str, Any]) -> bool:
+    """Revalidate one roster (and, after a game, its players); True if data changed."""
+    now = self.clock()
+    previous = self.last_poll.get(team["id"], now)
+    self.last_poll[team["id"]] = now
+    fetcher = euro_scraper.get_fetcher()
+
+    body, roster_changed = fetcher.revalidate(team["rosterUrl"])
+    changed = False
+    if roster_changed:
+      record = team["record"]
+      added, removed = self._apply_roster(team, self._parse_roster(team["rosterUrl"], body, team["name"]))
+      print(f"[watch] {team['id']}: roster changed (+{added}/-{removed} players)")
+      changed = bool(added or removed) or team["record"] != record
+
+    game_ended = any(
+      previous < tip + self.policy.game_length <= now for tip in self.tip_offs.get(team["id"], [])
+    )
+    if game_ended:
+      for url in self.roster_urls.get(team["id"], []):
+        try:
+          details = self._fetch_player(url)
+        except requests.RequestException as e:
+          print(f"Skipping player page {url}: {e}")
+          continue
+        if details is not None and details != self.players_by_url.get(url):
+          self.players_by_url[url] = details
+          changed = True
+      if self.tip_offs:
+        # The played game leaves the fixture list; the next tip-offs may have moved too.
+        schedule = self.load_schedule()
+        if schedule is not None and schedule != self.schedule:
+          self.schedule = schedule
+          self.tip_offs = team_tip_offs(schedule)
+          changed = True
+    return changed
+
+  def snapshot(self) -> dict[str, Any]:
+    players: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for team in self.teams:
+      for url in self.roster_urls.get(team["id"], []):
+        details = self.players_by_url.get(url)
+        if details is None or details["id"] in seen:
+          continue
+        seen.add(details["id"])
+        # Roster membership is authoritative for teamId, as in a full scrape.
+        players.append({**details, "teamId": team["id"]})
+    return euro_scraper.assemble_live_data(
+      self.teams,
+      players,
+      schedule=self.schedule or None,
+      defense_vs_position=self.defense,
+      defense_tensor=self.defense_tensor,
+    )
+
+  def write(self, data: dict[str, Any]) -> bool:
+    """Atomically replace the output, but only if its content changed."""
+    text = json.dumps(data, indent=2)
+    try:
+      previous_text = self.output_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+      previous_text = None
+    if previous_text == text:
+      return False
+    euro_scraper.save_to_json(data, output_path=self.output_path)
+    self.writes += 1
+    if self.events_path is not None and previous_text is not None:
+      events = update_feed(self.events_path, json.loads(previous_text), data)
+      if events:
+        print(f"[watch] {len(events)} events, up to #{events[-1]['seq']}")
+    return True
+
+  def run(self, *, max_polls: int | None = None) -> None:
+    self.bootstrap()
+    print(f"[watch] tracking {len(self.teams)} teams; wrote {self.output_path}")
+
+    now = self.clock()
+    queue = [
+      (now + self.policy.interval(now, self.tip_offs.get(t["id"], [])), i) for i, t in enumerate(self.teams)
+    ]
+    heapq.heapify(queue)
+    polls = 0
+    while queue and (max_polls is None or polls < max_polls):
+      due, index = heapq.heappop(queue)
+      delay = due - self.clock()
+      if delay > 0:
+        self.sleep(delay)
+
+      team = self.teams[index]
+      try:
+        changed = self.poll_team(team)
+      except requests.RequestException as e:
+        print(f"[watch] {team['id']}: poll failed ({e}); will retry")
+        changed = False
+      polls += 1
+
+      if changed:
+        data = self.snapshot()
+        self.defense = data["defense_vs_position"]
+        self.defense_tensor = data["defense_tensor"]
+        if self.write(data):
+          print(f"[watch] wrote {self.output_path}")
+
+      now = self.clock()
+      heapq.heappush(queue, (now + self.policy.interval(now, self.tip_offs.get(team["id"], [])), index))
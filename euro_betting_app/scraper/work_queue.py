@@ -0,0 +1,673 @@
+from __future__ import annotations
+
+import abc
+import argparse
+import json
+import os
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import euro_scraper
+from data_sources import DEFAULT_API_URL, JsonApiSource, games_to_schedule, season_code
+from fetcher import Fetcher, PageCache
+from shards import CURRENT_SEASON, ShardSpec, build_merged_index, expand_seasons, plan_shards
+
+KINDS = ("teams", "roster", "player", "games")
+
+# A leased task that is not acked or nacked within this long is handed to another worker.
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+# Delay before a nacked task's second attempt; doubles with each further attempt.
+DEFAULT_RETRY_BACKOFF = 1.0
+DEFAULT_POLL_SECONDS = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+  id INTEGER PRIMARY KEY,
+  kind TEXT NOT NULL,
+  shard TEXT NOT NULL,
+  url TEXT NOT NULL,
+  payload TEXT NOT NULL DEFAULT '{}',
+  state TEXT NOT NULL DEFAULT 'ready',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  not_before REAL NOT NULL DEFAULT 0,
+  lease_until REAL NOT NULL DEFAULT 0,
+  worker TEXT NOT NULL DEFAULT '',
+  result TEXT,
+  error TEXT NOT NULL DEFAULT '',
+  UNIQUE (kind, shard, url)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_state ON tasks (state, not_before);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+  kind: str
+  shard: str
+  url: str
+  payload: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Task:
+  id: int
+  kind: str
+  shard: str
+  url: str
+  payload: dict[str, Any]
+  # Doubles as the lease token: a re-lease bumps it, so a stale ack or nack is refused.
+  attempts: int
+
+
+class WorkQueue(abc.ABC):
+  """Lease/ack task queue shared by the coordinator, workers and reducer.
+
+  Tasks are unique per (kind, shard, url), so enqueueing twice, or two
+  rosters listing the same player, yields one task. A leased task is invisible
+  to other workers until its lease runs out. Then it is handed out again, so
+  a killed worker's tasks are not lost. ``SqliteQueue`` is the local
+  implementation; a broker-backed one only has to provide these methods.
+  """
+
+  @abc.abstractmethod
+  def enqueue(self, tasks: list[TaskSpec]) -> int:
+    ...
+
+  @abc.abstractmethod
+  def lease(self, *, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Task | None:
+    ...
+
+  @abc.abstractmethod
+  def ack(self, task: Task, result: Any, *, children: list[TaskSpec] | None = None) -> bool:
+    ...
+
+  @abc.abstractmethod
+  def nack(self, task: Task, error: str) -> bool:
+    ...
+
+  @abc.abstractmethod
+  def drained(self) -> bool:
+    ...
+
+  @abc.abstractmethod
+  def counts(self) -> dict[str, dict[str, dict[str, int]]]:
+    ...
+
+  @abc.abstractmethod
+  def results(self, shard: str, kind: str) -> dict[str, Any]:
+    ...
+
+  @abc.abstractmethod
+  def failures(self, shard: str | None = None) -> list[tuple[str, str, str]]:
+    ...
+
+  @abc.abstractmethod
+  def get_meta(self, key: str, default: Any = None) -> Any:
+    ...
+
+  @abc.abstractmethod
+  def set_meta(self, key: str, value: Any) -> None:
+    ...
+
+
+class SqliteQueue(WorkQueue):
+  """A ``WorkQueue`` in one SQLite file, for workers on one host or a shared volume.
+
+  WAL mode lets readers (``status``, the reducer) run alongside writers, and
+  every state change is a short ``BEGIN IMMEDIATE`` transaction, so two
+  workers can never lease the same task. Each process opens its own
+  connection.
+  """
+
+  def __init__(
+    self,
+    path: str | Path,
+    *,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+  ) -> None:
+    self.path = Path(path)
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self.max_attempts = max_attempts
+    self.retry_backoff = retry_backoff
+    self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+    self.db.execute("PRAGMA journal_mode=WAL")
+    self.db.execute("PRAGMA busy_timeout=30000")
+    self.db.executescript(_SCHEMA)
+
+  def close(self) -> None:
+    self.db.close()
+
+  def _transaction(self) -> "_Transaction":
+    return _Transaction(self.db)
+
+  def _insert(self, tasks: list[TaskSpec]) -> int:
+    before = self.db.total_changes
+    self.db.executemany(
+      "INSERT OR IGNORE INTO tasks (kind, shard, url, payload) VALUES (?, ?, ?, ?)",
+      [(t.kind, t.shard, t.url, json.dumps(t.payload)) for t in tasks],
+    )
+    return self.db.total_changes - before
+
+  def enqueue(self, tasks: list[TaskSpec]) -> int:
+    with self._transaction():
+      return self._insert(tasks)
+
+  def lease(self, *, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Task | None:
+    now = time.time()
+    with self._transaction():
+      # Expired leases at the attempt limit fail here rather than being handed out again.
+      self.db.execute(
+        "UPDATE tasks SET state = 'failed', error = 'lease expired on ' || worker"
+        " WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+        (now, self.max_attempts),
+      )
+      row = self.db.execute(
+        "SELECT id, kind, shard, url, payload, attempts FROM tasks"
+        " WHERE (state = 'ready' AND not_before <= ?) OR (state = 'leased' AND lease_until < ?)"
+        " ORDER BY id LIMIT 1",
+        (now, now),
+      ).fetchone()
+      if row is None:
+        return None
+      task_id, kind, shard, url, payload, attempts = row
+      self.db.execute(
+        "UPDATE tasks SET state = 'leased', attempts = ?, lease_until = ?, worker = ? WHERE id = ?",
+        (attempts + 1, now + lease_seconds, worker, task_id),
+      )
+    return Task(id=task_id, kind=kind, shard=shard, url=url, payload=json.loads(payload), attempts=attempts + 1)
+
+  def ack(self, task: Task, result: Any, *, children: list[TaskSpec] | None = None) -> bool:
+    """Store the result and enqueue follow-up tasks, atomically. False if the lease was lost."""
+    with self._transaction() as tx:
+      updated = self.db.execute(
+        "UPDATE tasks SET state = 'done', result = ?, error = '', lease_until = 0"
+        " WHERE id = ? AND state = 'leased' AND attempts = ?",
+        (json.dumps(result), task.id, task.attempts),
+      ).rowcount
+      if not updated:
+        tx.rollback()
+        return False
+      self._insert(children or [])
+    return True
+
+  def nack(self, task: Task, error: str) -> bool:
+    """Release a task for a later retry, or fail it at the attempt limit."""
+    failed = task.attempts >= self.max_attempts
+    delay = self.retry_backoff * (2 ** (task.attempts - 1))
+    with self._transaction():
+      updated = self.db.execute(
+        "UPDATE tasks SET state = ?, error = ?, lease_until = 0, not_before = ?"
+        " WHERE id = ? AND state = 'leased' AND attempts = ?",
+        ("failed" if failed else "ready", error, time.time() + delay, task.id, task.attempts),
+      ).rowcount
+    return bool(updated)
+
+  def drained(self) -> bool:
+    """True once every task is done or failed."""
+    row = self.db.execute("SELECT COUNT(*) FROM tasks WHERE state IN ('ready', 'leased')").fetchone()
+    return row[0] == 0
+
+  def counts(self) -> dict[str, dict[str, dict[str, int]]]:
+    """``{shard: {kind: {state: n}}}``."""
+    counts: dict[str, dict[str, dict[str, int]]] = {}
+    for shard, kind, state, n in self.db.execute(
+      "SELECT shard, kind, state, COUNT(*) FROM tasks GROUP BY shard, kind, state ORDER BY shard"
+    ):
+      counts.setdefault(shard, {}).setdefault(kind, {})[state] = n
+    return counts
+
+  def results(self, shard: str, kind: str) -> dict[str, Any]:
+    """Results of a shard's done tasks of one kind, by URL, in enqueue order."""
+    return {
+      url: json.loads(result)
+      for url, result in self.db.execute(
+        "SELECT url, result FROM tasks WHERE shard = ? AND kind = ? AND state = 'done' ORDER BY id",
+        (shard, kind),
+      )
+    }
+
+  def failures(self, shard: str | None = None) -> list[tuple[str, str, str]]:
+    """``(kind, url, error)`` for each failed task."""
+    query = "SELECT kind, url, error FROM tasks WHERE state = 'failed'"
+    params: tuple[Any, ...] = ()
+    if shard is not None:
+      query += " AND shard = ?"
+      params = (shard,)
+    return [tuple(row) for row in self.db.execute(query + " ORDER BY id", params)]
+
+  def get_meta(self, key: str, default: Any = None) -> Any:
+    row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+  def set_meta(self, key: str, value: Any) -> None:
+    with self._transaction():
+      self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+class _Transaction:
+  def __init__(self, db: sqlite3.Connection) -> None:
+    self.db = db
+    self.open = False
+
+  def __enter__(self) -> "_Transaction":
+    # IMMEDIATE takes the write lock up front, so a lease's SELECT and UPDATE cannot interleave with another's.
+    self.db.execute("BEGIN IMMEDIATE")
+    self.open = True
+    return self
+
+  def rollback(self) -> None:
+    if self.open:
+      self.db.execute("ROLLBACK")
+      self.open = False
+
+  def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+    if not self.open:
+      return
+    self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+    self.open = False
+
+
+def shard_spec(name: str) -> ShardSpec:
+  competition, _, season = name.partition("/")
+  return ShardSpec(competition=competition, season=None if season in ("", CURRENT_SEASON) else season)
+
+
+def coordinate(
+  queue: WorkQueue,
+  specs: list[ShardSpec],
+  *,
+  base_url: str | None = None,
+  api_url: str | None = None,
+  max_teams: int | None = None,
+  with_games: bool = False,
+) -> int:
+  """Seed the queue: one listing task (and optionally one games task) per shard.
+
+  Workers fan the rest out as they go: the listing enqueues a roster task per
+  team and each roster a player task per player page.
+  """
+  base_url = (base_url or euro_scraper.EUROLEAGUE_BASE_URL).rstrip("/")
+  if api_url is None:
+    # A replay server stands in for both the site and its API.
+    api_url = base_url if base_url != euro_scraper.DEFAULT_BASE_URL else DEFAULT_API_URL
+  queue.set_meta("base_url", base_url)
+  queue.set_meta("api_url", api_url)
+
+  tasks: list[TaskSpec] = []
+  for spec in specs:
+    slug = euro_scraper.get_competition(spec.competition).slug
+    tasks.append(TaskSpec("teams", spec.name, f"{base_url}/{slug}/teams/", {"maxTeams": max_teams}))
+    if with_games:
+      tasks.append(TaskSpec("games", spec.name, f"{api_url}#games"))
+  return queue.enqueue(tasks)
+
+
+def _run_task(task: Task, *, api_url: str) -> tuple[Any, list[TaskSpec]]:
+  spec = shard_spec(task.shard)
+  fetcher = euro_scraper.get_fetcher()
+
+  if task.kind == "teams":
+    links = list(euro_scraper.iter_team_links(competition=spec.competition, season=spec.season))
+    links = links[: task.payload.get("maxTeams")]
+    children = [TaskSpec("roster", task.shard, url, {"code": code, "name": name}) for code, name, url in links]
+    return [list(link) for link in links], children
+
+  if task.kind == "roster":
+    name = task.payload["name"]
+    roster = euro_scraper.parse_roster_page(task.url, fetcher.get_text(task.url), team_name=name)
+    team = euro_scraper.team_from_roster(task.payload["code"], name, roster)
+    children = [TaskSpec("player", task.shard, url) for url in roster["playerUrls"]]
+    return {"team": team, "playerUrls": roster["playerUrls"]}, children
+
+  if task.kind == "player":
+    return euro_scraper.parse_player_details(task.url, fetcher.get_text(task.url)), []
+
+  if task.kind == "games":
+    api = JsonApiSource(
+      fetcher,
+      api_url=api_url,
+      competition_code=euro_scraper.get_competition(spec.competition).code,
+      season=spec.season,
+    )
+    return api.games(), []
+
+  raise ValueError(f"Unknown task kind {task.kind!r}; expected one of {', '.join(KINDS)}")
+
+
+def run_worker(
+  queue: WorkQueue,
+  *,
+  worker_id: str | None = None,
+  cache_dir: str | Path | None = None,
+  cache_ttl: float | None = None,
+  lease_seconds: float = DEFAULT_LEASE_SECONDS,
+  poll_seconds: float = DEFAULT_POLL_SECONDS,
+  max_tasks: int | None = None,
+) -> dict[str, int]:
+  """Lease and run tasks until the queue is drained (or ``max_tasks`` are done)."""
+  worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+  euro_scraper.configure_base_url(queue.get_meta("base_url", euro_scraper.EUROLEAGUE_BASE_URL))
+  api_url = queue.get_meta("api_url", DEFAULT_API_URL)
+
+  # One fetcher (and cache namespace) per shard, as with a shard process.
+  fetchers: dict[str, Fetcher] = {}
+  stats = {"acked": 0, "nacked": 0, "lost": 0}
+  try:
+    while max_tasks is None or stats["acked"] + stats["nacked"] < max_tasks:
+      task = queue.lease(worker=worker_id, lease_seconds=lease_seconds)
+      if task is None:
+        if queue.drained():
+          break
+        # Everything left is leased by other workers or waiting out a retry delay.
+        time.sleep(poll_seconds)
+        continue
+
+      if task.shard not in fetchers:
+        cache = PageCache(cache_dir, namespace=task.shard, max_age=cache_ttl) if cache_dir else None
+        fetchers[task.shard] = Fetcher(cache=cache)
+      euro_scraper.set_fetcher(fetchers[task.shard])
+      try:
+        result, children = _run_task(task, api_url=api_url)
+      except Exception as e:  # a bad page is retried, then recorded; the worker carries on
+        queue.nack(task, f"{type(e).__name__}: {e}")
+        stats["nacked"] += 1
+        print(f"[{worker_id}] {task.kind} {task.url} attempt {task.attempts} failed: {type(e).__name__}: {e}")
+        continue
+      if queue.ack(task, result, children=children):
+        stats["acked"] += 1
+      else:
+        # The lease ran out and another worker has the task; its result wins.
+        stats["lost"] += 1
+  finally:
+    euro_scraper.set_fetcher(None)
+  return stats
+
+
+def reduce_shard(queue: WorkQueue, spec: ShardSpec) -> tuple[dict[str, Any], dict[str, Any]]:
+  """Merge a shard's task results into a data.json payload, plus a completeness report.
+
+  Teams keep listing order and players roster order; a player listed on two
+  rosters belongs to the first, as with a sequential scrape. Without a
+  successful games task, the schedule is mocked as usual.
+  """
+  listing = next(iter(queue.results(spec.name, "teams").values()), None)
+  if listing is None:
+    raise ValueError(f"{spec.name}: the team listing task has not succeeded")
+  rosters = queue.results(spec.name, "roster")
+  pages = queue.results(spec.name, "player")
+
+  teams: list[dict[str, Any]] = []
+  team_of_url: dict[str, str] = {}
+  for code, _, roster_url in listing:
+    roster = rosters.get(roster_url)
+    if roster is None:
+      continue
+    teams.append(roster["team"])
+    for url in roster["playerUrls"]:
+      team_of_url.setdefault(url, code)
+
+  players: list[dict[str, Any]] = []
+  seen: set[str] = set()
+  for url, code in team_of_url.items():
+    details = pages.get(url)
+    if details is None or details["id"] in seen:
+      continue
+    seen.add(details["id"])
+    details["teamId"] = code
+    players.append(details)
+
+  schedule = None
+  games = next(iter(queue.results(spec.name, "games").values()), None)
+  if games is not None:
+    team_ids = {t["id"] for t in teams}
+    code = season_code(euro_scraper.get_competition(spec.competition).code, spec.season)
+    schedule, wins, losses = games_to_schedule(games, team_ids, season_code=code)
+    for team in teams:
+      if not team.get("record"):
+        team["record"] = f"{wins.get(team['id'], 0)}-{losses.get(team['id'], 0)}"
+
+  failures = queue.failures(spec.name)
+  report = {
+    "teams": f"{len(teams)}/{len(listing)}",
+    "players": f"{len(players)}/{len(team_of_url)}",
+    "schedule": "games" if schedule else "mock",
+    "failed": len(failures),
+  }
+  return euro_scraper.assemble_live_data(teams, players, schedule=schedule or None), report
+
+
+def reduce_queue(
+  queue: WorkQueue,
+  *,
+  out_dir: str | Path,
+  allow_partial: bool = False,
+) -> Path:
+  """Write each shard's data.json (``ShardSpec.output_path`` layout) and a merged index.json."""
+  if not allow_partial and not queue.drained():
+    raise RuntimeError("Tasks are still pending; wait for the workers or pass allow_partial.")
+  out = Path(out_dir)
+  summaries: list[dict[str, Any]] = []
+  for name in queue.counts():
+    spec = shard_spec(name)
+    summary: dict[str, Any] = {"competition": spec.competition, "season": spec.season or CURRENT_SEASON}
+    try:
+      data, report = reduce_shard(queue, spec)
+      path = euro_scraper.save_to_json(data, output_path=spec.output_path(out))
+    except Exception as e:
+      summary.update({"ok": False, "error": f"{type(e).__name__}: {e}"})
+      traceback.print_exc()
+    else:
+      summary.update(
+        {
+          "ok": True,
+          "path": str(path.relative_to(out)),
+          "teams": len(data["teams"]),
+          "players": len(data["players"]),
+          "completeness": report,
+        }
+      )
+    print(f"[{name}] {summary.get('completeness') or summary.get('error')}")
+    summaries.append(summary)
+  return euro_scraper.save_to_json(build_merged_index(out, summaries), output_path=out / "index.json")
+
+
+def check_queue(
+  *,
+  workers: int = 4,
+  teams: int = 6,
+  players_per_team: int = 5,
+  stale_lease_seconds: float = 1.0,
+) -> dict[str, Any]:
+  """Run ``run --workers N`` against a replay server and check the queue's guarantees.
+
+  Before the run, a stand-in for a worker that died leases the listing task
+  with a short lease and never finishes it. The check then verifies three
+  things. The listing is handed to a live worker once that lease expires. The
+  dead worker's late ack is refused and changes nothing. The reduced
+  data.json has every player in the league exactly once, from exactly one
+  done task per player page. Returns a report whose ``problems`` list is
+  empty on success.
+  """
+  import replay_server
+
+  pages = replay_server.load_pages(fixtures=None, teams=teams, players_per_team=players_per_team, seed=7)
+  expected = {m.group(1) for path in pages for m in [re.search(r"/players/[^/]+/(\d+)/", path)] if m}
+  server = replay_server.ReplayServer(pages).start()
+  problems: list[str] = []
+  try:
+    with tempfile.TemporaryDirectory(prefix="euro-queue-") as tmp:
+      queue_path, out_dir = Path(tmp) / "queue.db", Path(tmp) / "out"
+      queue = SqliteQueue(queue_path)
+      coordinate(queue, [ShardSpec(competition=euro_scraper.DEFAULT_COMPETITION, season=None)], base_url=server.url)
+      stale = queue.lease(worker="stale", lease_seconds=stale_lease_seconds)
+      assert stale is not None and stale.kind == "teams"
+
+      start = time.perf_counter()
+      command = [sys.executable, str(Path(__file__).resolve()), "run", "--queue", str(queue_path)]
+      command += ["--workers", str(workers), "--base-url", server.url, "--out-dir", str(out_dir)]
+      run = subprocess.run(command, capture_output=True, text=True)
+      seconds = time.perf_counter() - start
+      if run.returncode != 0:
+        problems.append(f"run exited {run.returncode}: {run.stderr.strip()[-500:]}")
+
+      if queue.ack(stale, [["BOGUS", "Bogus", "/bogus"]], children=[TaskSpec("roster", stale.shard, "/bogus")]):
+        problems.append("a stale ack was accepted")
+      attempts, worker, listing = queue.db.execute(
+        "SELECT attempts, worker, result FROM tasks WHERE id = ?", (stale.id,)
+      ).fetchone()
+      if attempts < 2 or worker == "stale":
+        problems.append(f"listing lease never expired (attempts {attempts}, worker {worker!r})")
+      if "BOGUS" in (listing or "") or queue.db.execute("SELECT 1 FROM tasks WHERE url = '/bogus'").fetchone():
+        problems.append("a stale ack changed the queue")
+
+      done = dict(
+        queue.db.execute("SELECT kind, COUNT(*) FROM tasks WHERE state = 'done' GROUP BY kind").fetchall()
+      )
+      if done.get("player") != len(expected):
+        problems.append(f"{done.get('player', 0)} player tasks done for {len(expected)} player pages")
+      if not queue.drained() or queue.failures():
+        problems.append(f"queue not cleanly drained: {queue.counts()}")
+      queue.close()
+
+      data_paths = sorted(out_dir.glob("*/*/data.json"))
+      ids: list[str] = []
+      for path in data_paths:
+        ids += [str(p["id"]) for p in json.loads(path.read_text(encoding="utf-8"))["players"]]
+      if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} players reduced more than once")
+      if set(ids) != expected:
+        problems.append(f"reduced {len(set(ids))} of {len(expected)} players")
+  finally:
+    server.stop()
+  return {
+    "workers": workers,
+    "players": len(expected),
+    "seconds": round(seconds, 2),
+    "listingAttempts": attempts,
+    "tasksDone": done,
+    "problems": problems,
+  }
+
+
+def _spawn_workers(args: argparse.Namespace) -> Iterator[subprocess.Popen[bytes]]:
+  command = [sys.executable, str(Path(__file__).resolve()), "worker", "--queue", args.queue]
+  command += ["--lease-seconds", str(args.lease_seconds)]
+  if args.cache_dir:
+    command += ["--cache-dir", args.cache_dir]
+  if args.cache_ttl is not None:
+    command += ["--cache-ttl", str(args.cache_ttl)]
+  for i in range(args.workers):
+    yield subprocess.Popen(command + ["--id", f"local-{i}"])
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(
+    description="Spread a live scrape over worker processes sharing a SQLite work queue."
+  )
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  def add_queue(sub: argparse.ArgumentParser) -> None:
+    sub.add_argument("--queue", required=True, help="SQLite queue file, shared by every process.")
+
+  def add_worker_options(sub: argparse.ArgumentParser) -> None:
+    sub.add_argument("--cache-dir", default=None, help="Page cache, one namespace per shard.")
+    sub.add_argument("--cache-ttl", type=float, default=None)
+    sub.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+
+  def add_enqueue_options(sub: argparse.ArgumentParser) -> None:
+    sub.add_argument("--competition", action="append", default=None)
+    sub.add_argument("--season", action="append", default=None, help="2024, 2024-25 or a range like 2020:2024.")
+    sub.add_argument("--base-url", default=None, help="Site root, e.g. a local replay server.")
+    sub.add_argument("--api-url", default=None, help="JSON API root for --with-games.")
+    sub.add_argument("--max-teams", type=int, default=None)
+    sub.add_argument("--with-games", action="store_true", help="Also fetch the API's games for real fixtures.")
+
+  enqueue = commands.add_parser("enqueue", help="Seed the queue with one listing task per shard.")
+  add_queue(enqueue)
+  add_enqueue_options(enqueue)
+
+  worker = commands.add_parser("worker", help="Lease and run tasks until the queue is drained.")
+  add_queue(worker)
+  add_worker_options(worker)
+  worker.add_argument("--id", default=None, help="Worker name shown in leases (default host:pid).")
+
+  reduce = commands.add_parser("reduce", help="Merge results into data.json files and index.json.")
+  add_queue(reduce)
+  reduce.add_argument("--out-dir", required=True)
+  reduce.add_argument("--allow-partial", action="store_true", help="Reduce even with tasks still pending.")
+
+  status = commands.add_parser("status", help="Task counts per shard, kind and state, and failures.")
+  add_queue(status)
+
+  check = commands.add_parser(
+    "check", help="Run N workers against a local replay server and check lease expiry, stale acks and reduce."
+  )
+  check.add_argument("--workers", type=int, default=4)
+  check.add_argument("--report", default=None, help="Write the check report (JSON) here.")
+
+  run = commands.add_parser("run", help="enqueue, run N local workers, then reduce.")
+  add_queue(run)
+  add_enqueue_options(run)
+  add_worker_options(run)
+  run.add_argument("--workers", type=int, default=4)
+  run.add_argument("--out-dir", required=True)
+
+  args = parser.parse_args(argv)
+  if args.command == "check":
+    report = check_queue(workers=args.workers)
+    print(json.dumps(report, indent=2))
+    if args.report:
+      Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if report["problems"] else 0
+  queue = SqliteQueue(args.queue)
+
+  if args.command in ("enqueue", "run"):
+    specs = plan_shards(args.competition or [euro_scraper.DEFAULT_COMPETITION], expand_seasons(args.season))
+    added = coordinate(
+      queue,
+      specs,
+      base_url=args.base_url,
+      api_url=args.api_url,
+      max_teams=args.max_teams,
+      with_games=args.with_games,
+    )
+    print(f"Enqueued {added} tasks for {len(specs)} shards")
+
+  if args.command == "worker":
+    stats = run_worker(
+      queue,
+      worker_id=args.id,
+      cache_dir=args.cache_dir,
+      cache_ttl=args.cache_ttl,
+      lease_seconds=args.lease_seconds,
+    )
+    print(f"[{args.id or os.getpid()}] {stats}")
+  elif args.command == "run":
+    start = time.perf_counter()
+    workers = list(_spawn_workers(args))
+    codes = [w.wait() for w in workers]
+    print(f"{len(workers)} workers finished in {time.perf_counter() - start:.2f}s (exit codes {codes})")
+    print(f"Wrote {reduce_queue(queue, out_dir=args.out_dir)}")
+  elif args.command == "reduce":
+    print(f"Wrote {reduce_queue(queue, out_dir=args.out_dir, allow_partial=args.allow_partial)}")
+  elif args.command == "status":
+    print(json.dumps(queue.counts(), indent=2))
+    for kind, url, error in queue.failures():
+      print(f"FAILED {kind} {url}: {error}")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())